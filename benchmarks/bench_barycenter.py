@@ -0,0 +1,52 @@
+"""
+重心による並べ替え(1回のスイープ)のベンチマーク
+create_graph.sort_nodes_by_xcenter()(Nodeオブジェクトごとに計算)と
+compact_graph.sort_nodes_by_xcenter()(階層ごとにNumPyでまとめて計算)の実行時間を比較し、
+割り当てたx座標が一致することを確認する。
+
+使い方:
+    python benchmarks/bench_barycenter.py [--nodes 50000] [--levels 10]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "demo"))
+import compact_graph  # noqa: E402
+import create_graph  # noqa: E402
+from dag_generators import random_layered_dag  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重心による並べ替えのベンチマーク")
+    parser.add_argument("--nodes", type=int, default=50000, help="ノード数")
+    parser.add_argument("--levels", type=int, default=10, help="階層数")
+    parser.add_argument("--edges-per-node", type=int, default=3, help="1ノードあたりのエッジ数")
+    args = parser.parse_args()
+
+    input_node_dict = random_layered_dag(args.nodes, args.levels, args.edges_per_node, long_edge_ratio=0.2)
+    node_list = create_graph.create_node_list(input_node_dict)
+    create_graph.assign_level(node_list)
+    create_graph.cut_edges_higher_than_1(node_list)
+    create_graph.assign_x_sequentially(node_list)
+    graph = compact_graph.compact_graph_from_node_list(node_list)
+    level2nodes = create_graph.divide_nodes_by_level(node_list)
+    print(f"nodes with dummies: {len(node_list)}, "
+          f"nodes per level: {min(map(len, level2nodes.values()))}-{max(map(len, level2nodes.values()))}")
+
+    print(f"{'sweep':<12}{'Node [s]':>12}{'Compact [s]':>14}{'speedup':>10}")
+    for downward in (True, False):
+        start = time.perf_counter()
+        create_graph.sort_nodes_by_xcenter(node_list, downward)
+        node_time = time.perf_counter() - start
+        start = time.perf_counter()
+        compact_graph.sort_nodes_by_xcenter(graph, downward)
+        compact_time = time.perf_counter() - start
+        assert [node.x for node in node_list] == graph.x.tolist(), "x座標が一致しません"
+        label = "downward" if downward else "upward"
+        print(f"{label:<12}{node_time:>12.3f}{compact_time:>14.3f}{node_time / compact_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Brandes–Köpfの方法による座標決定のベンチマーク
+交差削減を済ませた同じノードのリストについて、座標決定の方法("sequential", "priority", "brandes-koepf")ごとに
+実行時間とエッジの長さの総和(calc_edge_length_sum())を比較する。
+"brandes-koepf"について
+・各階層のノードの左右の順が交差削減の結果と同じで、隣り合うノードの間隔が1以上であること
+・ダミーの挿入の方法("nodes", "chains")によらず同じx座標になること
+も確認する。
+
+使い方:
+    python benchmarks/bench_brandes_koepf.py [--sizes 1000 5000 20000] [--generators layered mml]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "demo"))
+import create_graph  # noqa: E402
+from dag_generators import mml_like_dag, random_layered_dag  # noqa: E402
+from multi_start import prepare_node_list  # noqa: E402
+
+GENERATORS = {
+    "layered": lambda n: random_layered_dag(n, max(2, n // 50), 3, seed=n),
+    "mml": lambda n: mml_like_dag(n, seed=n),
+}
+
+METHODS = ["sequential", "priority", "brandes-koepf"]
+
+
+def ordered_node_list(input_node_dict, dummy="nodes"):
+    """交差削減までを行ったノードのリストを返す"""
+    node_list = prepare_node_list(input_node_dict, dummy=dummy)
+    create_graph.order_nodes(node_list)
+    return node_list
+
+
+def validate_order(node_list, ordered_x):
+    """各階層の左右の順がordered_xと同じで、隣り合うノードの間隔が1以上であることを確認する"""
+    node2ordered_x = dict(zip(node_list, ordered_x))
+    for level, nodes in create_graph.divide_nodes_by_level(node_list).items():
+        nodes.sort(key=node2ordered_x.__getitem__)
+        for left, right in zip(nodes, nodes[1:]):
+            assert right.x - left.x >= 1, f"階層{level}でノードが重なっているか、順が変わっています"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Brandes–Köpfの方法による座標決定のベンチマーク")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000], help="合成するDAGのノード数")
+    parser.add_argument("--generators", nargs="+", choices=GENERATORS, default=list(GENERATORS),
+                        help="用いるDAGの生成方法")
+    args = parser.parse_args()
+
+    print(f"{'generator':<10}{'nodes':>8}{'all nodes':>10}{'method':>15}{'time [s]':>10}{'edge length':>14}")
+    for generator in args.generators:
+        for size in args.sizes:
+            input_node_dict = GENERATORS[generator](size)
+            node_list = ordered_node_list(input_node_dict)
+            ordered_x = [node.x for node in node_list]
+            for method in METHODS:
+                for node, x in zip(node_list, ordered_x):
+                    node.x = x
+                start = time.perf_counter()
+                create_graph.assign_coordinate(node_list, method=method)
+                elapsed = time.perf_counter() - start
+                if method == "brandes-koepf":
+                    validate_order(node_list, ordered_x)
+                    chain_list = ordered_node_list(input_node_dict, dummy="chains")
+                    create_graph.assign_coordinate(chain_list, method=method)
+                    create_graph.expand_dummy_chains(chain_list)
+                    assert [node.x for node in chain_list] == [node.x for node in node_list], \
+                        "ダミーの挿入の方法によってx座標が異なります"
+                length = create_graph.calc_edge_length_sum(node_list)
+                print(f"{generator:<10}{size:>8}{len(node_list):>10}{method:>15}{elapsed:>10.3f}{length:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+クラスタによる詳細度の切り替えのベンチマーク
+グラフ全体を階層化する場合と、cluster_graph.ClusteredLayoutで概観を階層化する場合について、
+実行時間と最初の描画で読み込むノード数・エッジ数を比較する。クラスタの詳細の階層化の時間(平均、最大)も表示する。
+・各ノードがちょうど1つのクラスタに属すること
+・概観のエッジがクラスタの間の依存関係であり、クラスタの間の依存関係は全て概観のエッジで(推移的に)表されること
+・クラスタの詳細がクラスタのノードを全て含むこと
+も確認する。
+
+使い方:
+    python benchmarks/bench_cluster_graph.py [--mml mmlディレクトリのパス] [--sizes 1500 5000] [--family-size 8]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "demo"))
+import cluster_graph  # noqa: E402
+import layout_pipeline  # noqa: E402
+import retrieve_environment  # noqa: E402
+from dag_generators import family_named_dag  # noqa: E402
+
+
+def validate(input_node_dict, clustered_layout):
+    """クラスタへの分割、概観のエッジ、クラスタの詳細を確認する"""
+    members = [name for names in clustered_layout.cluster2members.values() for name in names]
+    assert sorted(members) == sorted(input_node_dict), "クラスタへの分割が正しくありません"
+
+    cluster_graph_dict = cluster_graph.make_cluster_graph(input_node_dict, clustered_layout.node2cluster)
+    overview = clustered_layout.overview()
+    name2targets = {node.name: set() for node in overview.nodes}
+    for source, target in overview.edges:
+        assert target in cluster_graph_dict[source], f"{source} -> {target}は依存関係にありません"
+        name2targets[source].add(target)
+    for source, targets in cluster_graph_dict.items():
+        reached = set()
+        stack = [source]
+        while stack:
+            for target in name2targets[stack.pop()] - reached:
+                reached.add(target)
+                stack.append(target)
+        assert targets <= reached, f"{source}の依存関係が概観で表されていません"
+
+    for cluster, names in clustered_layout.cluster2members.items():
+        detail = clustered_layout.detail(cluster)
+        assert sorted(node.name for node in detail.nodes if not node.is_dummy) == sorted(names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="クラスタによる詳細度の切り替えのベンチマーク")
+    parser.add_argument("--mml", help="mizファイルが置かれたディレクトリ。指定しない場合はfamily_named_dag()を用いる")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1500, 5000], help="合成するDAGのノード数")
+    parser.add_argument("--family-size", type=int, default=8, help="合成するDAGの1つの接頭辞のノード数")
+    args = parser.parse_args()
+
+    if args.mml:
+        miz_files_dict = retrieve_environment.make_library_dependency(args.mml)
+        graphs = [("mml", retrieve_environment.create_input_node_dict(
+            miz_files_dict, [category for category in retrieve_environment.CATEGORIES if category != "vocabularies"]))]
+    else:
+        graphs = [(f"family {size}", family_named_dag(size, family_size=args.family_size)) for size in args.sizes]
+
+    print(f"{'graph':<12}{'view':<10}{'nodes':>8}{'edges':>8}{'time [s]':>10}")
+    for label, input_node_dict in graphs:
+        pipeline = layout_pipeline.LayoutPipeline()
+        start = time.perf_counter()
+        full = pipeline.run(input_node_dict)
+        full_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        clustered_layout = cluster_graph.ClusteredLayout(input_node_dict, pipeline=pipeline)
+        overview = clustered_layout.overview()
+        overview_time = time.perf_counter() - start
+
+        detail_times = []
+        detail_sizes = []
+        for cluster in clustered_layout.cluster2members:
+            start = time.perf_counter()
+            detail = clustered_layout.detail(cluster)
+            detail_times.append(time.perf_counter() - start)
+            detail_sizes.append(len(detail.nodes))
+        validate(input_node_dict, clustered_layout)
+
+        print(f"{label:<12}{'full':<10}{len(full.nodes):>8}{len(full.edges):>8}{full_time:>10.3f}")
+        print(f"{label:<12}{'overview':<10}{len(overview.nodes):>8}{len(overview.edges):>8}{overview_time:>10.3f}")
+        print(f"{label:<12}{'detail':<10}{max(detail_sizes):>8}{'':>8}{max(detail_times):>10.3f}  "
+              f"(max of {len(detail_times)} clusters, mean {sum(detail_times) / len(detail_times):.4f} s)")
+
+
+if __name__ == "__main__":
+    main()
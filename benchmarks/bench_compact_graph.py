@@ -0,0 +1,82 @@
+"""
+Nodeオブジェクトのリスト(create_graph.py)とCompactGraph(compact_graph.py)の比較
+合成したDAGをcreate_layout()で階層化し、交差削減と座標決定をNodeオブジェクト上で行う方法
+("iterated", "priority")と、CompactGraph上で行う方法("compact", "priority-compact")について、
+LayoutProfilerで段階ごとの実行時間とメモリ使用量の最大値を計測する。
+計測の前に、ランダムな階層グラフで両者のx座標とスイープごとの交差数が一致することを確認する。
+
+使い方:
+    python benchmarks/bench_compact_graph.py [--nodes 10000] [--levels 10]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "demo"))
+import create_graph  # noqa: E402
+from dag_generators import random_layered_dag  # noqa: E402
+
+# 比較する方法。key=表示名, value=create_layout()に渡す方法
+PATHS = {
+    "Node": {"ordering": "iterated", "coordinate": "priority"},
+    "Compact": {"ordering": "compact", "coordinate": "priority-compact"},
+}
+
+
+def run_layout(input_node_dict, options, measure_memory):
+    """
+    input_node_dictをoptionsの方法でcreate_layout()により階層化する。
+    Return:
+        (LayoutProfilerオブジェクト, 階層化後のノードのリスト)
+    """
+    profiler = create_graph.LayoutProfiler(measure_memory=measure_memory, measure_quality=False)
+    node_list = create_graph.create_layout(input_node_dict, profiler=profiler, **options)
+    return profiler, node_list
+
+
+def validate(count, dummy):
+    """
+    ランダムな階層グラフで、PATHSの方法のx座標と交差削減のスイープごとの交差数が一致することを確認する。
+    """
+    for seed in range(count):
+        input_node_dict = random_layered_dag(300, 8, 3, long_edge_ratio=0.2, seed=seed)
+        results = []
+        for options in PATHS.values():
+            profiler, node_list = run_layout(input_node_dict, dict(options, dummy=dummy), measure_memory=False)
+            ordering = next(record for record in profiler.stages if record["stage"] == "ordering")
+            results.append(([node.x for node in node_list], [sweep["crossings"] for sweep in ordering["sweeps"]]))
+        assert results[0] == results[1], f"シード{seed}でx座標または交差数が一致しません"
+    print(f"validated on {count} random layered graphs (dummy: {dummy})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NodeオブジェクトとCompactGraphの比較")
+    parser.add_argument("--nodes", type=int, default=10000, help="ノード数")
+    parser.add_argument("--levels", type=int, default=10, help="階層数")
+    parser.add_argument("--edges-per-node", type=int, default=3, help="1ノードあたりのエッジ数")
+    parser.add_argument("--seed", type=int, default=0, help="乱数のシード")
+    parser.add_argument("--validations", type=int, default=20, help="一致を確認する階層グラフの数")
+    args = parser.parse_args()
+
+    for dummy in create_graph.DUMMY_METHODS:
+        validate(args.validations, dummy)
+
+    input_node_dict = random_layered_dag(args.nodes, args.levels, args.edges_per_node, seed=args.seed)
+    profilers = {label: run_layout(input_node_dict, options, measure_memory=False)[0]
+                 for label, options in PATHS.items()}
+    memory_profilers = {label: run_layout(input_node_dict, options, measure_memory=True)[0]
+                        for label, options in PATHS.items()}
+
+    node_count = profilers["Node"].stages[-1]["nodes"]
+    print(f"nodes: {args.nodes}, nodes with dummies: {node_count}")
+    print(f"{'stage':<24}{'Node [s]':>12}{'Compact [s]':>14}{'Node [MB]':>12}{'Compact [MB]':>14}")
+    for index, record in enumerate(profilers["Node"].stages):
+        times = [profilers[label].stages[index]["wall_time"] for label in PATHS]
+        memories = [memory_profilers[label].stages[index]["peak_memory"] / 1e6 for label in PATHS]
+        print(f"{record['stage']:<24}{times[0]:>12.3f}{times[1]:>14.3f}{memories[0]:>12.1f}{memories[1]:>14.1f}")
+    totals = [sum(record["wall_time"] for record in profilers[label].stages) for label in PATHS]
+    print(f"{'total':<24}{totals[0]:>12.3f}{totals[1]:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
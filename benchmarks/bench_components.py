@@ -0,0 +1,98 @@
+"""
+弱連結成分ごとの階層化のベンチマーク
+巨大な成分1つと多数の小さい成分からなるDAGについて、
+create_layout()で全体を1つとして階層化する方法("whole")と、
+component_layout.layout_components()で成分ごとに階層化する方法(プロセス数を変えて)の
+実行時間と交差数を比較する。
+成分ごとの結果で、ノードの位置が重ならないこと、エッジ(ダミーノードを辿った正規のノードの組)が
+"whole"と一致することも確認する。
+
+使い方:
+    python benchmarks/bench_components.py [--giant 5000] [--small 300] [--workers 1 2 4]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "demo"))
+import component_layout  # noqa: E402
+import create_graph  # noqa: E402
+from dag_generators import disjoint_union, mml_like_dag, random_layered_dag  # noqa: E402
+
+
+def real_edges_of_whole(node_list):
+    """create_layout()の結果から、ダミーノードを辿った正規のノードの組の集合を返す"""
+    edges = set()
+    for source in node_list:
+        if source.is_dummy:
+            continue
+        for target in source.targets:
+            while target.is_dummy:
+                target = next(iter(target.targets))
+            edges.add((source.name, target.name))
+    return edges
+
+
+def real_edges_of_components(nodes, edges):
+    """layout_components()の結果から、ダミーノードを辿った正規のノードの組の集合を返す"""
+    is_dummy = {name: dummy for name, _, _, _, dummy in nodes}
+    name2targets = dict()
+    for source, target in edges:
+        name2targets.setdefault(source, []).append(target)
+    real_edges = set()
+    for source, targets in name2targets.items():
+        if is_dummy[source]:
+            continue
+        for target in targets:
+            while is_dummy[target]:
+                target = name2targets[target][0]
+            real_edges.add((source, target))
+    return real_edges
+
+
+def count_cross_of_components(nodes, edges):
+    """layout_components()の結果の交差数を、Nodeオブジェクトに戻してcount_cross_by_inversion()で数える"""
+    name2node = {name: create_graph.Node(name, x=x, y=y, is_dummy=is_dummy) for name, _, x, y, is_dummy in nodes}
+    for source, target in edges:
+        name2node[source].targets.add(name2node[target])
+        name2node[target].sources.add(name2node[source])
+    return create_graph.count_cross_by_inversion(list(name2node.values()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="弱連結成分ごとの階層化のベンチマーク")
+    parser.add_argument("--giant", type=int, default=5000, help="巨大な成分のノード数")
+    parser.add_argument("--small", type=int, default=300, help="小さい成分の数")
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}),
+                        help="成分ごとの階層化に用いるプロセス数")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    graphs = [mml_like_dag(args.giant)]
+    graphs += [random_layered_dag(rng.randint(5, 60), rng.randint(2, 6), 3, seed=i) for i in range(args.small)]
+    input_node_dict = create_graph.shuffle_dict(disjoint_union(graphs), rng)
+    print(f"nodes: {len(input_node_dict)}, components: {len(component_layout.split_components(input_node_dict))}")
+
+    start = time.perf_counter()
+    node_list = create_graph.create_layout(input_node_dict)
+    whole_time = time.perf_counter() - start
+    expected_edges = real_edges_of_whole(node_list)
+    print(f"{'method':<16}{'time [s]':>10}{'crossings':>12}")
+    print(f"{'whole':<16}{whole_time:>10.3f}{create_graph.count_cross_by_inversion(node_list):>12}")
+
+    for workers in args.workers:
+        start = time.perf_counter()
+        nodes, edges = component_layout.layout_components(input_node_dict, workers=workers)
+        elapsed = time.perf_counter() - start
+        assert len({(x, y) for _, _, x, y, _ in nodes}) == len(nodes), "ノードの位置が重なっています"
+        assert len({name for name, _, _, _, _ in nodes}) == len(nodes), "ノードの名前が重なっています"
+        assert real_edges_of_components(nodes, edges) == expected_edges, "エッジが一致しません"
+        label = f"components x{workers}"
+        print(f"{label:<16}{elapsed:>10.3f}{count_cross_of_components(nodes, edges):>12}")
+
+
+if __name__ == "__main__":
+    main()
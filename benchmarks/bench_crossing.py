@@ -0,0 +1,92 @@
+"""
+交差数の数え上げのベンチマーク
+count_cross()(全てのエッジの対を比較)とcount_cross_by_inversion()(転倒数、Fenwick木)について
+・ランダムな階層グラフで交差数が一致すること
+・エッジ数の多い2階層のグラフでの実行時間
+を確認する。
+
+使い方:
+    python benchmarks/bench_crossing.py [--edges 1000 5000 20000 50000]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "demo"))
+import create_graph  # noqa: E402
+from dag_generators import random_layered_dag  # noqa: E402
+
+
+def validate(graph_count, seed=0):
+    """
+    ランダムな階層グラフで2つの方法の交差数が一致することを確認する。
+    x座標が重なる場合も確認するため、半分のグラフではx座標を狭い範囲からランダムに選ぶ。
+    Args:
+        graph_count: 確認するグラフの数
+        seed: 乱数のシード
+    """
+    rng = random.Random(seed)
+    for i in range(graph_count):
+        input_node_dict = random_layered_dag(rng.randint(10, 200), rng.randint(2, 8), rng.randint(1, 4),
+                                             long_edge_ratio=0.3, seed=rng.random())
+        node_list = create_graph.create_node_list(input_node_dict)
+        create_graph.assign_level(node_list)
+        create_graph.cut_edges_higher_than_1(node_list)
+        create_graph.assign_x_sequentially(node_list)
+        if i % 2:
+            for node in node_list:
+                node.x = rng.randint(0, 5)
+        expected = create_graph.count_cross(node_list)
+        assert create_graph.count_cross_by_inversion(node_list) == expected, "交差数が一致しません"
+    print(f"validated on {graph_count} random layered graphs")
+
+
+def two_level_graph(node_count, edge_count, seed=0):
+    """
+    上下の階層にnode_count個ずつノードを置き、その間にランダムなエッジを張る。
+    Args:
+        node_count: 各階層のノード数
+        edge_count: エッジ数
+        seed: 乱数のシード
+    Return:
+        Nodeオブジェクトのリスト
+    """
+    rng = random.Random(seed)
+    upper = [create_graph.Node(f"u{i}", x=i, y=0) for i in range(node_count)]
+    lower = [create_graph.Node(f"l{i}", x=i, y=1) for i in range(node_count)]
+    edges = set()
+    while len(edges) < edge_count:
+        edges.add((rng.choice(lower), rng.choice(upper)))
+    create_graph.add_edges(edges)
+    return upper + lower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="交差数の数え上げのベンチマーク")
+    parser.add_argument("--edges", type=int, nargs="+", default=[1000, 5000, 20000, 50000], help="エッジ数")
+    parser.add_argument("--max-quadratic-edges", type=int, default=5000,
+                        help="これよりエッジ数が多いグラフではcount_cross()を計測しない")
+    parser.add_argument("--graphs", type=int, default=200, help="交差数の一致を確認するグラフの数")
+    args = parser.parse_args()
+
+    validate(args.graphs)
+
+    print(f"{'edges':>8}{'crossings':>14}{'count_cross [s]':>18}{'by_inversion [s]':>18}")
+    for edge_count in args.edges:
+        node_list = two_level_graph(max(10, edge_count // 4), edge_count)
+        start = time.perf_counter()
+        crossings = create_graph.count_cross_by_inversion(node_list)
+        inversion_time = time.perf_counter() - start
+        if edge_count <= args.max_quadratic_edges:
+            start = time.perf_counter()
+            assert create_graph.count_cross(node_list) == crossings, "交差数が一致しません"
+            quadratic_text = f"{time.perf_counter() - start:>18.3f}"
+        else:
+            quadratic_text = f"{'skipped':>18}"
+        print(f"{edge_count:>8}{crossings:>14}{quadratic_text}{inversion_time:>18.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+依存関係の部分グラフの問い合わせのベンチマーク
+dependency_query.DependencyIndexについて、索引の作成時間と、問い合わせ(全祖先、全子孫、k段の近傍)ごとの
+部分グラフの取り出しのレイテンシ(p50, p99)、取り出した部分グラフの階層化を含むレイテンシを表示する。
+比較のため、グラフ全体を階層化する時間も表示する。
+取り出した部分グラフが、input_node_dictを素朴に探索した結果と一致することも確認する。
+
+使い方:
+    python benchmarks/bench_dependency_query.py [--mml mmlディレクトリのパス] [--nodes 1500] [--queries 200]
+"""
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "demo"))
+import dependency_query  # noqa: E402
+import layout_pipeline  # noqa: E402
+import retrieve_environment  # noqa: E402
+from dag_generators import mml_like_dag  # noqa: E402
+
+QUERIES = [
+    ("ancestors", None),
+    ("descendants", None),
+    ("ancestors", 2),
+    ("descendants", 2),
+    ("both", 1),
+]
+
+
+def naive_query(input_node_dict, name, depth, direction):
+    """input_node_dictを毎回幅優先探索して、DependencyIndex.query()と同じ部分グラフを作る"""
+    name2sources = {other: set() for other in input_node_dict}
+    for source, (targets, _) in input_node_dict.items():
+        for target in targets:
+            name2sources[target].add(source)
+    reached = {name}
+    frontier = [name]
+    distance = 0
+    while frontier and (depth is None or distance < depth):
+        next_frontier = []
+        for current in frontier:
+            neighbors = set()
+            if direction in ("ancestors", "both"):
+                neighbors |= input_node_dict[current][0]
+            if direction in ("descendants", "both"):
+                neighbors |= name2sources[current]
+            for neighbor in neighbors - reached:
+                reached.add(neighbor)
+                next_frontier.append(neighbor)
+        frontier = next_frontier
+        distance += 1
+    return {other: [targets & reached, href] for other, (targets, href) in input_node_dict.items() if other in reached}
+
+
+def percentile(sorted_values, p):
+    """昇順に並んだ値のpパーセンタイル(nearest-rank)を返す"""
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="依存関係の部分グラフの問い合わせのベンチマーク")
+    parser.add_argument("--mml", help="mizファイルが置かれたディレクトリ。指定しない場合はmml_like_dag()を用いる")
+    parser.add_argument("--nodes", type=int, default=1500, help="合成するDAGのノード数")
+    parser.add_argument("--queries", type=int, default=200, help="問い合わせの種類ごとの回数")
+    parser.add_argument("--layouts", type=int, default=20, help="階層化を含めて計測する問い合わせの種類ごとの回数")
+    parser.add_argument("--validations", type=int, default=20, help="素朴な探索と比較する問い合わせの種類ごとの回数")
+    args = parser.parse_args()
+
+    if args.mml:
+        miz_files_dict = retrieve_environment.make_library_dependency(args.mml)
+        input_node_dict = retrieve_environment.create_input_node_dict(
+            miz_files_dict, [category for category in retrieve_environment.CATEGORIES if category != "vocabularies"])
+    else:
+        input_node_dict = mml_like_dag(args.nodes)
+
+    start = time.perf_counter()
+    index = dependency_query.DependencyIndex(input_node_dict)
+    build_time = time.perf_counter() - start
+    pipeline = layout_pipeline.LayoutPipeline()
+    start = time.perf_counter()
+    pipeline.run(input_node_dict)
+    full_time = time.perf_counter() - start
+    edge_count = sum(len(targets) for targets, _ in input_node_dict.values())
+    print(f"nodes: {len(input_node_dict)}, edges: {edge_count}, index: {build_time:.3f} s, "
+          f"full layout: {full_time:.3f} s")
+
+    rng = random.Random(0)
+    names = list(input_node_dict)
+    print(f"{'query':<16}{'nodes':>8}{'p50 [ms]':>10}{'p99 [ms]':>10}{'+layout p50 [ms]':>18}")
+    for direction, depth in QUERIES:
+        for name in rng.sample(names, min(args.validations, len(names))):
+            assert index.query(name, depth, direction) == naive_query(input_node_dict, name, depth, direction), \
+                f"{name}の{direction}(depth={depth})が素朴な探索と一致しません"
+
+        latencies = []
+        sizes = []
+        for name in (rng.choice(names) for _ in range(args.queries)):
+            start = time.perf_counter()
+            subgraph = index.query(name, depth, direction)
+            latencies.append(time.perf_counter() - start)
+            sizes.append(len(subgraph))
+        layout_latencies = []
+        for name in (rng.choice(names) for _ in range(args.layouts)):
+            start = time.perf_counter()
+            dependency_query.layout_query(index, name, depth, direction, pipeline)
+            layout_latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        layout_latencies.sort()
+        label = direction if depth is None else f"{direction} k={depth}"
+        print(f"{label:<16}{sum(sizes) / len(sizes):>8.0f}{percentile(latencies, 50) * 1000:>10.3f}"
+              f"{percentile(latencies, 99) * 1000:>10.3f}{percentile(layout_latencies, 50) * 1000:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
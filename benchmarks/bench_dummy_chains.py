@@ -0,0 +1,88 @@
+"""
+ダミーの挿入の方法のベンチマーク
+cut_edges_higher_than_1()(1階層ごとにダミーノード、"nodes")とcut_edges_into_chains()(長いエッジ1本ごとに
+DummyChain、"chains")について、作成したオブジェクトの数、ダミーの挿入後に保持するメモリ、各段階の実行時間を比較する。
+2つの方法で出力するJSONとretrieve_nodes_connected_by_dummy()の結果が一致することも確認する。
+
+使い方:
+    python benchmarks/bench_dummy_chains.py [--mml mmlディレクトリのパス] [--nodes 5000]
+"""
+import argparse
+import io
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "demo"))
+import create_graph  # noqa: E402
+import retrieve_environment  # noqa: E402
+from dag_generators import mml_like_dag  # noqa: E402
+
+
+def measure_insertion_memory(input_node_dict, method):
+    """
+    ダミーの挿入の前後で増えたメモリ(挿入したダミーが保持するメモリ)を計測する。
+    Return:
+        (増えたメモリ[バイト], Nodeオブジェクトの数, DummyChainオブジェクトの数)
+    """
+    node_list = create_graph.create_node_list(input_node_dict)
+    create_graph.reduce_dependency(node_list)
+    create_graph.assign_level(node_list)
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    result = create_graph.insert_dummy_nodes(node_list, method=method)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    chain_count = len(result) if method == "chains" else 0
+    node_count = sum(isinstance(node, create_graph.Node) for node in node_list)
+    return after - before, node_count, chain_count
+
+
+def run_layout(input_node_dict, method, coordinate):
+    """
+    create_layout()を実行し、各段階の実行時間、JSON、ダミーで接続されていたノードのペアを返す。
+    """
+    profiler = create_graph.LayoutProfiler(measure_memory=False, measure_quality=False)
+    node_list = create_graph.create_layout(input_node_dict, dummy=method, coordinate=coordinate, profiler=profiler)
+    f = io.StringIO()
+    create_graph.write_cytoscape_json(node_list, f)
+    pairs = sorted((source.name, target.name)
+                   for source, target in create_graph.retrieve_nodes_connected_by_dummy(node_list))
+    return {record["stage"]: record["wall_time"] for record in profiler.stages}, f.getvalue(), pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ダミーの挿入の方法のベンチマーク")
+    parser.add_argument("--mml", help="mizファイルが置かれたディレクトリ。指定しない場合はmml_like_dag()を用いる")
+    parser.add_argument("--nodes", type=int, default=5000, help="合成するDAGのノード数")
+    parser.add_argument("--coordinate", choices=create_graph.COORDINATE_METHODS, default="priority",
+                        help="座標決定の方法")
+    args = parser.parse_args()
+
+    if args.mml:
+        miz_files_dict = retrieve_environment.make_library_dependency(args.mml)
+        input_node_dict = retrieve_environment.create_input_node_dict(miz_files_dict)
+        input_node_dict = create_graph.shuffle_dict(input_node_dict, random.Random(0))
+    else:
+        input_node_dict = mml_like_dag(args.nodes)
+
+    print(f"articles: {len(input_node_dict)}")
+    print(f"{'method':<8}{'Node objects':>14}{'chains':>10}{'memory [MB]':>14}")
+    for method in create_graph.DUMMY_METHODS:
+        memory, node_count, chain_count = measure_insertion_memory(input_node_dict, method)
+        print(f"{method:<8}{node_count:>14}{chain_count:>10}{memory / 2 ** 20:>14.2f}")
+
+    results = {method: run_layout(input_node_dict, method, args.coordinate) for method in create_graph.DUMMY_METHODS}
+    assert results["nodes"][1] == results["chains"][1], "JSONが一致しません"
+    assert results["nodes"][2] == results["chains"][2], "ダミーで接続されていたノードのペアが一致しません"
+
+    print(f"\n{'stage':<24}" + "".join(f"{method + ' [s]':>14}" for method in results))
+    for stage in results["nodes"][0]:
+        print(f"{stage:<24}" + "".join(f"{timings[stage]:>14.3f}" for timings, _, _ in results.values()))
+    print(f"{'total':<24}" + "".join(f"{sum(timings.values()):>14.3f}" for timings, _, _ in results.values()))
+
+
+if __name__ == "__main__":
+    main()
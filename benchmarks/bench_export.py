@@ -0,0 +1,78 @@
+"""
+cytoscape.js形式(JSON)の出力のベンチマーク
+networkxを経由する方法(create_dependency_graph(), nx.cytoscape_data(), json.dumps())と
+write_cytoscape_json()で直接書き出す方法の実行時間とメモリ使用量の最大値を比較する。
+
+使い方:
+    python benchmarks/bench_export.py [--edges 50000]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import networkx as nx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "demo"))
+import create_graph  # noqa: E402
+from dag_generators import random_layered_dag  # noqa: E402
+
+
+def export_via_networkx(node_list, path):
+    """変更前のmain()と同じく、networkxのグラフを経由してJSONを書き出す"""
+    graph = nx.DiGraph()
+    create_graph.create_dependency_graph(node_list, graph)
+    nx.set_node_attributes(graph, create_graph.node_list2node_dict(node_list))
+    with open(path, "w") as f:
+        f.write(json.dumps(nx.cytoscape_data(graph)))
+
+
+def export_directly(node_list, path):
+    """write_cytoscape_json()でJSONを書き出す"""
+    with open(path, "w") as f:
+        create_graph.write_cytoscape_json(node_list, f)
+
+
+def measure(export_func, node_list, path):
+    """
+    export_funcの実行時間とメモリ使用量の最大値を計測する。
+    tracemallocは実行時間に影響するため、実行時間とメモリ使用量は別々に計測する。
+    Return:
+        (実行時間[秒], メモリ使用量の最大値[バイト])
+    """
+    start = time.perf_counter()
+    export_func(node_list, path)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    export_func(node_list, path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSONの出力のベンチマーク")
+    parser.add_argument("--edges", type=int, default=50000, help="エッジ数の目安")
+    args = parser.parse_args()
+
+    input_node_dict = random_layered_dag(args.edges // 2, 10, 2, long_edge_ratio=0.0)
+    node_list = create_graph.create_node_list(input_node_dict)
+    create_graph.assign_level(node_list)
+    create_graph.assign_x_sequentially(node_list)
+    edge_count = sum(len(node.targets) for node in node_list)
+    print(f"nodes: {len(node_list)}, edges: {edge_count}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "graph.json")
+        print(f"{'method':<12}{'time [s]':>12}{'peak [MB]':>12}")
+        for label, export_func in (("networkx", export_via_networkx), ("direct", export_directly)):
+            elapsed, peak = measure(export_func, node_list, path)
+            print(f"{label:<12}{elapsed:>12.3f}{peak / 2 ** 20:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+インクリメンタルな階層化のベンチマーク
+前回の版のグラフをcreate_layout()で配置しておき、新しい版(articleの追加・削除)について
+    ・create_layout()で全体を配置し直す方法("full")
+    ・incremental_layout.relayout()で差分だけを反映する方法("incremental")
+の実行時間、交差数、前回から前後が入れ替わったノードの対の数、階層が変わったノードの数を比較する。
+relayout()の階層が最長パス法の階層と一致し、エッジ(ダミーノードを辿った正規のノードの組)が
+"full"と一致することも確認する。
+
+使い方:
+    python benchmarks/bench_incremental.py [--mml mmlディレクトリのパス] [--nodes 5000] [--added 10] [--removed 2]
+"""
+import argparse
+from collections import defaultdict
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "demo"))
+import create_graph  # noqa: E402
+import incremental_layout  # noqa: E402
+import retrieve_environment  # noqa: E402
+from dag_generators import mml_like_dag  # noqa: E402
+
+
+def make_versions(input_node_dict, added_count, removed_count, seed=0):
+    """
+    input_node_dictを新しい版とし、そこからadded_count個のarticleを除いた前回の版を作る。
+    除くarticleは、他のarticleから参照されていないもの(新しく追加されたarticleに当たる)から選ぶ。
+    さらに新しい版からremoved_count個の参照されていないarticleを削除する。
+    Return:
+        (前回の版のinput_node_dict, 新しい版のinput_node_dict)
+    """
+    rng = random.Random(seed)
+    referenced = {target for targets, _ in input_node_dict.values() for target in targets}
+    unreferenced = sorted(name for name in input_node_dict if name not in referenced)
+    chosen = rng.sample(unreferenced, added_count + removed_count)
+    added, removed = set(chosen[:added_count]), set(chosen[added_count:])
+    old_input_node_dict = {name: value for name, value in input_node_dict.items() if name not in added}
+    new_input_node_dict = {name: value for name, value in input_node_dict.items() if name not in removed}
+    return old_input_node_dict, new_input_node_dict
+
+
+def real_edges(node_list):
+    """ダミーノードを辿って、正規のノードの名前の組で表したエッジの集合を返す"""
+    edges = set()
+    for source in node_list:
+        if source.is_dummy:
+            continue
+        for target in source.targets:
+            while target.is_dummy:
+                target = next(iter(target.targets))
+            edges.add((source.name, target.name))
+    return edges
+
+
+def count_moved(previous_node_list, node_list):
+    """
+    前回の配置から、並びや階層が変わった正規のノードを数える。
+    挿入や削除でx座標がずれるのは避けられないため、同じ階層に残ったノードの対のうち
+    前後が入れ替わったものの数(転倒数)で並びの変化を測る。
+    Return:
+        (前後が入れ替わったノードの対の数, 階層が変わったノードの数)
+    """
+    name2position = {node.name: (node.x, node.y) for node in previous_node_list if not node.is_dummy}
+    level2positions = defaultdict(list)
+    moved_y = 0
+    for node in node_list:
+        if node.is_dummy or node.name not in name2position:
+            continue
+        x, y = name2position[node.name]
+        if node.y == y:
+            level2positions[y].append((x, node.x))
+        else:
+            moved_y += 1
+    swapped = sum(create_graph.count_inversions(positions) for positions in level2positions.values())
+    return swapped, moved_y
+
+
+def main():
+    parser = argparse.ArgumentParser(description="インクリメンタルな階層化のベンチマーク")
+    parser.add_argument("--mml", help="mizファイルが置かれたディレクトリ。指定しない場合はmml_like_dag()を用いる")
+    parser.add_argument("--nodes", type=int, default=5000, help="合成するDAGのノード数")
+    parser.add_argument("--added", type=int, default=10, help="新しい版で追加されたarticleの数")
+    parser.add_argument("--removed", type=int, default=2, help="新しい版で削除されたarticleの数")
+    parser.add_argument("--max-iterations", type=int, default=4, help="relayout()のスイープの回数の上限")
+    args = parser.parse_args()
+
+    if args.mml:
+        miz_files_dict = retrieve_environment.make_library_dependency(args.mml)
+        input_node_dict = retrieve_environment.create_input_node_dict(miz_files_dict)
+    else:
+        input_node_dict = mml_like_dag(args.nodes)
+    input_node_dict = create_graph.shuffle_dict(input_node_dict, random.Random(0))
+    old_input_node_dict, new_input_node_dict = make_versions(input_node_dict, args.added, args.removed)
+    previous_node_list = create_graph.create_layout(old_input_node_dict)
+    delta = incremental_layout.diff_input_node_dicts(old_input_node_dict, new_input_node_dict)
+
+    start = time.perf_counter()
+    full_node_list = create_graph.create_layout(new_input_node_dict)
+    full_time = time.perf_counter() - start
+    start = time.perf_counter()
+    node_list, touched_levels, _ = incremental_layout.relayout(previous_node_list, old_input_node_dict, delta,
+                                                               max_iterations=args.max_iterations)
+    incremental_time = time.perf_counter() - start
+
+    expected_levels = create_graph.create_node_list(new_input_node_dict)
+    create_graph.assign_level(expected_levels)
+    assert ({node.name: node.y for node in node_list if not node.is_dummy}
+            == {node.name: node.y for node in expected_levels}), "階層が最長パス法と一致しません"
+    assert real_edges(node_list) == real_edges(full_node_list), "エッジが一致しません"
+
+    level_count = len(create_graph.divide_nodes_by_level(node_list))
+    print(f"articles: {len(old_input_node_dict)} -> {len(new_input_node_dict)} "
+          f"(+{len(delta.added_nodes)} -{len(delta.removed_nodes)}), touched levels: {len(touched_levels)}/{level_count}")
+    print(f"{'method':<12}{'time [s]':>10}{'crossings':>12}{'swapped pairs':>16}{'moved y':>10}")
+    for label, elapsed, result in (("full", full_time, full_node_list),
+                                   ("incremental", incremental_time, node_list)):
+        swapped, moved_y = count_moved(previous_node_list, result)
+        print(f"{label:<12}{elapsed:>10.3f}{create_graph.count_cross_by_inversion(result):>12}"
+              f"{swapped:>16}{moved_y:>10}")
+
+
+if __name__ == "__main__":
+    main()
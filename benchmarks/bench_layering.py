@@ -0,0 +1,81 @@
+"""
+階層割当のベンチマーク
+assign_top_node()(再帰、"recursive")とassign_level_topologically()(Kahnのアルゴリズム、"topological")
+の実行時間を、ひし形を縦につなげたDAG(diamond ladder)とMMLの依存関係のグラフで比較する。
+両者の階層が一致することも確認する。
+
+使い方:
+    python benchmarks/bench_layering.py [--mml mmlディレクトリのパス]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "demo"))
+import create_graph  # noqa: E402
+import retrieve_environment  # noqa: E402
+from dag_generators import diamond_ladder  # noqa: E402
+
+
+def time_layering(input_node_dict, method):
+    """
+    methodで階層割当を行い、実行時間と割り当てた階層を返す。
+    再帰の深さが上限を超えた場合は、実行時間の代わりにNoneを返す。
+    Args:
+        input_node_dict: 入力するグラフ
+        method: create_graph.LAYERING_METHODSのkey
+    Return:
+        (実行時間[秒]またはNone, key=ノードの名前, value=階層 の辞書)
+    """
+    # 冗長なエッジを間引いても最長パスの階層は変わらないため、間引きは行わない
+    node_list = create_graph.create_node_list(input_node_dict)
+    start = time.perf_counter()
+    try:
+        create_graph.assign_level(node_list, method=method)
+    except RecursionError:
+        return None, {}
+    return time.perf_counter() - start, {node.name: node.y for node in node_list}
+
+
+def compare(label, input_node_dict, run_recursive=True):
+    """
+    2つの方法の実行時間を表示する。
+    Args:
+        label: 表示するグラフの名前
+        input_node_dict: 入力するグラフ
+        run_recursive: Falseなら"recursive"の計測を省略する
+    """
+    topological_time, topological_levels = time_layering(input_node_dict, "topological")
+    if run_recursive:
+        recursive_time, recursive_levels = time_layering(input_node_dict, "recursive")
+        if recursive_time is not None:
+            assert recursive_levels == topological_levels, "階層が一致しません"
+        recursive_text = "RecursionError" if recursive_time is None else f"{recursive_time:.4f}"
+    else:
+        recursive_text = "skipped"
+    print(f"{label:<24}{len(input_node_dict):>8}{recursive_text:>16}{topological_time:>16.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="階層割当のベンチマーク")
+    parser.add_argument("--mml", help="mizファイルが置かれたディレクトリ。指定した場合はMMLのグラフも計測する")
+    parser.add_argument("--rungs", type=int, nargs="+", default=[4, 8, 12, 16, 18, 20, 1000, 10000],
+                        help="diamond ladderの段数")
+    parser.add_argument("--max-recursive-rungs", type=int, default=20,
+                        help="これより段数が多いdiamond ladderでは\"recursive\"を計測しない")
+    args = parser.parse_args()
+
+    print(f"{'graph':<24}{'nodes':>8}{'recursive [s]':>16}{'topological [s]':>16}")
+    for rung_count in args.rungs:
+        compare(f"diamond ladder {rung_count}", diamond_ladder(rung_count),
+                run_recursive=rung_count <= args.max_recursive_rungs)
+
+    if args.mml:
+        miz_files_dict = retrieve_environment.make_library_dependency(args.mml)
+        compare("MML", retrieve_environment.create_input_node_dict(miz_files_dict))
+
+
+if __name__ == "__main__":
+    main()
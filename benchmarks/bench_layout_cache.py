@@ -0,0 +1,78 @@
+"""
+階層化の結果のキャッシュのベンチマーク
+同じ入力について、階層化を行う場合(miss)、メモリ上の層で見つかる場合(memory hit)、
+ディスク上の層で見つかる場合(disk hit)の実行時間を比較する。
+3つの場合で同じ結果が返ること、LRUとディスクの大きさの上限による削除が働くことも確認する。
+
+使い方:
+    python benchmarks/bench_layout_cache.py [--nodes 2000]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "demo"))
+import layout_cache  # noqa: E402
+from dag_generators import mml_like_dag, random_layered_dag  # noqa: E402
+
+
+def validate_eviction(directory):
+    """
+    LRUの上限とディスクの大きさの上限による削除を確認する。
+    """
+    graphs = [random_layered_dag(50, 5, seed=seed) for seed in range(4)]
+    with layout_cache.LayoutCache(max_entries=2) as cache:
+        for graph in graphs[:3]:
+            cache.layout(graph)
+        cache.layout(graphs[1])
+        assert cache.stats()["evictions"] == 1 and cache.stats()["hits"] == 1
+        cache.layout(graphs[0])
+        assert cache.stats()["misses"] == 4, "LRUで削除した結果が残っています"
+
+    path = os.path.join(directory, "small.sqlite")
+    entry_size = len(zlib.compress(json.dumps(layout_cache.compute_layout(graphs[0])).encode()))
+    with layout_cache.LayoutCache(max_entries=1, path=path, max_disk_bytes=int(entry_size * 2.5)) as cache:
+        for graph in graphs:
+            cache.layout(graph)
+        stats = cache.stats()
+        assert stats["disk_bytes"] <= cache.max_disk_bytes and stats["disk_evictions"] > 0
+        assert cache.get(layout_cache.fingerprint(graphs[0])) is None, "古い結果がディスクに残っています"
+        assert cache.get(layout_cache.fingerprint(graphs[3])) is not None
+    print("validated LRU and disk size eviction")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="階層化の結果のキャッシュのベンチマーク")
+    parser.add_argument("--nodes", type=int, default=2000, help="合成するDAGのノード数")
+    args = parser.parse_args()
+
+    input_node_dict = mml_like_dag(args.nodes)
+    with tempfile.TemporaryDirectory() as directory:
+        validate_eviction(directory)
+        path = os.path.join(directory, "layout.sqlite")
+        results = []
+        with layout_cache.LayoutCache(path=path) as cache:
+            for label in ("miss", "memory hit"):
+                start = time.perf_counter()
+                entry = cache.layout(input_node_dict)
+                results.append((label, time.perf_counter() - start, entry))
+        with layout_cache.LayoutCache(path=path) as cache:
+            start = time.perf_counter()
+            entry = cache.layout(input_node_dict)
+            results.append(("disk hit", time.perf_counter() - start, entry))
+            stats = cache.stats()
+        assert all(entry == results[0][2] for _, _, entry in results), "キャッシュの結果が一致しません"
+
+    print(f"nodes: {args.nodes}, disk entry: {stats['disk_bytes'] / 2 ** 10:.1f} KB")
+    print(f"{'case':<12}{'time [s]':>12}")
+    for label, elapsed, _ in results:
+        print(f"{label:<12}{elapsed:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
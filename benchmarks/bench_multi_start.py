@@ -0,0 +1,59 @@
+"""
+マルチスタートの交差削減のベンチマーク
+multi_start.multi_start_layout()のスタートの回数を変えて、最もよい結果の交差数、エッジの長さの総和、実行時間を表示する。
+同じシードで2回実行して同じ配置になること、スタート0がcreate_layout()と同じ配置になることも確認する。
+
+使い方:
+    python benchmarks/bench_multi_start.py [--mml mmlディレクトリのパス] [--nodes 1000] [--starts 1 4 8 16]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "demo"))
+import create_graph  # noqa: E402
+import multi_start  # noqa: E402
+import retrieve_environment  # noqa: E402
+from dag_generators import mml_like_dag  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="マルチスタートの交差削減のベンチマーク")
+    parser.add_argument("--mml", help="mizファイルが置かれたディレクトリ。指定しない場合はmml_like_dag()を用いる")
+    parser.add_argument("--nodes", type=int, default=1000, help="合成するDAGのノード数")
+    parser.add_argument("--starts", type=int, nargs="+", default=[1, 4, 8, 16], help="スタートの回数")
+    parser.add_argument("--workers", type=int, help="用いるプロセス数。省略時はCPU数")
+    parser.add_argument("--time-budget", type=float, help="経過時間の上限(秒)")
+    args = parser.parse_args()
+
+    if args.mml:
+        miz_files_dict = retrieve_environment.make_library_dependency(args.mml)
+        input_node_dict = retrieve_environment.create_input_node_dict(miz_files_dict)
+    else:
+        input_node_dict = mml_like_dag(args.nodes)
+    input_node_dict = create_graph.shuffle_dict(input_node_dict, random.Random(0))
+
+    single = create_graph.create_layout(input_node_dict)
+    single_x = [node.x for node in single]
+    node_list, summary = multi_start.multi_start_layout(input_node_dict, starts=1, workers=1)
+    assert [node.x for node in node_list] == single_x, "スタート0がcreate_layout()と一致しません"
+
+    print(f"{'starts':>8}{'done':>6}{'best':>6}{'crossings':>12}{'edge length':>14}{'time [s]':>10}")
+    for starts in args.starts:
+        start = time.perf_counter()
+        node_list, summary = multi_start.multi_start_layout(input_node_dict, starts=starts, workers=args.workers,
+                                                            time_budget=args.time_budget)
+        elapsed = time.perf_counter() - start
+        if args.time_budget is None:
+            again, _ = multi_start.multi_start_layout(input_node_dict, starts=starts, workers=args.workers)
+            assert [node.x for node in again] == [node.x for node in node_list], "同じシードで配置が一致しません"
+        best_index, best_cross, best_length = min(summary, key=lambda result: (result[1], result[2], result[0]))
+        assert create_graph.count_cross_by_inversion(node_list) == best_cross
+        print(f"{starts:>8}{len(summary):>6}{best_index:>6}{best_cross:>12}{best_length:>14.1f}{elapsed:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
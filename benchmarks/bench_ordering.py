@@ -0,0 +1,74 @@
+"""
+交差削減の並べ替えのベンチマーク
+sort_nodes_by_xcenter_once()("single")とreduce_cross_by_xcenter()("iterated")の
+交差数と実行時間を比較し、"iterated"のスイープごとの交差数(経過時間とともに)を表示する。
+スイープの回数や時間の上限(time_budget)を決める際に用いる。
+
+使い方:
+    python benchmarks/bench_ordering.py [--mml mmlディレクトリのパス] [--nodes 3000]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "demo"))
+import create_graph  # noqa: E402
+import retrieve_environment  # noqa: E402
+from dag_generators import random_layered_dag  # noqa: E402
+
+
+def prepare_node_list(input_node_dict):
+    """
+    交差削減の前までの段階(間引き、階層割当、ダミーノードの挿入)を行ったノードのリストを返す。
+    """
+    node_list = create_graph.create_node_list(input_node_dict)
+    create_graph.reduce_dependency(node_list)
+    create_graph.assign_level(node_list)
+    create_graph.assign_x_sequentially(node_list)
+    create_graph.cut_edges_higher_than_1(node_list)
+    create_graph.assign_x_sequentially(node_list)
+    return node_list
+
+
+def main():
+    parser = argparse.ArgumentParser(description="交差削減の並べ替えのベンチマーク")
+    parser.add_argument("--mml", help="mizファイルが置かれたディレクトリ。指定しない場合は合成したDAGを用いる")
+    parser.add_argument("--nodes", type=int, default=3000, help="合成するDAGのノード数")
+    parser.add_argument("--levels", type=int, default=12, help="合成するDAGの階層数")
+    parser.add_argument("--max-iterations", type=int, default=24, help="スイープの回数の上限")
+    parser.add_argument("--time-budget", type=float, help="\"iterated\"の経過時間の上限(秒)")
+    args = parser.parse_args()
+
+    if args.mml:
+        miz_files_dict = retrieve_environment.make_library_dependency(args.mml)
+        input_node_dict = retrieve_environment.create_input_node_dict(miz_files_dict)
+    else:
+        input_node_dict = random_layered_dag(args.nodes, args.levels, 3, long_edge_ratio=0.3)
+
+    node_list = prepare_node_list(input_node_dict)
+    initial_x = [node.x for node in node_list]
+    print(f"nodes with dummies: {len(node_list)}")
+
+    start = time.perf_counter()
+    create_graph.sort_nodes_by_xcenter_once(node_list)
+    single_time = time.perf_counter() - start
+    single_cross = create_graph.count_cross_by_inversion(node_list)
+
+    for node, x in zip(node_list, initial_x):
+        node.x = x
+    start = time.perf_counter()
+    history = create_graph.reduce_cross_by_xcenter(node_list, args.max_iterations, args.time_budget)
+    iterated_time = time.perf_counter() - start
+    iterated_cross = create_graph.count_cross_by_inversion(node_list)
+
+    print(f"single:   crossings {single_cross}, {single_time:.3f} s")
+    print(f"iterated: crossings {iterated_cross}, {iterated_time:.3f} s")
+    print(f"{'sweep':>6}{'elapsed [s]':>14}{'crossings':>14}")
+    for sweep, (elapsed, cross) in enumerate(history):
+        print(f"{sweep:>6}{elapsed:>14.3f}{cross:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+LayoutPipelineのベンチマーク
+layout_pipeline.LayoutPipeline.run()とcreate_graph.create_layout()の実行時間を比較する。
+・方法の組み合わせごとに、2つの出力(cytoscape.js形式のJSON)が一致すること
+・同じパイプラインを同じプロセスで繰り返し実行しても、同じ結果になること(状態が残らないこと)
+・register()で追加した方法が、他のパイプラインに影響しないこと
+も確認する。
+
+使い方:
+    python benchmarks/bench_pipeline.py [--nodes 2000] [--repeat 5]
+"""
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "demo"))
+import create_graph  # noqa: E402
+import layout_pipeline  # noqa: E402
+from dag_generators import mml_like_dag, random_layered_dag  # noqa: E402
+
+OPTION_SETS = [
+    dict(),
+    dict(dummy="chains", ordering="single"),
+    dict(reduction="ancestors", coordinate="priority"),
+    dict(coordinate="brandes-koepf"),
+]
+
+
+def create_layout_json(input_node_dict, options):
+    """create_layout()の結果をcytoscape.js形式のJSON文字列にする"""
+    f = io.StringIO()
+    create_graph.write_cytoscape_json(create_graph.create_layout(input_node_dict, **options), f)
+    return f.getvalue()
+
+
+def validate(input_node_dict):
+    """create_layout()との一致、繰り返し実行での一致、方法の追加の独立性、計測結果の範囲を確認する"""
+    for options in OPTION_SETS:
+        pipeline = layout_pipeline.LayoutPipeline(**options)
+        results = [pipeline.run(input_node_dict) for _ in range(2)]
+        expected = create_layout_json(input_node_dict, options)
+        assert all(layout_pipeline.layout_result2json(result) == expected for result in results), \
+            f"{options}でcreate_layout()の結果と一致しません"
+
+    edges = [(source, target) for source, (targets, _) in input_node_dict.items() for target in sorted(targets)]
+    result = layout_pipeline.LayoutPipeline().run(edges)
+    # エッジのリストには孤立したノードが現れない
+    assert {node.name for node in result.nodes if not node.is_dummy} == {name for edge in edges for name in edge}
+
+    custom = layout_pipeline.LayoutPipeline()
+    custom.register("coordinate", "double", lambda node_list: [setattr(node, "x", node.x * 2) for node in node_list])
+    custom.set_method("coordinate", "double")
+    default = layout_pipeline.LayoutPipeline()
+    assert "double" not in default.registries["coordinate"]
+    assert "double" not in create_graph.COORDINATE_METHODS
+    doubled = custom.run(input_node_dict)
+    plain = default.run(input_node_dict)
+    assert [node.x for node in doubled.nodes] == [node.x * 2 for node in plain.nodes]
+
+    # 使い回したLayoutProfilerでも、timingsとordering_historyはその呼び出しの段階のみになる
+    profiler = create_graph.LayoutProfiler(measure_memory=False, measure_quality=False)
+    first, second = (default.run(input_node_dict, profiler=profiler) for _ in range(2))
+    assert len(profiler.stages) == 2 * len(second.timings) == 2 * len(plain.timings)
+    assert len(second.ordering_history) == len(first.ordering_history) == len(plain.ordering_history)
+    print(f"validated {len(OPTION_SETS)} method combinations, edge list input, registries and reused profilers")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LayoutPipelineのベンチマーク")
+    parser.add_argument("--nodes", type=int, default=2000, help="合成するDAGのノード数")
+    parser.add_argument("--repeat", type=int, default=5, help="計測する回数")
+    args = parser.parse_args()
+
+    validate(random_layered_dag(300, 8, 3, seed=1))
+
+    input_node_dict = mml_like_dag(args.nodes)
+    pipeline = layout_pipeline.LayoutPipeline()
+    timings = {"create_layout": [], "LayoutPipeline": []}
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        create_graph.create_layout(input_node_dict)
+        timings["create_layout"].append(time.perf_counter() - start)
+        start = time.perf_counter()
+        pipeline.run(input_node_dict)
+        timings["LayoutPipeline"].append(time.perf_counter() - start)
+
+    print(f"nodes: {args.nodes}, repeat: {args.repeat}")
+    print(f"{'api':<16}{'min [s]':>10}{'max [s]':>10}")
+    for label, values in timings.items():
+        print(f"{label:<16}{min(values):>10.3f}{max(values):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+優先度順の座標決定のベンチマーク
+update_x_in_priority_order()(priority_reference.pyの以前の実装。nodes.index()とリストの探索、再帰)と
+update_x_in_priority_order_iteratively()(インデックスの辞書とフラグ、反復)について、
+ノード数の多い階層での実行時間を比較する。
+また、スイープごとの優先度と理想x座標の計算について、node2priority(), node2idealx()(Nodeオブジェクトごと)と
+compact_graph.calc_level_priorities(), calc_level_idealx()(階層ごとにNumPyでまとめて計算)の実行時間を、
+座標決定全体について"priority"と"priority-compact"の実行時間を比較する。
+計測の前にcheck_priority_placement.validate()で、ランダムな階層とランダムな階層グラフで
+割り当てたx座標が一致することを確認する。
+
+使い方:
+    python benchmarks/bench_priority_placement.py [--level-sizes 1000 5000 20000] [--nodes 50000] [--levels 10]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "demo"))
+import compact_graph  # noqa: E402
+import create_graph  # noqa: E402
+from check_priority_placement import random_level, random_levels, validate  # noqa: E402
+from dag_generators import random_layered_dag  # noqa: E402
+import priority_reference  # noqa: E402
+
+
+def run_on_level(update_func, node_count, seed):
+    """
+    random_level()で作った階層に対してupdate_funcを実行する。
+    Return:
+        (実行時間[秒], 名前の順に並べたx座標のリスト)
+    """
+    nodes, node2priority_dict, node2idealx_dict = random_level(node_count, random.Random(seed))
+    start = time.perf_counter()
+    update_func(nodes, node2priority_dict, node2idealx_dict)
+    elapsed = time.perf_counter() - start
+    return elapsed, [node.x for node in sorted(nodes, key=lambda node: node.name)]
+
+
+def time_sweeps(node_list):
+    """
+    上から下へ、下から上へのスイープごとに、全階層の優先度と理想x座標の計算時間を
+    Nodeオブジェクトごとの場合とCompactGraphの場合で比較して表示する。
+    """
+    graph = compact_graph.compact_graph_from_node_list(node_list)
+    level2ids = compact_graph.divide_nodes_by_level(graph)
+    level2nodes = {level: [node_list[i] for i in ids.tolist()] for level, ids in level2ids.items()}
+    print(f"{'sweep':<12}{'Node [s]':>12}{'Compact [s]':>14}{'speedup':>10}")
+    for downward in (True, False):
+        start = time.perf_counter()
+        node_results = [(create_graph.node2priority(nodes, downward), create_graph.node2idealx(nodes, downward))
+                        for nodes in level2nodes.values()]
+        node_time = time.perf_counter() - start
+        start = time.perf_counter()
+        compact_results = [(compact_graph.calc_level_priorities(graph, ids, downward),
+                            compact_graph.calc_level_idealx(graph, ids, downward))
+                           for ids in level2ids.values()]
+        compact_time = time.perf_counter() - start
+        assert ([list(node2idealx_dict.values()) for _, node2idealx_dict in node_results]
+                == [idealx.tolist() for _, idealx in compact_results]), "理想x座標が一致しません"
+        label = "downward" if downward else "upward"
+        print(f"{label:<12}{node_time:>12.3f}{compact_time:>14.3f}{node_time / compact_time:>9.1f}x")
+
+
+def time_coordinate(input_node_dict):
+    """
+    交差削減を済ませた同じノードのリストについて、"priority"と"priority-compact"の座標決定の実行時間を比較して表示する。
+    """
+    times = dict()
+    xs = dict()
+    for method in ("priority", "priority-compact"):
+        node_list = create_graph.create_layout(input_node_dict)
+        start = time.perf_counter()
+        create_graph.assign_coordinate(node_list, method=method)
+        times[method] = time.perf_counter() - start
+        xs[method] = [node.x for node in node_list]
+    assert xs["priority"] == xs["priority-compact"], "x座標が一致しません"
+    print(f"coordinate assignment: priority {times['priority']:.3f} s, "
+          f"priority-compact {times['priority-compact']:.3f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="優先度順の座標決定のベンチマーク")
+    parser.add_argument("--level-sizes", type=int, nargs="+", default=[1000, 5000, 20000], help="階層のノード数")
+    parser.add_argument("--max-recursive-size", type=int, default=5000,
+                        help="これよりノード数が多い階層ではupdate_x_in_priority_order()を計測しない")
+    parser.add_argument("--validations", type=int, default=200, help="x座標の一致を確認する階層の数")
+    parser.add_argument("--nodes", type=int, default=50000, help="スイープを計測する階層グラフのノード数")
+    parser.add_argument("--levels", type=int, default=10, help="スイープを計測する階層グラフの階層数")
+    args = parser.parse_args()
+
+    validate(args.validations)
+
+    print(f"{'nodes':>8}{'recursive [s]':>16}{'iterative [s]':>16}")
+    for node_count in args.level_sizes:
+        iterative_time, iterative_x = run_on_level(create_graph.update_x_in_priority_order_iteratively,
+                                                   node_count, seed=node_count)
+        if node_count <= args.max_recursive_size:
+            recursive_time, recursive_x = run_on_level(priority_reference.update_x_in_priority_order,
+                                                       node_count, seed=node_count)
+            assert recursive_x == iterative_x, "x座標が一致しません"
+            recursive_text = f"{recursive_time:>16.3f}"
+        else:
+            recursive_text = f"{'skipped':>16}"
+        print(f"{node_count:>8}{recursive_text}{iterative_time:>16.3f}")
+
+    input_node_dict = random_layered_dag(args.nodes, args.levels, 3, long_edge_ratio=0.2)
+    node_list = random_levels(input_node_dict, random.Random(0))
+    print(f"nodes with dummies: {len(node_list)}")
+    time_sweeps(node_list)
+    time_coordinate(input_node_dict)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+エッジの間引きのベンチマーク
+remove_redundant_dependency()(祖先の集合、"ancestors")と
+remove_redundant_dependency_by_bitset()(ビット集合、"bitset")の
+実行時間とメモリ使用量の最大値を比較し、取り除いたエッジが一致することを確認する。
+
+使い方:
+    python benchmarks/bench_reduction.py [--nodes 1000 5000 10000 20000]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "demo"))
+import create_graph  # noqa: E402
+from dag_generators import random_layered_dag  # noqa: E402
+
+
+def time_reduction(input_node_dict, method):
+    """
+    methodで間引きを行い、実行時間、メモリ使用量の最大値、残ったエッジを返す。
+    Args:
+        input_node_dict: 入力するグラフ
+        method: create_graph.REDUCTION_METHODSのkey
+    Return:
+        (実行時間[秒], メモリ使用量の最大値[バイト], 残ったエッジ(名前の組)の集合)
+    """
+    node_list = create_graph.create_node_list(input_node_dict)
+    tracemalloc.start()
+    start = time.perf_counter()
+    create_graph.reduce_dependency(node_list, method=method)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    edges = {(source.name, target.name) for source in node_list for target in source.targets}
+    return elapsed, peak, edges
+
+
+def main():
+    parser = argparse.ArgumentParser(description="エッジの間引きのベンチマーク")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1000, 5000, 10000, 20000], help="ノード数")
+    parser.add_argument("--levels", type=int, default=40, help="階層数")
+    parser.add_argument("--edges-per-node", type=int, default=4, help="1ノードあたりのエッジ数")
+    parser.add_argument("--max-ancestors-nodes", type=int, default=10000,
+                        help="これよりノード数が多いグラフでは\"ancestors\"を計測しない")
+    args = parser.parse_args()
+
+    print(f"{'nodes':>8}{'edges':>10}{'removed':>10}{'ancestors [s]':>16}{'peak [MB]':>12}"
+          f"{'bitset [s]':>14}{'peak [MB]':>12}")
+    for node_count in args.nodes:
+        input_node_dict = random_layered_dag(node_count, args.levels, args.edges_per_node, long_edge_ratio=0.5)
+        edge_count = sum(len(v[0]) for v in input_node_dict.values())
+        bitset_time, bitset_peak, bitset_edges = time_reduction(input_node_dict, "bitset")
+        if node_count <= args.max_ancestors_nodes:
+            ancestors_time, ancestors_peak, ancestors_edges = time_reduction(input_node_dict, "ancestors")
+            assert ancestors_edges == bitset_edges, "取り除いたエッジが一致しません"
+            ancestors_text = f"{ancestors_time:>16.3f}{ancestors_peak / 2 ** 20:>12.1f}"
+        else:
+            ancestors_text = f"{'skipped':>16}{'':>12}"
+        print(f"{node_count:>8}{edge_count:>10}{edge_count - len(bitset_edges):>10}{ancestors_text}"
+              f"{bitset_time:>14.3f}{bitset_peak / 2 ** 20:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
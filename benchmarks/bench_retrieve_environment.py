@@ -0,0 +1,135 @@
+"""
+環境部の取得(retrieve_environment.py)のベンチマーク
+・全文を読み込んでからextract_articles()で解析する方法
+・extract_articles_from_lines()で1行ずつ読み、beginで打ち切る方法
+の2つについて、mmlディレクトリ全体の読み込みバイト数と実行時間を比較する。
+また、make_library_dependency()のプロセス数ごとの実行時間と、
+キャッシュを用いた場合の初回・2回目の実行時間を計測する。
+
+使い方:
+    python benchmarks/bench_retrieve_environment.py [mmlディレクトリのパス]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import retrieve_environment  # noqa: E402
+
+
+def scan_whole_file(miz_files):
+    """
+    ファイル全体を読み込み、extract_articles()で環境部を解析する。
+    Args:
+        miz_files: mizファイルのパスのリスト
+    Return:
+        (読み込んだバイト数, 実行時間[秒], 解析結果のリスト)
+    """
+    bytes_read = 0
+    results = []
+    start = time.perf_counter()
+    for miz_file in miz_files:
+        with open(miz_file, "r", encoding="utf-8", errors="ignore") as f:
+            results.append(retrieve_environment.extract_articles(f.read()))
+            bytes_read += f.buffer.raw.tell()
+    return bytes_read, time.perf_counter() - start, results
+
+
+def scan_environ_only(miz_files):
+    """
+    ファイルを1行ずつ読み込み、beginで読み込みを打ち切って環境部を解析する。
+    読み込んだバイト数はOSから実際に読んだバイト数(バッファの先読み分を含む)とする。
+    Args:
+        miz_files: mizファイルのパスのリスト
+    Return:
+        (読み込んだバイト数, 実行時間[秒], 解析結果のリスト)
+    """
+    bytes_read = 0
+    results = []
+    start = time.perf_counter()
+    for miz_file in miz_files:
+        with open(miz_file, "r", encoding="utf-8", errors="ignore") as f:
+            results.append(retrieve_environment.extract_articles_from_lines(f))
+            bytes_read += f.buffer.raw.tell()
+    return bytes_read, time.perf_counter() - start, results
+
+
+def scale_workers(mml_directory, max_workers):
+    """
+    make_library_dependency()をプロセス数1, 2, 4, ...(max_workersまで)で実行し、実行時間を計測する。
+    Args:
+        mml_directory: mizファイルが置かれたディレクトリ
+        max_workers: 計測するプロセス数の上限
+    Return:
+        (プロセス数, 実行時間[秒])のタプルのリスト
+    """
+    worker_counts = []
+    workers = 1
+    while workers < max_workers:
+        worker_counts.append(workers)
+        workers *= 2
+    worker_counts.append(max_workers)
+
+    timings = []
+    for workers in worker_counts:
+        start = time.perf_counter()
+        retrieve_environment.make_library_dependency(mml_directory, workers=workers)
+        timings.append((workers, time.perf_counter() - start))
+    return timings
+
+
+def measure_cache(mml_directory):
+    """
+    一時ディレクトリにキャッシュを作り、make_library_dependency()の初回(cold)と
+    2回目(warm)の実行時間を計測する。
+    Args:
+        mml_directory: mizファイルが置かれたディレクトリ
+    Return:
+        (初回の実行時間[秒], 2回目の実行時間[秒])のタプル
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = Path(directory) / "environ_cache.sqlite3"
+        timings = []
+        for _ in range(2):
+            start = time.perf_counter()
+            retrieve_environment.make_library_dependency(mml_directory, cache_path=cache_path)
+            timings.append(time.perf_counter() - start)
+    return tuple(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="環境部の取得のベンチマーク")
+    parser.add_argument("mml_directory", nargs="?", default=str(retrieve_environment.MIZAR_LIBRARY_DIRECTORY_PATH),
+                        help="mizファイルが置かれたディレクトリ")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1,
+                        help="make_library_dependency()の計測に用いるプロセス数の上限")
+    args = parser.parse_args()
+
+    miz_files = sorted(Path(args.mml_directory).glob("*.miz"))
+    if not miz_files:
+        sys.exit(f"{args.mml_directory} に.mizファイルがありません")
+
+    whole_bytes, whole_time, whole_results = scan_whole_file(miz_files)
+    environ_bytes, environ_time, environ_results = scan_environ_only(miz_files)
+    assert whole_results == environ_results, "解析結果が一致しません"
+
+    print(f"articles: {len(miz_files)}")
+    print(f"{'method':<16}{'bytes read':>16}{'time [s]':>12}")
+    print(f"{'whole file':<16}{whole_bytes:>16,}{whole_time:>12.3f}")
+    print(f"{'environ only':<16}{environ_bytes:>16,}{environ_time:>12.3f}")
+    print(f"bytes ratio: {environ_bytes / whole_bytes:.4f}, speedup: {whole_time / environ_time:.1f}x")
+
+    print(f"{'workers':<16}{'time [s]':>12}{'speedup':>10}")
+    timings = scale_workers(args.mml_directory, args.max_workers)
+    for workers, elapsed in timings:
+        print(f"{workers:<16}{elapsed:>12.3f}{timings[0][1] / elapsed:>9.1f}x")
+
+    cold_time, warm_time = measure_cache(args.mml_directory)
+    print(f"cache cold: {cold_time:.3f} s, warm: {warm_time:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
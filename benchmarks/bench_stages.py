@@ -0,0 +1,195 @@
+"""
+階層化の段階ごとのベンチマーク
+合成したDAG(dag_generators.py)について、ノード数を変えながらcreate_graph.create_layout()の各段階
+(間引き、階層割当、ダミーノードの挿入、交差削減、座標決定)とJSONの出力の実行時間を計測する。
+計測結果はベースライン(JSON)として保存でき、保存したベースラインと比較して遅くなった段階を表示する。
+ノード数を変えたときの実行時間の増え方(両対数の傾き)も段階ごとに表示する。
+
+    段階                    関数
+    reduction               remove_redundant_dependency(_by_bitset)()
+    layering                assign_top_node() / assign_level_topologically()
+    dummy insertion         cut_edges_higher_than_1()
+    ordering                sort_nodes_by_xcenter()の繰り返し
+    coordinate assignment   move_node_closer_to_connected_nodes()
+    export                  write_cytoscape_json()
+
+使い方:
+    python benchmarks/bench_stages.py [--sizes 100 1000 10000 50000] [--generators layered wide deep mml]
+    python benchmarks/bench_stages.py --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_stages.py --compare benchmarks/baseline.json
+"""
+import argparse
+import io
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "demo"))
+import create_graph  # noqa: E402
+from dag_generators import deep_narrow_dag, mml_like_dag, random_layered_dag, wide_shallow_dag  # noqa: E402
+
+GENERATORS = {
+    "layered": lambda node_count, seed: random_layered_dag(node_count, max(2, round(math.sqrt(node_count) / 2)), 3,
+                                                           seed=seed),
+    "wide": lambda node_count, seed: wide_shallow_dag(node_count, seed=seed),
+    "deep": lambda node_count, seed: deep_narrow_dag(node_count, seed=seed),
+    "mml": lambda node_count, seed: mml_like_dag(node_count, seed=seed),
+}
+
+# ノード数がこれを超える場合は計測しない方法。"ancestors"は祖先の集合でメモリを、"recursive"は経路数の時間を要する
+# (deepでは200ノードで既に数十秒かかる)
+METHOD_MAX_NODES = {
+    ("reduction", "ancestors"): 5000,
+    ("layering", "recursive"): 100,
+}
+
+
+def run_stages(input_node_dict, options):
+    """
+    create_layout()の各段階とJSONの出力を実行し、実行時間を計測する。
+    Args:
+        input_node_dict: 入力するグラフ
+        options: create_layout()に渡す方法の辞書(reduction, layering, ordering, coordinate)
+    Return:
+        key=段階の名前, value=実行時間[秒] と、nodes(ダミーノードを含むノード数)、dummies、crossingsの辞書
+    """
+    profiler = create_graph.LayoutProfiler(measure_memory=False, measure_quality=False)
+    node_list = create_graph.create_layout(input_node_dict, profiler=profiler, **options)
+    result = {record["stage"]: record["wall_time"] for record in profiler.stages}
+    start = time.perf_counter()
+    create_graph.write_cytoscape_json(node_list, io.StringIO())
+    result["export"] = time.perf_counter() - start
+    result["nodes"] = len(node_list)
+    result["dummies"] = sum(node.is_dummy for node in node_list)
+    result["crossings"] = create_graph.count_cross_by_inversion(node_list)
+    return result
+
+
+def run_benchmark(generators, sizes, options, repeat=1, seed=0):
+    """
+    各生成方法とノード数についてrun_stages()を実行する。repeat回実行し、段階ごとに最小値をとる。
+    Return:
+        results[生成方法][ノード数(str)] = run_stages()の結果
+    """
+    results = {}
+    for generator in generators:
+        results[generator] = {}
+        for node_count in sizes:
+            skipped = [f"{stage}={method}" for (stage, method), max_nodes in METHOD_MAX_NODES.items()
+                       if options[stage] == method and node_count > max_nodes]
+            if skipped:
+                print(f"{generator:<10}{node_count:>8}  skipped ({', '.join(skipped)})", file=sys.stderr)
+                continue
+            input_node_dict = GENERATORS[generator](node_count, seed)
+            runs = [run_stages(input_node_dict, options) for _ in range(repeat)]
+            result = {key: min(run[key] for run in runs) for key in runs[0]}
+            results[generator][str(node_count)] = result
+            print(f"{generator:<10}{node_count:>8}{result['nodes']:>10}"
+                  f"{sum(result[stage] for stage in stage_names(result)):>10.3f} s", file=sys.stderr)
+    return results
+
+
+def stage_names(result):
+    """run_stages()の結果のうち、実行時間のkeyを返す"""
+    return [key for key in result if key not in ("nodes", "dummies", "crossings")]
+
+
+def scaling_exponent(sizes, times):
+    """
+    最小二乗法で log(実行時間) = a * log(ノード数) + b の傾きaを求める。
+    a ≒ 1なら線形、a ≒ 2なら2乗で増えている。
+    Return:
+        傾き。計測点が2つ未満か、実行時間が0の点がある場合はNone
+    """
+    points = [(math.log(size), math.log(t)) for size, t in zip(sizes, times) if t > 0]
+    if len(points) < 2 or len(points) < len(sizes):
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+def print_results(results):
+    """生成方法ごとに、ノード数と段階ごとの実行時間、増え方の傾きを表示する"""
+    for generator, size2result in results.items():
+        if not size2result:
+            continue
+        stages = stage_names(next(iter(size2result.values())))
+        print(f"\n[{generator}]")
+        print(f"{'nodes':>8}{'+dummies':>10}" + "".join(f"{stage[:12]:>14}" for stage in stages))
+        for size, result in size2result.items():
+            print(f"{size:>8}{result['nodes']:>10}" + "".join(f"{result[stage]:>14.4f}" for stage in stages))
+        sizes = [int(size) for size in size2result]
+        exponents = [scaling_exponent(sizes, [result[stage] for result in size2result.values()]) for stage in stages]
+        print(f"{'slope':>18}" + "".join(f"{'-':>14}" if e is None else f"{e:>14.2f}" for e in exponents))
+
+
+def compare_with_baseline(results, baseline, tolerance, min_seconds):
+    """
+    ベースラインと比べて、実行時間が(1 + tolerance)倍を超えて遅くなった段階を表示する。
+    min_seconds未満の差は計測誤差とみなす。
+    Return:
+        遅くなった段階の数
+    """
+    regressions = 0
+    print(f"\n{'generator':<10}{'nodes':>8}  {'stage':<24}{'baseline':>10}{'current':>10}{'ratio':>8}")
+    for generator, size2result in results.items():
+        for size, result in size2result.items():
+            base = baseline["results"].get(generator, {}).get(size)
+            if base is None:
+                continue
+            if result["crossings"] != base["crossings"]:
+                # 実行時間と異なり交差数は決定的なため、変わった場合は配置の結果が変わっている
+                print(f"{generator:<10}{size:>8}  {'crossings':<24}{base['crossings']:>10}{result['crossings']:>10}")
+            for stage in stage_names(result):
+                if stage not in base:
+                    continue
+                ratio = result[stage] / base[stage] if base[stage] > 0 else math.inf
+                if ratio > 1 + tolerance and result[stage] - base[stage] > min_seconds:
+                    regressions += 1
+                    print(f"{generator:<10}{size:>8}  {stage:<24}{base[stage]:>10.4f}{result[stage]:>10.4f}"
+                          f"{ratio:>7.2f}x")
+    print(f"regressions: {regressions}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="階層化の段階ごとのベンチマーク")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000], help="ノード数")
+    parser.add_argument("--generators", nargs="+", choices=GENERATORS, default=list(GENERATORS),
+                        help="DAGの生成方法")
+    parser.add_argument("--seed", type=int, default=0, help="DAGを生成する乱数のシード")
+    parser.add_argument("--repeat", type=int, default=1, help="繰り返す回数(段階ごとに最小値をとる)")
+    parser.add_argument("--reduction", choices=create_graph.REDUCTION_METHODS, default="bitset")
+    parser.add_argument("--layering", choices=create_graph.LAYERING_METHODS, default="topological")
+    parser.add_argument("--ordering", choices=create_graph.ORDERING_METHODS, default="iterated")
+    parser.add_argument("--coordinate", choices=create_graph.COORDINATE_METHODS, default="priority")
+    parser.add_argument("--save-baseline", help="計測結果をベースラインとして保存するJSONファイル")
+    parser.add_argument("--compare", help="比較するベースラインのJSONファイル")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="遅くなったとみなす実行時間の増加の割合")
+    parser.add_argument("--min-seconds", type=float, default=0.01, help="遅くなったとみなす実行時間の差の最小値")
+    args = parser.parse_args()
+
+    options = {"reduction": args.reduction, "layering": args.layering, "ordering": args.ordering,
+               "coordinate": args.coordinate}
+    results = run_benchmark(args.generators, args.sizes, options, args.repeat, args.seed)
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"options": options, "seed": args.seed, "results": results}, f, indent=1)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline["options"] != options or baseline["seed"] != args.seed:
+            print(f"warning: baseline was measured with {baseline['options']}, seed={baseline['seed']}",
+                  file=sys.stderr)
+        if compare_with_baseline(results, baseline, args.tolerance, args.min_seconds):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+優先度順の座標決定の一致の確認
+create_graph.update_x_in_priority_order_iteratively()とmove_node_closer_to_connected_nodes()が、
+priority_reference.pyの以前の(再帰による)実装と同じx座標を割り当てることを、
+ランダムな階層とランダムな階層グラフで確認する。
+また、compact_graph.calc_level_idealx()とcreate_graph.node2idealx()が同じ理想x座標になること、
+"priority-compact"と"priority"の座標決定が同じx座標になることも確認する。
+一致しなければAssertionErrorで終了する。
+
+使い方:
+    python benchmarks/check_priority_placement.py [--count 200] [--seed 0]
+"""
+import argparse
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "demo"))
+import compact_graph  # noqa: E402
+import create_graph  # noqa: E402
+from dag_generators import random_layered_dag  # noqa: E402
+import priority_reference  # noqa: E402
+
+
+def random_level(node_count, rng):
+    """
+    x座標が0, 1, 2, ...の1つの階層と、ランダムな優先度・理想x座標を作る。
+    Args:
+        node_count: 階層のノード数
+        rng: random.Randomオブジェクト
+    Return:
+        (ノードのリスト, node2priority_dict, node2idealx_dict)
+    """
+    nodes = [create_graph.Node(f"n{i}", x=i, y=0) for i in range(node_count)]
+    rng.shuffle(nodes)
+    node2priority_dict = {node: rng.randint(0, 5) for node in nodes}
+    node2idealx_dict = {node: rng.randint(-node_count // 4, node_count + node_count // 4) for node in nodes}
+    return nodes, node2priority_dict, node2idealx_dict
+
+
+def level_x(update_func, node_count, seed):
+    """
+    random_level()で作った階層に対してupdate_funcを実行する。
+    Return:
+        名前の順に並べたx座標のリスト
+    """
+    nodes, node2priority_dict, node2idealx_dict = random_level(node_count, random.Random(seed))
+    update_func(nodes, node2priority_dict, node2idealx_dict)
+    return [node.x for node in sorted(nodes, key=lambda node: node.name)]
+
+
+def graph_x(move_func, input_node_dict):
+    """
+    input_node_dictの階層グラフで、move_funcを上から下へ、下から上へと1回ずつ実行する。
+    Return:
+        ノードのリストの順に並べたx座標のリスト
+    """
+    node_list = create_graph.create_node_list(input_node_dict)
+    create_graph.assign_level(node_list)
+    create_graph.assign_x_sequentially(node_list)
+    for downward in (True, False):
+        move_func(node_list, downward)
+    return [node.x for node in node_list]
+
+
+def random_levels(input_node_dict, rng):
+    """
+    input_node_dictの階層グラフにダミーノードを挿入し、各階層のノードに負の値も含むランダムなx座標を割り当てる。
+    Return:
+        ノードのリスト
+    """
+    node_list = create_graph.create_node_list(input_node_dict)
+    create_graph.assign_level(node_list)
+    create_graph.cut_edges_higher_than_1(node_list)
+    for node in node_list:
+        node.x = rng.randint(-len(node_list), len(node_list))
+    return node_list
+
+
+def validate_level_idealx(node_list):
+    """
+    各階層について、calc_level_idealx()とnode2idealx()の理想x座標がターゲット、ソースの両方から一致することを確認する。
+    """
+    graph = compact_graph.compact_graph_from_node_list(node_list)
+    for level, ids in compact_graph.divide_nodes_by_level(graph).items():
+        nodes = [node_list[i] for i in ids.tolist()]
+        for from_targets in (True, False):
+            expected = list(create_graph.node2idealx(nodes, from_targets).values())
+            assert compact_graph.calc_level_idealx(graph, ids, from_targets).tolist() == expected, \
+                f"階層{level}の理想x座標が一致しません"
+
+
+def coordinate_x(method, input_node_dict):
+    """
+    input_node_dictをcreate_layout()で階層化し、座標決定の方法methodで割り当てたx座標のリストを返す。
+    """
+    return [node.x for node in create_graph.create_layout(input_node_dict, coordinate=method)]
+
+
+def validate(count, seed=0):
+    """
+    ランダムな階層とランダムな階層グラフで、参照実装と現在の実装のx座標が一致することを確認する。
+    Args:
+        count: 確認する階層(グラフ)の数
+        seed: 乱数のシード
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        node_count = rng.randint(1, 300)
+        assert (level_x(create_graph.update_x_in_priority_order_iteratively, node_count, i)
+                == level_x(priority_reference.update_x_in_priority_order, node_count, i)), \
+            f"{node_count}ノードの階層(シード{i})でx座標が一致しません"
+
+        input_node_dict = random_layered_dag(rng.randint(10, 300), rng.randint(2, 8), 3, seed=i)
+        assert (graph_x(create_graph.move_node_closer_to_connected_nodes, input_node_dict)
+                == graph_x(priority_reference.move_node_closer_recursively, input_node_dict)), \
+            f"階層グラフ(シード{i})でx座標が一致しません"
+
+        validate_level_idealx(random_levels(input_node_dict, rng))
+        assert coordinate_x("priority-compact", input_node_dict) == coordinate_x("priority", input_node_dict), \
+            f"階層グラフ(シード{i})で\"priority-compact\"のx座標が一致しません"
+    print(f"validated on {count} random levels and {count} random layered graphs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="優先度順の座標決定の一致の確認")
+    parser.add_argument("--count", type=int, default=200, help="確認する階層(グラフ)の数")
+    parser.add_argument("--seed", type=int, default=0, help="乱数のシード")
+    args = parser.parse_args()
+    validate(args.count, args.seed)
+
+
+if __name__ == "__main__":
+    main()
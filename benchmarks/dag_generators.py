@@ -0,0 +1,182 @@
+"""
+ベンチマーク用のDAGを生成する
+生成したDAGはcreate_graph.create_node_list()の入力と同じ形式(input_node_dict)で返す。
+    input_node_dict = {ノードの名前: [ターゲットの名前の集合, リンク先URL], ...}
+"""
+import random
+
+
+def random_layered_dag(node_count, level_count, edges_per_node=2, long_edge_ratio=0.2, seed=0, max_edge_span=None):
+    """
+    ノードを階層に分け、各ノードが下の階層のノードを指すランダムなDAGを作る。
+    階層0以外のノードは、1つ下の階層のノードを必ず1つ指し、
+    残りのエッジはlong_edge_ratioの確率で2つ以上下の階層のノードを指す。
+    Args:
+        node_count: ノード数
+        level_count: 階層数
+        edges_per_node: 1ノードあたりのエッジ数(最大値)
+        long_edge_ratio: 2つ以上下の階層を指すエッジの割合
+        seed: 乱数のシード
+        max_edge_span: 2つ以上下の階層を指すエッジが跨ぐ階層数の上限。Noneなら上限なし
+    Return:
+        input_node_dict
+    """
+    rng = random.Random(seed)
+    level2names = [[] for _ in range(level_count)]
+    for i in range(node_count):
+        level2names[i * level_count // node_count].append(f"n{i}")
+
+    input_node_dict = {}
+    for level, names in enumerate(level2names):
+        for name in names:
+            targets = set()
+            if level > 0:
+                targets.add(rng.choice(level2names[level - 1]))
+                for _ in range(edges_per_node - 1):
+                    if level > 1 and rng.random() < long_edge_ratio:
+                        lowest_level = 0 if max_edge_span is None else max(0, level - max_edge_span)
+                        target_level = rng.randrange(min(lowest_level, level - 2), level - 1)
+                    else:
+                        target_level = level - 1
+                    targets.add(rng.choice(level2names[target_level]))
+            input_node_dict[name] = [targets, "example.html"]
+    return input_node_dict
+
+
+def wide_shallow_dag(node_count, level_count=4, edges_per_node=3, seed=0):
+    """
+    階層数が少なく、1つの階層のノード数が多いDAGを作る。交差削減の負荷が大きい。
+    Args:
+        node_count: ノード数
+        level_count: 階層数
+        edges_per_node: 1ノードあたりのエッジ数(最大値)
+        seed: 乱数のシード
+    Return:
+        input_node_dict
+    """
+    return random_layered_dag(node_count, level_count, edges_per_node, long_edge_ratio=0.2, seed=seed)
+
+
+def deep_narrow_dag(node_count, width=8, edges_per_node=3, max_edge_span=4, seed=0):
+    """
+    1つの階層のノード数が少なく、階層数が多いDAGを作る。階層割当や間引きの負荷が大きい。
+    長いエッジが跨ぐ階層数をmax_edge_spanで抑え、ダミーノードの数がノード数に比例するようにする。
+    Args:
+        node_count: ノード数
+        width: 1つの階層のノード数
+        edges_per_node: 1ノードあたりのエッジ数(最大値)
+        max_edge_span: 長いエッジが跨ぐ階層数の上限
+        seed: 乱数のシード
+    Return:
+        input_node_dict
+    """
+    return random_layered_dag(node_count, max(2, node_count // width), edges_per_node, long_edge_ratio=0.3,
+                              seed=seed, max_edge_span=max_edge_span)
+
+
+def mml_like_dag(node_count, edges_per_node=8, hub_count=10, hub_ratio=0.3, seed=0):
+    """
+    MMLの依存関係に似た次数の分布を持つDAGを作る。
+    ノードn{i}はそれより前のノードだけを指す(articleは既存のarticleだけを参照する)。
+    エッジのhub_ratioの割合は、全体から参照される少数のハブ(n0, ..., n{hub_count-1}。
+    TARSKIやXBOOLE_0に当たる)を指し、残りは指されている回数に比例した確率で(優先的選択により)選ぶ。
+    Args:
+        node_count: ノード数
+        edges_per_node: 1ノードあたりのエッジ数(最大値)
+        hub_count: ハブの数
+        hub_ratio: ハブを指すエッジの割合
+        seed: 乱数のシード
+    Return:
+        input_node_dict
+    """
+    rng = random.Random(seed)
+    # 指されるたびに名前を追加するため、rng.choice()は指されている回数(+1)に比例した確率で選ぶ
+    weighted_names = []
+    input_node_dict = {}
+    for i in range(node_count):
+        name = f"n{i}"
+        targets = set()
+        if i > 0:
+            for _ in range(rng.randint(1, edges_per_node)):
+                if rng.random() < hub_ratio:
+                    target = f"n{rng.randrange(min(i, hub_count))}"
+                else:
+                    target = rng.choice(weighted_names)
+                targets.add(target)
+            weighted_names.extend(sorted(targets))
+        weighted_names.append(name)
+        input_node_dict[name] = [targets, "example.html"]
+    return input_node_dict
+
+
+def family_named_dag(node_count, family_size=8, stray_ratio=0.05, seed=0, **kwargs):
+    """
+    mml_like_dag()のノードに、MMLのarticle名のような接頭辞と番号からなる名前(FA_0, FA_1, ..., FB_0, ...)を付ける。
+    ノードは前から順にfamily_size個ずつ同じ接頭辞にまとめ(XBOOLE_0, XBOOLE_1, ...に当たる)、
+    stray_ratioの割合のノードはそれまでに現れたランダムな接頭辞にする(接頭辞の間で依存し合う場合を作る)。
+    Args:
+        node_count: ノード数
+        family_size: 1つの接頭辞のノード数の目安
+        stray_ratio: ランダムな接頭辞にするノードの割合
+        seed: 乱数のシード
+        kwargs: mml_like_dag()に渡す引数
+    Return:
+        input_node_dict
+    """
+    rng = random.Random(seed)
+    input_node_dict = mml_like_dag(node_count, seed=seed, **kwargs)
+    family_counts = []
+    old2new = {}
+    for i, old_name in enumerate(input_node_dict):
+        family = i // family_size
+        if family > 0 and rng.random() < stray_ratio:
+            family = rng.randrange(family)
+        while len(family_counts) <= family:
+            family_counts.append(0)
+        prefix = ""
+        number = family
+        while True:
+            prefix = chr(ord("A") + number % 26) + prefix
+            number = number // 26 - 1
+            if number < 0:
+                break
+        old2new[old_name] = f"F{prefix}_{family_counts[family]}"
+        family_counts[family] += 1
+    return {old2new[name]: [{old2new[target] for target in targets}, href]
+            for name, (targets, href) in input_node_dict.items()}
+
+
+def disjoint_union(input_node_dicts):
+    """
+    複数のDAGを、互いにエッジを持たない1つのDAG(弱連結成分が複数あるDAG)にまとめる。
+    i番目のDAGのノードの名前には"c{i}_"を付けて区別する。
+    Args:
+        input_node_dicts: input_node_dictのリスト
+    Return:
+        input_node_dict
+    """
+    input_node_dict = {}
+    for i, component in enumerate(input_node_dicts):
+        prefix = f"c{i}_"
+        for name, (targets, href) in component.items():
+            input_node_dict[prefix + name] = [{prefix + target for target in targets}, href]
+    return input_node_dict
+
+
+def diamond_ladder(rung_count):
+    """
+    ひし形を縦にrung_count個つなげたDAGを作る。
+    ノードs0から上のノードへの経路数が段ごとに2倍になるため、経路ごとに
+    階層を更新し直す方法(assign_top_node())では指数時間かかる。
+        s_{i+1} -> a_i, b_i -> s_i
+    Args:
+        rung_count: ひし形の段数
+    Return:
+        input_node_dict
+    """
+    input_node_dict = {"s0": [set(), "example.html"]}
+    for i in range(rung_count):
+        input_node_dict[f"a{i}"] = [{f"s{i}"}, "example.html"]
+        input_node_dict[f"b{i}"] = [{f"s{i}"}, "example.html"]
+        input_node_dict[f"s{i + 1}"] = [{f"a{i}", f"b{i}"}, "example.html"]
+    return input_node_dict
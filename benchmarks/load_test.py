@@ -0,0 +1,171 @@
+"""
+layout_service.pyの負荷試験
+複数のクライアント(スレッド)から/layoutに要求を送り、スループットとレイテンシ(p50, p99)を表示する。
+要求は、ランダムに選んだarticleの近傍(depth, direction)の部分グラフで、同じ要求が繰り返し現れる。
+--urlを指定しない場合は、同じプロセスでサービスを起動して試験する。
+サービスの結果が、create_layout()で同じ部分グラフを階層化したJSONと一致することも確認する。
+
+使い方:
+    python benchmarks/load_test.py [--mml mmlディレクトリのパス] [--requests 400] [--clients 8] [--distinct 50]
+    python benchmarks/load_test.py --url http://127.0.0.1:8765 --mml mmlディレクトリのパス
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import http.client
+import io
+import json
+import math
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "demo"))
+import create_graph  # noqa: E402
+import layout_cache  # noqa: E402
+import layout_service  # noqa: E402
+import retrieve_environment  # noqa: E402
+from dag_generators import mml_like_dag  # noqa: E402
+
+
+def synthetic_miz_files_dict(node_count):
+    """
+    mml_like_dag()のグラフを、theoremsで参照しているものとしてmake_library_dependency()の形式にする。
+    """
+    miz_files_dict = {category: dict() for category in retrieve_environment.CATEGORIES}
+    for name, (targets, _) in mml_like_dag(node_count).items():
+        miz_files_dict["theorems"][name.upper()] = {target.upper() for target in targets}
+    return miz_files_dict
+
+
+def make_queries(articles, distinct, count, seed=0):
+    """
+    distinct種類の要求を作り、そこから重複を許してcount個を選ぶ。
+
+    Return:
+        クエリの辞書のリスト。
+    """
+    rng = random.Random(seed)
+    kinds = [{"article": rng.choice(articles), "depth": rng.randint(1, 3),
+              "direction": rng.choice(sorted(layout_service.DIRECTIONS))} for _ in range(distinct)]
+    return [rng.choice(kinds) for _ in range(count)]
+
+
+def percentile(sorted_values, p):
+    """昇順に並んだ値のpパーセンタイル(nearest-rank)を返す"""
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def run_clients(url, queries, clients):
+    """
+    clients個のスレッドから、queriesを順に分け合って要求する。各スレッドは接続を保ったまま要求を続ける。
+
+    Return:
+        (レイテンシ(秒)のリスト, 経過時間(秒), key=クエリ文字列, value=応答のJSON文字列 となる辞書)
+    """
+    address = urlsplit(url)
+    latencies = []
+    responses = dict()
+    lock = threading.Lock()
+    next_index = iter(range(len(queries)))
+
+    def client():
+        connection = http.client.HTTPConnection(address.hostname, address.port)
+        try:
+            while True:
+                with lock:
+                    index = next(next_index, None)
+                if index is None:
+                    return
+                query = urlencode(queries[index])
+                start = time.perf_counter()
+                connection.request("GET", "/layout?" + query)
+                response = connection.getresponse()
+                body = response.read().decode()
+                elapsed = time.perf_counter() - start
+                assert response.status == 200, body
+                with lock:
+                    latencies.append(elapsed)
+                    responses[query] = body
+        finally:
+            connection.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        for future in [executor.submit(client) for _ in range(clients)]:
+            future.result()
+    return latencies, time.perf_counter() - start, responses
+
+
+def fetch_json(url, path):
+    """サービスのpathにGETで要求し、JSONを返す"""
+    address = urlsplit(url)
+    connection = http.client.HTTPConnection(address.hostname, address.port)
+    try:
+        connection.request("GET", path)
+        return json.loads(connection.getresponse().read())
+    finally:
+        connection.close()
+
+
+def validate(service, responses, count=5):
+    """応答のうちcount個が、create_layout()で同じ部分グラフを階層化した結果と一致することを確認する"""
+    for query in sorted(responses)[:count]:
+        subgraph_args, options = layout_service.parse_layout_query(query)
+        f = io.StringIO()
+        create_graph.write_cytoscape_json(create_graph.create_layout(service.subgraph(**subgraph_args), **options), f)
+        assert responses[query] == f.getvalue(), f"{query}の結果がcreate_layout()と一致しません"
+    print(f"validated {min(count, len(responses))} responses against create_layout()")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="layout_service.pyの負荷試験")
+    parser.add_argument("--url", help="試験するサービスのURL。省略時は同じプロセスでサービスを起動する")
+    parser.add_argument("--mml", help="mizファイルが置かれたディレクトリ。指定しない場合はmml_like_dag()を用いる")
+    parser.add_argument("--nodes", type=int, default=1000, help="合成するDAGのノード数")
+    parser.add_argument("--requests", type=int, default=400, help="要求の数")
+    parser.add_argument("--clients", type=int, default=8, help="同時に要求するクライアントの数")
+    parser.add_argument("--distinct", type=int, default=50, help="要求の種類の数")
+    parser.add_argument("--workers", type=int, help="同じプロセスで起動するサービスの階層化のプロセス数")
+    parser.add_argument("--max-entries", type=int, default=256, help="同じプロセスで起動するサービスのキャッシュの大きさ")
+    args = parser.parse_args()
+
+    if args.mml:
+        miz_files_dict = retrieve_environment.make_library_dependency(args.mml)
+    else:
+        miz_files_dict = synthetic_miz_files_dict(args.nodes)
+    service = layout_service.LayoutService(miz_files_dict, workers=args.workers,
+                                           cache=layout_cache.LayoutCache(max_entries=args.max_entries))
+    articles = sorted(service.graph(layout_service.DEFAULT_CATEGORIES).names)
+    queries = make_queries(articles, args.distinct, args.requests)
+
+    server = None
+    url = args.url
+    if url is None:
+        server = layout_service.ThreadingHTTPServer(("127.0.0.1", 0), layout_service.make_handler(service))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        latencies, elapsed, responses = run_clients(url, queries, args.clients)
+        stats = fetch_json(url, "/stats")
+        validate(service, responses)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        service.close()
+
+    latencies.sort()
+    print(f"requests: {len(latencies)}, clients: {args.clients}, distinct: {len(responses)}")
+    print(f"throughput: {len(latencies) / elapsed:.1f} req/s")
+    print(f"latency p50: {percentile(latencies, 50) * 1000:.1f} ms, p99: {percentile(latencies, 99) * 1000:.1f} ms, "
+          f"max: {latencies[-1] * 1000:.1f} ms")
+    print(f"service: computed {stats['computed']}, coalesced {stats['coalesced']}, "
+          f"cache hits {stats['cache']['hits']}, errors {stats['errors']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+優先度順の座標決定の参照実装
+create_graph.update_x_in_priority_order_iteratively()に置き換える前の、nodes.index()とリストの探索、
+再帰による実装をそのまま残したもの。check_priority_placement.pyとbench_priority_placement.pyで、
+x座標が一致することの確認と実行時間の比較に用いる。階層化では用いない。
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "demo"))
+import create_graph  # noqa: E402
+
+# update_x2idealx_recursively()は動かすノードの数だけ再帰するため、上限を引き上げておく
+sys.setrecursionlimit(100000)
+
+
+def update_x_in_priority_order(nodes, node2priority_dict, node2idealx_dict):
+    """
+    1つの階層のノードのx座標の更新順序を決め、更新を行う。
+    順序は優先度(priority)が大きい順とする。優先度が同じ場合は、x座標の値が小さいほうが先になる。
+    更新は、update_x2idealx_recursively()にて行う。
+    アルゴリズム
+        1．与えられたnodesをx座標値で昇順にソートする
+        2．ノードのx座標値を優先度が高い順に更新していく。
+        3．更新したノードはその都度記録する。
+    Args:
+        nodes: 同階層のノードのリスト
+        node2priority_dict: key=Nodeオブジェクト, value=優先度 となっている辞書
+        node2idealx_dict: key=Nodeオブジェクト, value=理想のx座標値 となっている辞書
+    Return:
+    """
+    assigned_nodes = []
+    nodes = sorted(nodes, key=lambda a: a.x)
+    for node, priority in sorted(node2priority_dict.items(), key=lambda a: (-a[1], a[0].x)):
+        node_stack = create_graph.Stack()
+        node_stack.push(node)
+        sign = 1 if node.x < node2idealx_dict[node] else -1
+        update_x2idealx_recursively(nodes.index(node), nodes, node2idealx_dict[node], node_stack, assigned_nodes, sign)
+        assigned_nodes.append(node)
+
+
+
+def update_x2idealx_recursively(node_index, same_level_nodes, ideal_x,  node_stack, assigned_nodes, sign):
+    """
+    ノードのx座標を更新する。
+    アルゴリズム
+        1. 更新するノード(same_level_nodes[node_index])が、ノード列の端に到達していた場合、
+           node_stackに入ったノードを理想x座標まで動かし、割り当てて、走査終了
+        2. node_indexの隣のインデックスのノードを取得する
+        3. 2で取得したノードのx座標が理想x座標よりも遠い場所にあった場合
+            node_stackを理想x座標まで動かし、割り当てて、走査終了
+        4. 2で取得したノードのx座標が理想x座標よりも近い、あるいは一致していた場合
+            4.1 そのノードが割当済みノードならば、その1つ手前のx座標からnode_stack内のノードを並べる
+            4.2 そのノードが割当済みでなければ、node_stackにそのノードを追加、更新するノードをそのノードにし、
+                理想x座標を更新し、1に戻る。
+    Args:
+        node_index: x座標を更新したいノードのsame_level_nodesにおけるインデックス
+        same_level_nodes: 操作を行う階層のノード
+        ideal_x: x座標を更新したいノードsame_level_nodes[node_index]の理想のx座標値
+        assigned_nodes: 既に割り当てを行った、動かしたくないノードのリスト
+        node_stack: 座標を更新している途中のノードが入ったスタック。
+                    初期値としてsame_level_nodes[node_index]をプッシュしておく必要がある。
+        sign: 理想x座標が今のx座標より大きいければ+1, 小さければ-1。
+    Return:
+    """
+    if (node_index == 0 and sign == -1) or (node_index == len(same_level_nodes) - 1 and sign == 1):
+        assign_x_in_sequence(node_stack, ideal_x, -sign)
+        return
+
+    next_node = same_level_nodes[node_index+sign]
+
+    if (next_node.x > ideal_x and sign == 1) or (next_node.x < ideal_x and sign == -1):
+        assign_x_in_sequence(node_stack, ideal_x, -sign)
+        return
+
+    else:
+        if next_node in assigned_nodes:
+            assign_x_in_sequence(node_stack, next_node.x-sign, -sign)
+        else:
+            node_stack.push(next_node)
+            node_index += sign
+            ideal_x += sign
+            update_x2idealx_recursively(node_index, same_level_nodes, ideal_x, node_stack, assigned_nodes, sign)
+
+
+def assign_x_in_sequence(nodes_stack, x, sign):
+    """
+    nodes_stack内のノードを空になるまでポップして、順にx座標を割り当てる。
+    Args:
+        nodes_stack: ノードが入ったスタック
+        x: 最初popされるノードに割り当てるx座標の値
+        sign: +1 or -1, +1: 順に増やしたい場合、-1: 順に減らしたい場合
+    Return:
+    """
+    while nodes_stack.is_empty() is False:
+        node = nodes_stack.pop()
+        node.x = x
+        x += sign
+
+
+def move_node_closer_recursively(all_nodes, downward):
+    """
+    update_x_in_priority_order()を用いた、変更前のcreate_graph.move_node_closer_to_connected_nodes()。
+    """
+    level2nodes = create_graph.divide_nodes_by_level(all_nodes)
+    key = lambda k: k[0] if downward else -k[0]  # noqa: E731
+    for level, nodes in sorted(level2nodes.items(), key=key):
+        node2priority_dict = create_graph.node2priority(nodes, downward)
+        node2idealx_dict = create_graph.node2idealx(nodes, downward)
+        update_x_in_priority_order(nodes, node2priority_dict, node2idealx_dict)
@@ -0,0 +1,243 @@
+"""
+mmlディレクトリの.mizファイルから、articleの依存関係を階層形式で配置したグラフを作る
+手順
+    1. retrieve_environment.pyで各articleの環境部を解析する
+    2. 選んだカテゴリで参照しているarticleを依存先とし、create_node_list()の入力を作る
+    3. demo/create_graph.pyで階層化し、cytoscape.js形式のJSONを出力する
+各段階の実行時間を標準エラー出力に表示する。--profile-jsonを指定すると、階層化の各段階の
+実行時間、メモリ使用量の最大値、ノード数、交差数などをJSONで書き出す。入力の順番はシードで決まるため、同じシードなら同じ結果になる。
+
+使い方:
+    python create_mml_graph.py [mmlディレクトリのパス] -o mml_graph.json --seed 0
+    python create_mml_graph.py [mmlディレクトリのパス] --clusters mml_clusters
+        (demo/show_graph.html?graph=<mml_clustersへのパス>/overview.json で概観を表示し、クラスタをクリックすると詳細を表示する)
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import retrieve_environment
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "demo"))
+import cluster_graph  # noqa: E402
+import component_layout  # noqa: E402
+import create_graph  # noqa: E402
+import layout_cache  # noqa: E402
+import layout_pipeline  # noqa: E402
+import multi_start  # noqa: E402
+
+# vocabulariesは語彙ファイルの参照であり、articleの依存関係ではないため既定では除く
+DEFAULT_CATEGORIES = [category for category in retrieve_environment.CATEGORIES if category != 'vocabularies']
+
+
+def parse_args(argv=None):
+    """
+    コマンドライン引数を解析する。
+    Args:
+        argv: コマンドライン引数のリスト。Noneならsys.argvを用いる。
+    Return:
+        argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="MMLのarticleの依存関係を階層形式で配置し、cytoscape.js形式のJSONを出力する")
+    parser.add_argument("mml_directory", nargs="?", default=str(retrieve_environment.MIZAR_LIBRARY_DIRECTORY_PATH),
+                        help="mizファイルが置かれたディレクトリ")
+    parser.add_argument("-o", "--output", default="mml_graph.json", help="出力するJSONファイル")
+    parser.add_argument("--categories", nargs="+", choices=retrieve_environment.CATEGORIES, default=DEFAULT_CATEGORIES,
+                        help="依存関係として用いるカテゴリ")
+    parser.add_argument("--seed", type=int, default=0, help="入力の順番を並べ替える乱数のシード")
+    parser.add_argument("--workers", type=int, help="環境部の解析に用いるプロセス数")
+    parser.add_argument("--cache", help="環境部の解析結果のキャッシュファイル(SQLite)")
+    parser.add_argument("--reduction", choices=create_graph.REDUCTION_METHODS, default="bitset",
+                        help="エッジの間引きの方法")
+    parser.add_argument("--layering", choices=create_graph.LAYERING_METHODS, default="topological",
+                        help="階層割当の方法")
+    parser.add_argument("--dummy", choices=create_graph.DUMMY_METHODS, default="nodes",
+                        help="ダミーの挿入の方法")
+    parser.add_argument("--ordering", choices=create_graph.ORDERING_METHODS, default="iterated",
+                        help="交差削減の並べ替えの方法")
+    parser.add_argument("--coordinate", choices=create_graph.COORDINATE_METHODS, default="sequential",
+                        help="座標決定の方法")
+    # 階層化の結果の出力のしかたを変えるオプションは同時に指定できない
+    mode_group = parser.add_mutually_exclusive_group()
+    mode_group.add_argument("--components", action="store_true",
+                            help="弱連結成分ごとに(プロセスプールで並列に)階層化し、横に並べる")
+    parser.add_argument("--layout-workers", type=int, help="--components, --startsで階層化に用いるプロセス数")
+    parser.add_argument("--starts", type=int, default=1,
+                        help="初期配置を変えて交差削減を行う回数。2以上なら最も交差の少ない結果を選ぶ")
+    parser.add_argument("--time-budget", type=float, help="--startsの経過時間の上限(秒)")
+    mode_group.add_argument("--clusters", metavar="DIRECTORY",
+                            help="articleを接頭辞でクラスタにまとめ、概観と各クラスタの詳細のJSONをディレクトリに書き出す")
+    mode_group.add_argument("--layout-cache",
+                            help="階層化の結果のキャッシュファイル(SQLite)。同じ入力と方法なら階層化を省く")
+    parser.add_argument("--profile-json", help="階層化の各段階の計測結果を書き出すJSONファイル")
+    parser.add_argument("--cprofile-dir", help="階層化の各段階のcProfileの結果(.prof)を書き出すディレクトリ")
+    args = parser.parse_args(argv)
+
+    # --components, --clusters, --layout-cacheでは階層化の段階を計測せず、スタートも1回のみ行う
+    mode = ("--components" if args.components else "--clusters" if args.clusters is not None
+            else "--layout-cache" if args.layout_cache is not None else None)
+    if mode is not None:
+        for option, value in (("--profile-json", args.profile_json), ("--cprofile-dir", args.cprofile_dir)):
+            if value is not None:
+                parser.error(f"{option}は{mode}と同時に指定できません")
+        if args.starts > 1:
+            parser.error(f"--startsは{mode}と同時に指定できません")
+    if args.time_budget is not None and args.starts <= 1:
+        parser.error("--time-budgetは--startsに2以上を指定した場合のみ指定できます")
+    return args
+
+
+def main(argv=None):
+    """
+    関数の実行を行う関数。
+    Args:
+        argv: コマンドライン引数のリスト。Noneならsys.argvを用いる。
+    Return:
+    """
+    args = parse_args(argv)
+    timings = dict()
+
+    start = time.perf_counter()
+    miz_files_dict = retrieve_environment.make_library_dependency(args.mml_directory, workers=args.workers,
+                                                                  cache_path=args.cache)
+    timings["scan"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    input_node_dict = retrieve_environment.create_input_node_dict(miz_files_dict, args.categories)
+    input_node_dict = create_graph.shuffle_dict(input_node_dict, random.Random(args.seed))
+    timings["input"] = time.perf_counter() - start
+
+    options = {"reduction": args.reduction, "layering": args.layering, "dummy": args.dummy,
+               "ordering": args.ordering, "coordinate": args.coordinate}
+    if args.layout_cache is not None:
+        write_cached_layout(input_node_dict, options, args.layout_cache, args.output, timings)
+        return
+    if args.clusters is not None:
+        write_clustered_layout(input_node_dict, options, args.clusters, timings)
+        return
+    if args.components:
+        write_component_layout(input_node_dict, options, args.layout_workers, args.output, timings)
+        return
+    profiler = create_graph.LayoutProfiler(measure_memory=args.profile_json is not None,
+                                           measure_quality=args.profile_json is not None,
+                                           profile_directory=args.cprofile_dir)
+    if args.starts > 1:
+        # 段階ごとではなく、スタート全体を1つの段階として計測する(cProfileは親プロセスの処理のみ)
+        node_list = []
+        with profiler.stage("layout (multi-start)", node_list) as record:
+            best_node_list, summary = multi_start.multi_start_layout(input_node_dict, starts=args.starts,
+                                                                     seed=args.seed, workers=args.layout_workers,
+                                                                     time_budget=args.time_budget, **options)
+            node_list.extend(best_node_list)
+        record["starts"] = [{"start": index, "crossings": cross, "edge_length": length}
+                            for index, cross, length in summary]
+        print(f"starts: {len(summary)}/{args.starts}, best: {min(cross for _, cross, _ in summary)} crossings, "
+              f"start 0: {summary[0][1]} crossings", file=sys.stderr)
+    else:
+        node_list = create_graph.create_layout(input_node_dict, profiler=profiler, **options)
+    for record in profiler.stages:
+        timings[record["stage"]] = record["wall_time"]
+
+    start = time.perf_counter()
+    with open(args.output, "w") as f:
+        create_graph.write_cytoscape_json(node_list, f)
+    timings["export"] = time.perf_counter() - start
+    if args.profile_json is not None:
+        profiler.write_json(args.profile_json)
+
+    dummy_count = sum(node.is_dummy for node in node_list)
+    print(f"articles: {len(input_node_dict)}, dummies: {dummy_count}, "
+          f"crossings: {create_graph.count_cross_by_inversion(node_list)}", file=sys.stderr)
+    print_timings(timings)
+
+
+def write_cached_layout(input_node_dict, options, cache_path, output_path, timings):
+    """
+    階層化の結果のキャッシュ(layout_cache.LayoutCache)を用いてJSONを出力する。
+    同じ入力と方法の結果がキャッシュにあれば、階層化を行わずに保存したJSONを書き出す。
+    Args:
+        input_node_dict: 階層化するグラフ
+        options: create_layout()に渡す方法の辞書
+        cache_path: キャッシュファイル(SQLite)のパス
+        output_path: 出力するJSONファイルのパス
+        timings: 各段階の実行時間を格納する辞書
+    Return:
+    """
+    start = time.perf_counter()
+    with layout_cache.LayoutCache(path=cache_path) as cache:
+        _, cytoscape_json = cache.layout(input_node_dict, **options)
+        stats = cache.stats()
+    timings["layout (cached)"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with open(output_path, "w") as f:
+        f.write(cytoscape_json)
+    timings["export"] = time.perf_counter() - start
+
+    print(f"articles: {len(input_node_dict)}, cache: {'miss' if stats['misses'] else 'hit'}", file=sys.stderr)
+    print_timings(timings)
+
+
+def write_component_layout(input_node_dict, options, workers, output_path, timings):
+    """
+    弱連結成分ごとに階層化し(component_layout.layout_components())、JSONを出力する。
+    Args:
+        input_node_dict: 階層化するグラフ
+        options: create_layout()に渡す方法の辞書
+        workers: 階層化に用いるプロセス数
+        output_path: 出力するJSONファイルのパス
+        timings: 各段階の実行時間を格納する辞書
+    Return:
+    """
+    start = time.perf_counter()
+    component_count = len(component_layout.split_components(input_node_dict))
+    nodes, edges = component_layout.layout_components(input_node_dict, workers=workers, **options)
+    timings["layout (components)"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with open(output_path, "w") as f:
+        component_layout.write_component_layout_json(nodes, edges, f)
+    timings["export"] = time.perf_counter() - start
+
+    dummy_count = sum(is_dummy for _, _, _, _, is_dummy in nodes)
+    print(f"articles: {len(input_node_dict)}, components: {component_count}, dummies: {dummy_count}",
+          file=sys.stderr)
+    print_timings(timings)
+
+
+def write_clustered_layout(input_node_dict, options, directory, timings):
+    """
+    articleを接頭辞でクラスタにまとめ(cluster_graph.ClusteredLayout)、概観と各クラスタの詳細のJSONを書き出す。
+    Args:
+        input_node_dict: 階層化するグラフ
+        options: create_layout()に渡す方法の辞書
+        directory: 出力するディレクトリ
+        timings: 各段階の実行時間を格納する辞書
+    Return:
+    """
+    start = time.perf_counter()
+    pipeline = layout_pipeline.LayoutPipeline(**options)
+    clustered_layout = cluster_graph.ClusteredLayout(input_node_dict, pipeline=pipeline)
+    overview = clustered_layout.overview()
+    timings["layout (overview)"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    file_count = cluster_graph.write_multi_resolution_json(clustered_layout, directory)
+    timings["details + export"] = time.perf_counter() - start
+
+    print(f"articles: {len(input_node_dict)}, clusters: {len(clustered_layout.cluster2members)}, "
+          f"overview nodes: {len(overview.nodes)}, files: {file_count}", file=sys.stderr)
+    print_timings(timings)
+
+
+def print_timings(timings):
+    """各段階の実行時間と合計を標準エラー出力に表示する"""
+    for stage, elapsed in timings.items():
+        print(f"{stage:<24}{elapsed:>10.3f} s", file=sys.stderr)
+    print(f"{'total':<24}{sum(timings.values()):>10.3f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
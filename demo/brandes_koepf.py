@@ -0,0 +1,206 @@
+"""
+Brandes–Köpfの方法による座標決定
+交差削減で決めた各階層の並びを保ったまま、エッジができるだけ垂直になるようにx座標を決める。
+(U. Brandes, B. Köpf: Fast and Simple Horizontal Coordinate Assignment, GD 2001)
+    1. 長いエッジの内部(ダミーノード同士を結ぶエッジ、inner segment)と交差するエッジに印を付ける(type 1 conflict)
+    2. 上下2方向 × 左右2方向の4通りについて、各ノードを隣の階層のメディアンのノードと揃え、縦のブロックを作る
+    3. ブロックをクラスにまとめて左から詰めて並べ、クラスごとにずらす(水平方向の圧縮)
+    4. 4通りの結果の幅を揃え、各ノードについて4つのx座標の中央2つの平均をとる
+ノード数とエッジ数に対して線形に近い時間で動く。
+水平方向の圧縮は元論文のクラスとシフトによる方法で行い、クラスのずらす量は2020年の訂正に従って求める。
+元論文の再帰(place_block)は、ブロックの左右の制約のトポロジカル順に置くことで置き換える。
+
+ノードはcreate_graph.Nodeと同じく、name, x, y, targets, sources, is_dummyを持つものとする。
+階層yのノードのターゲットは階層y-1(上)、ソースは階層y+1(下)にあること(ダミーノードの挿入後)を前提とする。
+"""
+from collections import defaultdict, deque
+import math
+
+
+def assign_x_by_brandes_koepf(all_nodes, delta=1):
+    """
+    Brandes–Köpfの方法で全ノードのx座標を決める。各階層のノードの左右の順は変えない。
+
+    Args:
+        all_nodes: 全ノードのリスト。交差削減を済ませておく。
+        delta: 同じ階層で隣り合うノードの間隔の最小値。
+
+    Return:
+    """
+    if not all_nodes:
+        return
+    level2nodes = defaultdict(list)
+    for node in all_nodes:
+        level2nodes[node.y].append(node)
+    layers = [sorted(level2nodes[level], key=lambda node: node.x) for level in sorted(level2nodes)]
+    marked = mark_type1_conflicts(layers)
+
+    layouts = []
+    for downward in (True, False):
+        for leftward in (True, False):
+            ordered_layers = [layer if leftward else layer[::-1] for layer in layers]
+            if not downward:
+                ordered_layers = ordered_layers[::-1]
+            root, _ = align_vertically(ordered_layers, marked, downward)
+            x = compact_horizontally(ordered_layers, root, delta)
+            layouts.append(x if leftward else {node: -value for node, value in x.items()})
+
+    # 幅が最小のレイアウトに、左寄せのものは左端を、右寄せのものは右端を揃える
+    widths = [max(x.values()) - min(x.values()) for x in layouts]
+    smallest = layouts[widths.index(min(widths))]
+    for i, x in enumerate(layouts):
+        leftward = i % 2 == 0
+        shift = (min(smallest.values()) - min(x.values()) if leftward
+                 else max(smallest.values()) - max(x.values()))
+        for node in x:
+            x[node] += shift
+
+    for node in all_nodes:
+        values = sorted(x[node] for x in layouts)
+        node.x = (values[1] + values[2]) / 2
+
+
+def mark_type1_conflicts(layers):
+    """
+    inner segment(両端がダミーノードのエッジ)と交差する、それ以外のエッジに印を付ける。
+    揃える際に印の付いたエッジを用いないことで、長いエッジを優先してまっすぐにする。
+
+    Args:
+        layers: 階層ごとの、左から順に並べたノードのリストのリスト。上の階層から順に並ぶ。
+
+    Return:
+        印を付けたエッジ(上のノード, 下のノード)の集合。
+    """
+    marked = set()
+    for upper_layer, lower_layer in zip(layers, layers[1:]):
+        position = {node: i for i, node in enumerate(upper_layer)}
+        k0 = 0
+        scanned = 0
+        for l1, node in enumerate(lower_layer):
+            inner_target = None
+            if node.is_dummy:
+                inner_target = next((target for target in node.targets if target.is_dummy), None)
+            if l1 == len(lower_layer) - 1 or inner_target is not None:
+                k1 = position[inner_target] if inner_target is not None else len(upper_layer) - 1
+                while scanned <= l1:
+                    lower = lower_layer[scanned]
+                    for upper in lower.targets:
+                        if not (upper.is_dummy and lower.is_dummy) and not k0 <= position[upper] <= k1:
+                            marked.add((upper, lower))
+                    scanned += 1
+                k0 = k1
+    return marked
+
+
+def align_vertically(layers, marked, downward):
+    """
+    各ノードを、前の階層の隣のノード(メディアン)と揃えて縦のブロックを作る。
+    layersの各階層は揃える向き(左から、または右から)に並べておく。
+
+    Args:
+        layers: 処理する順に並べた階層のリスト。下向きなら上の階層から、上向きなら下の階層から並ぶ。
+        marked: mark_type1_conflicts()の結果。
+        downward: Trueなら前の階層はターゲット(上)、Falseならソース(下)。
+
+    Return:
+        (root, align)
+            root: key=ノード, value=ノードが属するブロックの先頭のノード となる辞書
+            align: key=ノード, value=ブロックで次のノード(最後のノードはブロックの先頭) となる辞書
+    """
+    root = {node: node for layer in layers for node in layer}
+    align = dict(root)
+    position = {node: i for layer in layers for i, node in enumerate(layer)}
+    for layer in layers[1:]:
+        r = -1
+        for node in layer:
+            neighbors = sorted(node.targets if downward else node.sources, key=position.__getitem__)
+            if not neighbors:
+                continue
+            d = len(neighbors)
+            for m in sorted({(d - 1) // 2, d // 2}):
+                if align[node] is not node:
+                    break
+                median = neighbors[m]
+                edge = (median, node) if downward else (node, median)
+                if edge not in marked and r < position[median]:
+                    align[median] = node
+                    root[node] = root[median]
+                    align[node] = root[node]
+                    r = position[median]
+    return root, align
+
+
+def compact_horizontally(layers, root, delta):
+    """
+    ブロックを左に詰めて並べる(水平方向の圧縮)。
+        1. 各ブロックを、同じ階層で左隣にあるノードのブロックを置いた後に置く(元論文のplace_block)。
+           ブロックの中で最初に左隣を持つノードについて、左隣のブロックと同じクラスとし(クラスの代表をsinkと呼ぶ)、
+           同じクラスの左隣のブロックからはdelta以上右に置く。左隣を持たないブロックは新しいクラスのsinkになる。
+        2. クラスをsinkの階層が前のものから順に見て、クラスのノードの左隣が別のクラスのノードであれば、
+           左のクラス全体を、間隔がdelta以上になるまで左にずらす(shift)。右のクラスのずらした量も加えて求める
+           (U. Brandes, J. Walter, J. Zink: Erratum: Fast and Simple Horizontal Coordinate Assignment, 2020)。
+    再帰の代わりに、左隣のブロックから右のブロックへの制約(ブロックのDAG)のトポロジカル順にブロックを置く。
+    揃えたブロックは左右の順を保つため、閉路はできない。
+
+    Args:
+        layers: align_vertically()に渡したものと同じ階層のリスト。
+        root: align_vertically()の結果。
+        delta: 同じ階層で隣り合うノードの間隔の最小値。
+
+    Return:
+        key=ノード, value=x座標 となる辞書。
+    """
+    block2nodes = defaultdict(list)  # ブロックのノードは揃えた順(layersの順)に並ぶ
+    node2left = dict()
+    for layer in layers:
+        for i, node in enumerate(layer):
+            block2nodes[root[node]].append(node)
+            if i > 0:
+                node2left[node] = layer[i - 1]
+    block2left_blocks = defaultdict(set)
+    for node, left in node2left.items():
+        block2left_blocks[root[node]].add(root[left])
+    remaining = {block: len(block2left_blocks[block]) for block in block2nodes}
+    block2right_blocks = defaultdict(list)
+    for block, left_blocks in block2left_blocks.items():
+        for left_block in left_blocks:
+            block2right_blocks[left_block].append(block)
+
+    # 1. ブロックをクラスの中で左に詰めて置く
+    sink = {block: block for block in block2nodes}
+    block_x = dict()
+    queue = deque(block for block in block2nodes if remaining[block] == 0)
+    while queue:
+        block = queue.popleft()
+        x = 0
+        for node in block2nodes[block]:
+            if node not in node2left:
+                continue
+            left_block = root[node2left[node]]
+            if sink[block] is block:
+                sink[block] = sink[left_block]
+            if sink[block] is sink[left_block]:
+                x = max(x, block_x[left_block] + delta)
+        block_x[block] = x
+        for right in block2right_blocks[block]:
+            remaining[right] -= 1
+            if remaining[right] == 0:
+                queue.append(right)
+
+    # 2. 右のクラスから順に、左のクラスをずらす量を決める
+    layer_index = {node: i for i, layer in enumerate(layers) for node in layer}
+    sink2nodes = defaultdict(list)
+    for block, nodes in block2nodes.items():
+        sink2nodes[sink[block]].extend(nodes)
+    shift = dict()
+    for class_sink in sorted(sink2nodes, key=layer_index.__getitem__):
+        class_shift = shift.setdefault(class_sink, 0)
+        for node in sink2nodes[class_sink]:
+            if node not in node2left:
+                continue
+            left_block = root[node2left[node]]
+            left_sink = sink[left_block]
+            if left_sink is not class_sink:
+                shift[left_sink] = min(shift.get(left_sink, math.inf),
+                                       class_shift + block_x[root[node]] - block_x[left_block] - delta)
+    return {node: block_x[block] + shift[sink[block]] for node, block in root.items()}
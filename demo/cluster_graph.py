@@ -0,0 +1,254 @@
+"""
+グラフをクラスタにまとめ、概観と各クラスタの詳細の2段階で階層化する(詳細度の切り替え)
+MML全体を階層化するとダミーノードが多くなり、階層化にも描画にも時間がかかる。
+このモジュールでは、articleを名前の接頭辞(XBOOLE_0, XBOOLE_1 → XBOOLE)でクラスタにまとめ、
+    1. クラスタを1つのノードとした概観のグラフを階層化する
+    2. クラスタの中のarticleのグラフは、要求されたときに(クラスタごとに)階層化する
+クラスタの間では互いに依存し合う(クラスタのグラフが閉路を持つ)ことがあるため、概観の階層化では
+閉路をなくすエッジ(feedback arc set、貪欲法で少なく選ぶ)を除き、除いたエッジは階層化の後に出力に加える。
+出力は概観のJSONとクラスタごとの詳細のJSONに分け、最初の描画では概観のノードだけを読み込めばよいようにする。
+"""
+import json
+import os
+import re
+
+from create_graph import write_cytoscape_elements
+from layout_pipeline import LayoutPipeline
+
+# 名前の末尾の番号(と区切りの_)を取り除いて接頭辞とする
+PREFIX_SUFFIX_PATTERN = re.compile(r"[_\d]+$")
+
+
+def prefix_family(name):
+    """
+    nameの接頭辞を返す。例: XBOOLE_0 → XBOOLE, ORDINAL1 → ORDINAL。
+    取り除くと空になる名前はそのまま返す。
+    """
+    return PREFIX_SUFFIX_PATTERN.sub("", name) or name
+
+
+def cluster_by_prefix(input_node_dict, key=prefix_family):
+    """
+    ノードを接頭辞でクラスタにまとめる。
+
+    Args:
+        input_node_dict: create_graph.create_node_list()の入力と同じ形式の辞書。
+        key: ノードの名前からクラスタの名前を求める関数。
+
+    Return:
+        key=ノードの名前, value=クラスタの名前 となる辞書。
+    """
+    return {name: key(name) for name in input_node_dict}
+
+
+def make_cluster_graph(input_node_dict, node2cluster):
+    """
+    クラスタを1つのノードとしたグラフを作る。クラスタの中のエッジは除く。
+
+    Return:
+        key=クラスタの名前, value=依存先のクラスタの名前の集合 となる辞書。クラスタは入力で先に現れた順に並ぶ。
+    """
+    cluster2targets = dict()
+    for name, (targets, _) in input_node_dict.items():
+        cluster = node2cluster[name]
+        cluster_targets = cluster2targets.setdefault(cluster, set())
+        for target in targets:
+            if target in node2cluster and node2cluster[target] != cluster:
+                cluster_targets.add(node2cluster[target])
+    return cluster2targets
+
+
+def find_feedback_edges(graph):
+    """
+    取り除くとgraphが閉路を持たなくなるエッジ(feedback arc set)を、Eades–Lin–Smythの貪欲法で求める。
+    ターゲットを持たないノードを後ろに、ソースを持たないノードを前に並べ、どちらもなければ
+    (ソースの数 - ターゲットの数)が最小のノードを前に並べる。前のノードを指すエッジを取り除く。
+
+    Args:
+        graph: key=ノード, value=ターゲットの集合 となる辞書。
+
+    Return:
+        取り除くエッジ(ソース, ターゲット)の集合。
+    """
+    targets = {node: set(node_targets) for node, node_targets in graph.items()}
+    sources = {node: set() for node in graph}
+    for node, node_targets in graph.items():
+        for target in node_targets:
+            sources[target].add(node)
+    front = []
+    back = []
+    remaining = dict.fromkeys(graph)  # 入力の順を保つ集合
+    while remaining:
+        changed = True
+        while changed:
+            changed = False
+            for node in list(remaining):
+                if not targets[node]:
+                    back.append(node)
+                elif not sources[node]:
+                    front.append(node)
+                else:
+                    continue
+                del remaining[node]
+                for other in sources[node]:
+                    targets[other].discard(node)
+                for other in targets[node]:
+                    sources[other].discard(node)
+                changed = True
+        if remaining:
+            node = min(remaining, key=lambda node: len(sources[node]) - len(targets[node]))
+            front.append(node)
+            del remaining[node]
+            for other in sources[node]:
+                targets[other].discard(node)
+            for other in targets[node]:
+                sources[other].discard(node)
+    position = {node: i for i, node in enumerate(front + back[::-1])}
+    return {(node, target) for node, node_targets in graph.items() for target in node_targets
+            if position[target] < position[node]}
+
+
+def collapse_dummy_nodes(result):
+    """
+    階層化の結果からダミーノードを除き、ダミーノードの列でつながれたエッジを1本のエッジに戻す。
+    ノードの並びはダミーノードを考慮して決めたものをそのまま用いる。
+
+    Args:
+        result: layout_pipeline.LayoutResult。
+
+    Return:
+        ダミーノードを含まないLayoutResult。edgesの順は元のエッジの順に従う。
+    """
+    dummy_names = {node.name for node in result.nodes if node.is_dummy}
+    name2targets = dict()
+    for source, target in result.edges:
+        name2targets.setdefault(source, []).append(target)
+    edges = []
+    for source, target in result.edges:
+        if source in dummy_names:
+            continue
+        while target in dummy_names:
+            target = name2targets[target][0]
+        edges.append((source, target))
+    nodes = tuple(node for node in result.nodes if not node.is_dummy)
+    return result._replace(nodes=nodes, edges=tuple(edges))
+
+
+class ClusteredLayout:
+    """
+    クラスタの概観と各クラスタの詳細の階層化をクラスとして定義する。
+    詳細は要求されたクラスタについてのみ階層化し、結果を保持する。
+
+    Attributes:
+        input_node_dict: 階層化するグラフ。
+        node2cluster: key=ノードの名前, value=クラスタの名前 となる辞書。
+        cluster2members: key=クラスタの名前, value=ノードの名前のリスト(入力の順) となる辞書。
+        pipeline: 階層化に用いるlayout_pipeline.LayoutPipelineオブジェクト。
+        overview_dummies: 概観にダミーノードを含めるか否か。
+    """
+    def __init__(self, input_node_dict, node2cluster=None, pipeline=None, overview_dummies=False):
+        """
+        Args:
+            input_node_dict: create_graph.create_node_list()の入力と同じ形式の辞書。
+            node2cluster: key=ノードの名前, value=クラスタの名前 となる辞書。Noneならcluster_by_prefix()を用いる。
+            pipeline: LayoutPipelineオブジェクト。Noneなら既定の方法で階層化する。
+            overview_dummies: Falseなら概観からダミーノードを除き、長いエッジは1本のエッジとして描く。
+                              最初の描画で読み込むノードをクラスタの数に抑える。
+        """
+        self.input_node_dict = input_node_dict
+        self.node2cluster = cluster_by_prefix(input_node_dict) if node2cluster is None else node2cluster
+        self.cluster2members = dict()
+        for name in input_node_dict:
+            self.cluster2members.setdefault(self.node2cluster[name], []).append(name)
+        self.pipeline = LayoutPipeline() if pipeline is None else pipeline
+        self.overview_dummies = overview_dummies
+        self._overview = None
+        self._details = dict()
+
+    def overview(self):
+        """
+        クラスタを1つのノードとした概観のグラフを階層化する。
+        find_feedback_edges()のエッジを除いて階層化し、除いたエッジはedgesの最後に(名前順に)加える。
+        ノードが1つのクラスタはそのノードのhrefを、それ以外のクラスタは空のhrefを持つ。
+        overview_dummiesがFalseなら、collapse_dummy_nodes()でダミーノードを除く。
+
+        Return:
+            layout_pipeline.LayoutResult。
+        """
+        if self._overview is None:
+            cluster_graph = make_cluster_graph(self.input_node_dict, self.node2cluster)
+            feedback_edges = find_feedback_edges(cluster_graph)
+            acyclic_graph = {cluster: [{target for target in targets if (cluster, target) not in feedback_edges},
+                                       self._cluster_href(cluster)]
+                             for cluster, targets in cluster_graph.items()}
+            result = self.pipeline.run(acyclic_graph)
+            if not self.overview_dummies:
+                result = collapse_dummy_nodes(result)
+            self._overview = result._replace(edges=result.edges + tuple(sorted(feedback_edges)))
+        return self._overview
+
+    def _cluster_href(self, cluster):
+        """ノードが1つのクラスタはそのノードのhrefを返す。詳細を開くクラスタは空文字列を返す"""
+        members = self.cluster2members[cluster]
+        return self.input_node_dict[members[0]][1] if len(members) == 1 else ""
+
+    def detail(self, cluster):
+        """
+        クラスタの中のノードとエッジのグラフを階層化する。
+
+        Args:
+            cluster: クラスタの名前。存在しなければKeyErrorを送出する。
+
+        Return:
+            layout_pipeline.LayoutResult。
+        """
+        if cluster not in self._details:
+            members = set(self.cluster2members[cluster])
+            subgraph = {name: [self.input_node_dict[name][0] & members, self.input_node_dict[name][1]]
+                        for name in self.cluster2members[cluster]}
+            self._details[cluster] = self.pipeline.run(subgraph)
+        return self._details[cluster]
+
+
+def write_multi_resolution_json(clustered_layout, directory, expand_all=True):
+    """
+    概観と各クラスタの詳細を、cytoscape.jsの記述形式(JSON)でディレクトリに書き出す。
+        directory/overview.json: 概観。クラスタのノードは属性size(ノード数)とdetail(詳細のファイルのパス)を持つ
+        directory/clusters.json: key=クラスタの名前, value={"members": ノードの名前のリスト, "detail": 詳細のファイルのパス}
+        directory/clusters/<番号>.json: クラスタの詳細。番号は概観のノードの順
+    ノードが1つのクラスタの詳細は書き出さず、detailをNoneとする(クリックするとそのノードのhrefを開く)。
+
+    Args:
+        clustered_layout: ClusteredLayoutオブジェクト。
+        directory: 書き出すディレクトリ。なければ作る。
+        expand_all: Falseなら概観とclusters.jsonのみ書き出す(詳細はClusteredLayout.detail()で求める)。
+
+    Return:
+        書き出したファイルの数。
+    """
+    os.makedirs(os.path.join(directory, "clusters"), exist_ok=True)
+    overview = clustered_layout.overview()
+    cluster2path = dict()
+    for i, node in enumerate(node for node in overview.nodes if not node.is_dummy):
+        if len(clustered_layout.cluster2members[node.name]) > 1:
+            cluster2path[node.name] = f"clusters/{i}.json"
+
+    node_items = ((node.name, {"href": node.href, "x": node.x, "y": node.y, "is_dummy": node.is_dummy,
+                               "size": 0 if node.is_dummy else len(clustered_layout.cluster2members[node.name]),
+                               "detail": cluster2path.get(node.name)})
+                  for node in overview.nodes)
+    with open(os.path.join(directory, "overview.json"), "w") as f:
+        write_cytoscape_elements(node_items, overview.edges, f)
+    with open(os.path.join(directory, "clusters.json"), "w") as f:
+        json.dump({cluster: {"members": members, "detail": cluster2path.get(cluster)}
+                   for cluster, members in clustered_layout.cluster2members.items()}, f)
+    if not expand_all:
+        return 2
+
+    for cluster, path in cluster2path.items():
+        detail = clustered_layout.detail(cluster)
+        node_items = ((node.name, {"href": node.href, "x": node.x, "y": node.y, "is_dummy": node.is_dummy})
+                      for node in detail.nodes)
+        with open(os.path.join(directory, path), "w") as f:
+            write_cytoscape_elements(node_items, detail.edges, f)
+    return len(cluster2path) + 2
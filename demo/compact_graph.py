@@ -0,0 +1,387 @@
+"""
+ノードを整数のidで表し、エッジをCSR形式の配列で持つコンパクトなグラフ
+create_graph.pyのNodeオブジェクトは1ノードごとに辞書と2つの集合を持つため、
+ノード数(ダミーノードを含む)が多いと走査時間が大きくなる。
+このモジュールでは、隣接ノードのx座標を何度も走査する段階(交差削減と座標決定)の計算を配列上で行う。
+間引き、階層割当、ダミーノードの挿入はcreate_graph.pyの各方法の辞書の関数で行い、その後のノードのリストから
+compact_graph_from_node_list()でCompactGraphを作る。結果はノードのリストに書き戻す。
+    ・ノードの名前はid(0, 1, 2, ...)に置き換え、名前とhrefはリストで持つ
+    ・ターゲット、ソースはCSR形式(offsetsとidsの2つの配列)で持つ
+    ・x, y, is_dummyはNumPyの配列で持つ
+"""
+import time
+
+import numpy as np
+
+
+class CompactGraph:
+    """
+    整数のidで表したグラフをクラスとして定義する。
+    id=iのノードのターゲットは target_ids[target_offsets[i]:target_offsets[i+1]]、
+    ソースは source_ids[source_offsets[i]:source_offsets[i+1]] となる。
+
+    Attributes:
+        names: ノードの名前のリスト。names[i]がid=iのノードの名前。
+        name2id: key=ノードの名前, value=id となる辞書。
+        hrefs: ノードのリンクのリスト。hrefs[i]がid=iのノードのリンク。
+        target_offsets, target_ids: ターゲットのCSR表現。np.ndarray(int64)。
+        source_offsets, source_ids: ソースのCSR表現。np.ndarray(int64)。
+        x, y: ノードの座標。np.ndarray(int64)。デフォルトは-1。
+        is_dummy: ノードがダミーか否か。np.ndarray(bool)。デフォルトはFalse。
+    """
+    __slots__ = ("names", "name2id", "hrefs", "target_offsets", "target_ids",
+                 "source_offsets", "source_ids", "x", "y", "is_dummy")
+
+    def __init__(self, names, hrefs, edge_sources, edge_targets, x=None, y=None, is_dummy=None):
+        node_count = len(names)
+        edge_sources = np.asarray(edge_sources, dtype=np.int64)
+        edge_targets = np.asarray(edge_targets, dtype=np.int64)
+        self.names = names
+        self.name2id = {name: i for i, name in enumerate(names)}
+        self.hrefs = hrefs
+        self.target_offsets, self.target_ids = build_csr(node_count, edge_sources, edge_targets)
+        self.source_offsets, self.source_ids = build_csr(node_count, edge_targets, edge_sources)
+        self.x = np.full(node_count, -1, dtype=np.int64) if x is None else np.asarray(x, dtype=np.int64)
+        self.y = np.full(node_count, -1, dtype=np.int64) if y is None else np.asarray(y, dtype=np.int64)
+        self.is_dummy = np.zeros(node_count, dtype=bool) if is_dummy is None else np.asarray(is_dummy, dtype=bool)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __str__(self):
+        return f"nodes: {len(self)}, edges: {len(self.target_ids)}, dummies: {int(self.is_dummy.sum())}"
+
+    def targets(self, i):
+        """id=iのノードのターゲットのidの配列を返す"""
+        return self.target_ids[self.target_offsets[i]:self.target_offsets[i + 1]]
+
+    def sources(self, i):
+        """id=iのノードのソースのidの配列を返す"""
+        return self.source_ids[self.source_offsets[i]:self.source_offsets[i + 1]]
+
+    def edges(self):
+        """
+        全エッジを(ソースのidの配列, ターゲットのidの配列)として返す。
+        エッジはソースのidの昇順に並ぶ。
+        """
+        edge_sources = np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.target_offsets))
+        return edge_sources, self.target_ids.copy()
+
+    def nbytes(self):
+        """配列が使用しているメモリ量(バイト)を返す。名前、hrefのリストと辞書は含まない。"""
+        return sum(a.nbytes for a in (self.target_offsets, self.target_ids, self.source_offsets,
+                                      self.source_ids, self.x, self.y, self.is_dummy))
+
+
+def build_csr(node_count, keys, values):
+    """
+    エッジ(key, value)の配列から、keyごとにvalueをまとめたCSR表現を作る。
+    同じkeyのvalueは元の順序を保つ。
+    Args:
+        node_count: ノード数
+        keys: エッジのkey側のidの配列
+        values: エッジのvalue側のidの配列
+    Return:
+        (offsets, ids)のタプル。keyがiのvalueは ids[offsets[i]:offsets[i+1]]。
+    """
+    order = np.argsort(keys, kind="stable")
+    offsets = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=node_count), out=offsets[1:])
+    return offsets, values[order]
+
+
+def compact_graph_from_node_list(node_list):
+    """
+    Nodeオブジェクトのリストから、同じ順序でidを割り当てたCompactGraphを作る。
+    x, y, is_dummyもNodeオブジェクトの値をそのまま用いる。
+    Args:
+        node_list: 全ノードをNodeクラスでまとめたリスト。
+    Return:
+        CompactGraphオブジェクト
+    """
+    node2id = {node: i for i, node in enumerate(node_list)}
+    edge_sources = []
+    edge_targets = []
+    for node in node_list:
+        source = node2id[node]
+        for target in node.targets:
+            edge_sources.append(source)
+            edge_targets.append(node2id[target])
+    return CompactGraph([node.name for node in node_list], [node.href for node in node_list],
+                        edge_sources, edge_targets,
+                        x=[node.x for node in node_list], y=[node.y for node in node_list],
+                        is_dummy=[node.is_dummy for node in node_list])
+
+
+"""
+交差削減
+"""
+
+
+def divide_nodes_by_level(graph):
+    """
+    ノードのidを階層ごとに分け、辞書形式で返す。各階層内ではidの昇順に並ぶ。
+    Args:
+        graph: CompactGraphオブジェクト
+    Return:
+        key=階層, value=階層がkeyのノードのidの配列 となる辞書。
+    """
+    if len(graph) == 0:
+        return {}
+    order = np.argsort(graph.y, kind="stable")
+    sorted_levels = graph.y[order]
+    level_starts = np.flatnonzero(np.r_[True, sorted_levels[1:] != sorted_levels[:-1]])
+    return {int(sorted_levels[start]): ids
+            for start, ids in zip(level_starts, np.split(order, level_starts[1:]))}
+
+
+def sort_nodes_by_xcenter(graph, downward, from_targets=False):
+    """
+    重心が小さいノードから左に配置する。create_graph.sort_nodes_by_xcenter()に相当する。
+    各階層の重心はcalc_level_xcenters()でまとめて計算し、argsortで並べ替える。
+    重心が等しいノードはidの順に並べる。
+    Args:
+        graph: CompactGraphオブジェクト
+        downward: Trueなら階層の上から下へ操作を行う。Falseなら階層の下から上へと操作を行う。
+        from_targets: Trueなら重心をターゲットから、Falseならソースから計算する。
+    Return:
+    """
+    level2ids = divide_nodes_by_level(graph)
+    for level in sorted(level2ids, reverse=not downward):
+        ids = level2ids[level]
+        assign_x_by_xcenter(graph, ids, calc_level_xcenters(graph, ids, from_targets))
+
+
+def gather_neighbors(graph, ids, from_targets):
+    """
+    ノードのターゲット(またはソース)のidを、CSR表現から1つの配列にまとめて取り出す。
+    Args:
+        graph: CompactGraphオブジェクト
+        ids: ノードのidの配列
+        from_targets: Trueならターゲット、Falseならソースを取り出す。
+    Return:
+        (neighbors, counts)のタプル。
+            neighbors: ids[0]の隣接ノード、ids[1]の隣接ノード、...の順に並べたidの配列
+            counts: 各ノードの隣接ノードの数の配列
+    """
+    offsets = graph.target_offsets if from_targets else graph.source_offsets
+    neighbor_ids = graph.target_ids if from_targets else graph.source_ids
+    starts = offsets[ids]
+    counts = offsets[ids + 1] - starts
+    # 各ノードのCSR上の区間[starts, starts+counts)を連結したインデックスを作る
+    group_starts = np.cumsum(counts) - counts
+    indices = np.arange(int(counts.sum()), dtype=np.int64) + np.repeat(starts - group_starts, counts)
+    return neighbor_ids[indices], counts
+
+
+def sum_neighbor_x(graph, ids, from_targets):
+    """
+    ノードごとに、ターゲット(またはソース)のx座標の総和を求める。
+    Args:
+        graph: CompactGraphオブジェクト
+        ids: ノードのidの配列
+        from_targets: Trueならターゲット、Falseならソースから求める。
+    Return:
+        (sums, counts)のタプル。sumsはx座標の総和、countsは隣接ノードの数の配列。
+    """
+    neighbors, counts = gather_neighbors(graph, ids, from_targets)
+    sums = np.zeros(len(ids), dtype=np.int64)
+    has_neighbors = counts > 0
+    if has_neighbors.any():
+        # 隣接ノードを持たないノードの区間は空になるため、reduceatには隣接ノードを持つノードの区間だけを渡す
+        group_starts = (np.cumsum(counts) - counts)[has_neighbors]
+        sums[has_neighbors] = np.add.reduceat(graph.x[neighbors], group_starts)
+    return sums, counts
+
+
+def calc_level_xcenters(graph, ids, from_targets):
+    """
+    ノードの重心をまとめて計算する。create_graph.calc_xcenter()と同じ値になる。
+        ターゲット(ソース)が存在する場合: ターゲット(ソース)のx座標の総和 / ターゲット(ソース)の数
+        存在しない場合: 正の無限大
+    Args:
+        graph: CompactGraphオブジェクト
+        ids: ノードのidの配列
+        from_targets: Trueならターゲット、Falseならソースから計算する。
+    Return:
+        重心の配列(float64)
+    """
+    sums, counts = sum_neighbor_x(graph, ids, from_targets)
+    xcenters = np.full(len(ids), np.inf)
+    np.divide(sums, counts, out=xcenters, where=counts > 0)
+    return xcenters
+
+
+def assign_x_by_xcenter(graph, ids, xcenters):
+    """
+    ノードを重心の昇順に並べ、順に0, 1, 2, ...とx座標を割り当てる。
+    create_graph.assign_x_by_xcenter()に相当する。重心が等しいノードはidsの順に並べる。
+    Args:
+        graph: CompactGraphオブジェクト
+        ids: 同じ階層のノードのidの配列
+        xcenters: 各ノードの重心の配列
+    Return:
+    """
+    graph.x[ids[np.argsort(xcenters, kind="stable")]] = np.arange(len(ids), dtype=np.int64)
+
+
+def sweep_nodes_by_xcenter(graph, level2ids, downward):
+    """
+    1回のスイープを行う。create_graph.sweep_nodes_by_xcenter()と同じx座標になる。
+    各階層のノードを隣の階層(上から下へならターゲット、下から上へならソース)の重心の昇順に並べ、
+    x座標を振り直す。スイープの最初の階層は並べ替えない。
+    隣の階層にノードを持たないノードは今のx座標を重心とみなし、重心が等しいノードは今のx座標の順に並べる。
+    Args:
+        graph: CompactGraphオブジェクト
+        level2ids: divide_nodes_by_level()の返り値。
+        downward: Trueなら階層の上から下へ、Falseなら下から上へ操作を行う。
+    Return:
+    """
+    for level in sorted(level2ids, reverse=not downward)[1:]:
+        ids = level2ids[level]
+        sums, counts = sum_neighbor_x(graph, ids, downward)
+        x = graph.x[ids]
+        keys = x.astype(np.float64)
+        has_neighbors = counts > 0
+        keys[has_neighbors] = sums[has_neighbors] / counts[has_neighbors]
+        graph.x[ids[np.lexsort((x, keys))]] = np.arange(len(ids), dtype=np.int64)
+
+
+def count_cross(graph):
+    """
+    交差数を数える。create_graph.count_cross_by_inversion()と同じ値になる。
+    エッジを(ターゲットの階層, ソースの階層, ソースのx座標, ターゲットのx座標)の順に並べると、
+    同じ階層の組のエッジ同士の交差は、ターゲットのx座標の列の転倒数になる。
+    階層の組ごとにターゲットのx座標の順位をずらして1つの列にまとめ、count_inversions()で数える。
+    Args:
+        graph: CompactGraphオブジェクト
+    Return:
+        交差数(int)
+    """
+    edge_sources, edge_targets = graph.edges()
+    if len(edge_sources) == 0:
+        return 0
+    source_levels = graph.y[edge_sources]
+    target_levels = graph.y[edge_targets]
+    target_x = graph.x[edge_targets]
+    order = np.lexsort((target_x, graph.x[edge_sources], source_levels, target_levels))
+    source_levels = source_levels[order]
+    target_levels = target_levels[order]
+    groups = np.cumsum(np.r_[False, (source_levels[1:] != source_levels[:-1])
+                             | (target_levels[1:] != target_levels[:-1])])
+    _, target_ranks = np.unique(target_x, return_inverse=True)
+    # 後の組の値は前の組の値より必ず大きくなるため、異なる組のエッジの対は転倒として数えない
+    return count_inversions(groups * (int(target_ranks.max()) + 1) + target_ranks[order])
+
+
+def count_inversions(values):
+    """
+    整数の配列valuesについて、i < j かつ values[i] > values[j] となる組の数を数える。
+    create_graph.count_inversions()のFenwick木の代わりに、下から上へのマージソートで数える。
+    各段では隣り合う2つのブロック(それぞれ昇順に並んでいる)の組ごとに、右のブロックの各値より大きい
+    左のブロックの値の数をnp.searchsorted()でまとめて数え、組ごとに並べ替えて次の段に進む。
+    Args:
+        values: 整数の配列
+    Return:
+        転倒数(int)
+    """
+    _, values = np.unique(values, return_inverse=True)
+    count = len(values)
+    positions = np.arange(count, dtype=np.int64)
+    inversions = 0
+    width = 1
+    while width < count:
+        pairs = positions // (2 * width)
+        is_right = (positions // width) % 2 == 1
+        # 組の番号を上位に加えた値は、左のブロックだけを取り出しても全体で昇順になる
+        keys = pairs * count + values
+        left_keys = keys[~is_right]
+        right_pairs = pairs[is_right]
+        not_greater = np.searchsorted(left_keys, keys[is_right], side="right")
+        left_ends = np.searchsorted(left_keys, (right_pairs + 1) * count, side="left")
+        inversions += int((left_ends - not_greater).sum())
+        values = np.sort(keys) - pairs * count
+        width *= 2
+    return inversions
+
+
+def reduce_cross_by_xcenter(graph, max_iterations=24, time_budget=None):
+    """
+    重心法による並べ替え(スイープ)を、上から下へ、下から上へと交互に繰り返して交差を減らす。
+    create_graph.reduce_cross_by_xcenter()と同じスイープ、終了条件で行い、同じ履歴とx座標になる。
+    終了時には交差数が最小だった配置に戻す。
+    Args:
+        graph: 階層割当、ダミーノードの挿入を済ませたCompactGraphオブジェクト
+        max_iterations: スイープの回数の上限。
+        time_budget: 経過時間の上限(秒)。Noneなら制限しない。
+    Return:
+        history: スイープごとの(経過時間[秒], 交差数)のタプルのリスト。先頭は並べ替え前の値。
+    """
+    start = time.perf_counter()
+    level2ids = divide_nodes_by_level(graph)
+    best_cross = count_cross(graph)
+    best_x = graph.x.copy()
+    history = [(0.0, best_cross)]
+    direction2last_x = {True: None, False: None}  # key=downward, value=その向きの前回のスイープ後のx座標
+    downward = True
+    for _ in range(max_iterations):
+        if best_cross == 0:
+            break
+        if time_budget is not None and time.perf_counter() - start >= time_budget:
+            break
+        sweep_nodes_by_xcenter(graph, level2ids, downward)
+        current_x = graph.x.copy()
+        cross = count_cross(graph)
+        history.append((time.perf_counter() - start, cross))
+        if cross < best_cross:
+            best_cross = cross
+            best_x = current_x
+        if direction2last_x[downward] is not None and np.array_equal(current_x, direction2last_x[downward]):
+            break
+        direction2last_x[downward] = current_x
+        downward = not downward
+
+    graph.x[:] = best_x
+    return history
+
+
+"""
+座標決定
+"""
+
+
+def calc_level_idealx(graph, ids, from_targets):
+    """
+    ノードの理想のx座標をまとめて計算する。create_graph.calc_idealx()と同じ値になる。
+        ターゲット(ソース)が存在する場合: ターゲット(ソース)のx座標の平均値(小数点以下切り捨て)
+        存在しない場合: ノードの元々のx座標
+    Args:
+        graph: CompactGraphオブジェクト
+        ids: ノードのidの配列
+        from_targets: Trueならターゲット、Falseならソースから計算する。
+    Return:
+        理想のx座標の配列(int64)
+    """
+    sums, counts = sum_neighbor_x(graph, ids, from_targets)
+    idealx = graph.x[ids].copy()
+    has_neighbors = counts > 0
+    idealx[has_neighbors] = np.trunc(sums[has_neighbors] / counts[has_neighbors]).astype(np.int64)
+    return idealx
+
+
+def calc_level_priorities(graph, ids, from_targets):
+    """
+    ノードの優先度をまとめて計算する。create_graph.calc_priority()と同じ大小関係になる。
+        ダミーノード: int64の最大値
+        その他: ターゲット(ソース)の数
+    Args:
+        graph: CompactGraphオブジェクト
+        ids: ノードのidの配列
+        from_targets: Trueならターゲット、Falseならソースから計算する。
+    Return:
+        優先度の配列(int64)
+    """
+    offsets = graph.target_offsets if from_targets else graph.source_offsets
+    priorities = offsets[ids + 1] - offsets[ids]
+    priorities[graph.is_dummy[ids]] = np.iinfo(np.int64).max
+    return priorities
@@ -0,0 +1,165 @@
+"""
+弱連結成分ごとに階層化し、横に並べて1つのグラフにする
+カテゴリを絞った場合など、入力がいくつかの独立した(弱連結な)成分に分かれることがある。
+成分ごとにcreate_graph.create_layout()を行えば、交差削減などは成分の中だけで済み、
+成分をプロセスプールで並列に階層化できる。
+    ・ノード数の多い成分から順に投入し、巨大な成分を待たずに小さい成分を他のプロセスで処理する
+    ・小さい成分はmin_batch_nodes個以上のノードになるようまとめて1つのタスクにし、プロセス間通信を減らす
+    ・成分ごとの結果はx座標をずらして左から順に並べる
+"""
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+from create_graph import create_layout, write_cytoscape_elements
+
+
+def split_components(input_node_dict):
+    """
+    input_node_dictを弱連結成分に分ける(Union-Find)。
+    存在しないノードへのエッジは無視する(create_node_list()と同じ)。
+
+    Args:
+        input_node_dict: create_graph.create_node_list()の入力と同じ形式の辞書。
+
+    Return:
+        成分ごとのinput_node_dictのリスト。ノード数の多い順に並べ、同じ数なら入力で先に現れた順にする。
+        各成分のノードの順番は入力と同じにする。
+    """
+    parent = {name: name for name in input_node_dict}
+
+    def find(name):
+        root = name
+        while parent[root] != root:
+            root = parent[root]
+        while parent[name] != root:
+            parent[name], name = root, parent[name]
+        return root
+
+    for name, (targets, _) in input_node_dict.items():
+        for target in targets:
+            if target in parent:
+                root, target_root = find(name), find(target)
+                if root != target_root:
+                    parent[target_root] = root
+
+    root2component = dict()
+    for name, value in input_node_dict.items():
+        root2component.setdefault(find(name), dict())[name] = value
+    components = list(root2component.values())
+    components.sort(key=len, reverse=True)  # 安定ソートなので、同じ数なら入力で先に現れた順になる
+    return components
+
+
+def layout_component(input_node_dict, options):
+    """
+    1つの成分を階層化し、プロセス間で受け渡せる形に変換する。
+    Nodeオブジェクトは互いに参照し合うため、そのままpickleすると長いダミーノードの列で再帰が深くなる。
+
+    Args:
+        input_node_dict: 1つの成分のinput_node_dict。
+        options: create_layout()に渡す方法の辞書。
+
+    Return:
+        (ノードのリスト, エッジのリスト)
+            ノード: (名前, href, x, y, is_dummy)のタプル
+            エッジ: (ソースの名前, ターゲットの名前)のタプル。write_cytoscape_json()と同じ順に並ぶ。
+    """
+    node_list = create_layout(input_node_dict, **options)
+    nodes = [(node.name, node.href, node.x, node.y, node.is_dummy) for node in node_list]
+    edges = [(source.name, target.name)
+             for source in node_list for target in sorted(source.targets, key=lambda node: node.name)]
+    return nodes, edges
+
+
+def layout_batch(batch, options):
+    """
+    まとめた複数の成分をlayout_component()で階層化する。プロセスプールで実行する関数。
+
+    Return:
+        layout_component()の結果のリスト。batchと同じ順に並ぶ。
+    """
+    return [layout_component(component, options) for component in batch]
+
+
+def make_batches(components, min_batch_nodes):
+    """
+    成分を、ノード数の合計がmin_batch_nodes以上になるよう順にまとめる。
+    min_batch_nodes以上のノードを持つ成分は1つで1つのまとまりになる。
+
+    Return:
+        成分のリストのリスト。
+    """
+    batches = []
+    batch = []
+    batch_nodes = 0
+    for component in components:
+        batch.append(component)
+        batch_nodes += len(component)
+        if batch_nodes >= min_batch_nodes:
+            batches.append(batch)
+            batch = []
+            batch_nodes = 0
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def layout_components(input_node_dict, workers=None, min_batch_nodes=1000, gap=1, **options):
+    """
+    弱連結成分ごとに階層化し、成分を左から順にx座標をずらして並べる。
+    ダミーノードの名前は成分ごとにdummy1から振られるため、全体で重ならないように番号をずらす。
+
+    Args:
+        input_node_dict: create_graph.create_node_list()の入力と同じ形式の辞書。
+        workers: 用いるプロセス数。Noneの場合はCPU数。1以下ならプロセスプールを用いない。
+        min_batch_nodes: 1つのタスクにまとめるノード数の目安。
+        gap: 隣り合う成分の間のx座標の間隔。
+        options: create_layout()に渡す方法(reduction, layering, dummy, ordering, coordinate)。
+
+    Return:
+        (ノードのリスト, エッジのリスト)。形式はlayout_component()と同じ。
+        成分が1つで、x座標の最小値が0の場合は、create_layout()の結果と同じ名前、座標、順番になる。
+    """
+    components = split_components(input_node_dict)
+    batches = make_batches(components, min_batch_nodes)
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    workers = min(workers, len(batches))
+    if workers <= 1:
+        results = [result for batch in batches for result in layout_batch(batch, options)]
+    else:
+        # batchesはノード数の多い成分から並んでいるため、大きいタスクから投入される
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(layout_batch, batch, options) for batch in batches]
+            results = [result for future in futures for result in future.result()]
+
+    packed_nodes = []
+    packed_edges = []
+    x_offset = 0
+    dummy_offset = 0
+    for nodes, edges in results:
+        dummy_names = {name: "dummy" + str(int(name[len("dummy"):]) + dummy_offset)
+                       for name, _, _, _, is_dummy in nodes if is_dummy}
+        # 座標決定の方法によってはx座標が負になるため、成分の左端をx_offsetに合わせる
+        min_x = min(x for _, _, x, _, _ in nodes)
+        packed_nodes.extend((dummy_names.get(name, name), href, x - min_x + x_offset, y, is_dummy)
+                            for name, href, x, y, is_dummy in nodes)
+        packed_edges.extend((dummy_names.get(source, source), dummy_names.get(target, target))
+                            for source, target in edges)
+        x_offset += max(x for _, _, x, _, _ in nodes) - min_x + 1 + gap
+        dummy_offset += len(dummy_names)
+    return packed_nodes, packed_edges
+
+
+def write_component_layout_json(nodes, edges, f):
+    """
+    layout_components()の結果を、cytoscape.jsの記述形式(JSON)でファイルに書き出す。
+
+    Args:
+        nodes, edges: layout_components()の返り値。
+        f: 書き込み先のファイルオブジェクト。
+
+    Return:
+    """
+    node_items = ((name, {"href": href, "x": x, "y": y, "is_dummy": is_dummy})
+                  for name, href, x, y, is_dummy in nodes)
+    write_cytoscape_elements(node_items, edges, f)
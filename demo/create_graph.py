@@ -5,10 +5,18 @@
 　　2. 交差削減
 　　3．座標決定
 """
-import networkx as nx
+import argparse
+import cProfile
+from contextlib import contextmanager
 import json
-from collections import defaultdict
+from collections import defaultdict, deque
 import math
+import os
+import random
+import time
+import tracemalloc
+
+from brandes_koepf import assign_x_by_brandes_koepf
 
 
 class Node:
@@ -65,25 +73,110 @@ class Stack:
         return self.items.pop()
 
 
-class Count:
+class LayoutProfiler:
     """
-    関数が何度呼ばれたかをカウントするクラス。
+    階層化の各段階(間引き、階層割当、ダミーノードの挿入、交差削減、座標決定)を計測するクラス。
+    1回の階層化ごとにインスタンスを作り、create_layout()のprofilerに渡す。
+    計測結果はインスタンスが持つため、繰り返し(あるいは並行して)階層化を行っても互いに影響しない。
+    ただし、メモリ使用量はtracemallocで計測するため、同じプロセスで並行して計測すると値が混ざる。
 
     Attributes:
-        count: 関数funcを読んだ回数。int。
-        func: 関数オブジェクト。
+        measure_memory: メモリ使用量の最大値を計測するか否か。bool。
+        measure_quality: 各段階の後の交差数とエッジの長さの総和を計測するか否か。bool。
+        profile_directory: cProfileの結果を段階ごとに書き出すディレクトリ。Noneなら書き出さない。
+        stages: 段階ごとの計測結果(辞書)のリスト。段階の実行順に並ぶ。
+    """
+    def __init__(self, measure_memory=True, measure_quality=True, profile_directory=None):
+        self.measure_memory = measure_memory
+        self.measure_quality = measure_quality
+        self.profile_directory = profile_directory
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name, node_list):
+        """
+        with文の中で行った処理を段階nameとして計測する。
+        計測する値
+            ・wall_time: 実行時間(秒)
+            ・peak_memory: メモリ使用量の最大値(バイト)。measure_memoryがTrueの場合のみ
+            ・nodes, dummies, edges: 段階の後のノード数、ダミーノードの数、エッジ数
+            ・crossings, edge_length: 段階の後の交差数とエッジの長さの総和。
+                                      measure_qualityがTrueで、全ノードに階層が割り当てられている場合のみ
+            ・sweeps: 交差削減のスイープごとの経過時間と交差数。record_ordering_history()で呼び出し側が記録する
+
+        Args:
+            name: 段階の名前。str。
+            node_list: 全ノードのリスト。段階の後の値を数えるために用いる。
+
+        Return:
+            段階の計測結果を格納する辞書。
+        """
+        record = {"stage": name}
+        started_tracing = False
+        if self.measure_memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                started_tracing = True
+        profile = cProfile.Profile() if self.profile_directory is not None else None
+        if profile is not None:
+            profile.enable()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["wall_time"] = time.perf_counter() - start
+            if profile is not None:
+                profile.disable()
+                os.makedirs(self.profile_directory, exist_ok=True)
+                file_name = f"{len(self.stages)}_{name.replace(' ', '_')}.prof"
+                profile.dump_stats(os.path.join(self.profile_directory, file_name))
+            if self.measure_memory:
+                record["peak_memory"] = tracemalloc.get_traced_memory()[1]
+                if started_tracing:
+                    tracemalloc.stop()
+            self.stages.append(record)
+        record["nodes"] = len(node_list)
+        record["dummies"] = sum(node.is_dummy for node in node_list)
+        record["edges"] = sum(len(node.targets) for node in node_list)
+        if self.measure_quality and all(node.y >= 0 for node in node_list):
+            # count_cross()と同じ交差数を、転倒数によりO(E log V)で数える
+            record["crossings"] = count_cross_by_inversion(node_list)
+            record["edge_length"] = calc_edge_length_sum(node_list)
+
+    def report(self):
+        """
+        計測結果をJSONに変換できる辞書にまとめる。
+
+        Return:
+            {"stages": 段階ごとの計測結果のリスト, "total_wall_time": 実行時間の合計(秒)}
+        """
+        return {"stages": [dict(record) for record in self.stages],
+                "total_wall_time": sum(record["wall_time"] for record in self.stages)}
+
+    def write_json(self, path):
+        """
+        report()の結果をJSONファイルに書き出す。
+
+        Args:
+            path: 書き出すファイルのパス。
+        """
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+
+def record_ordering_history(record, history):
     """
-    def __init__(self, func):
-        self.count = 0
-        self.func = func
+    交差削減(reduce_cross_by_xcenter())の返すスイープの履歴を、LayoutProfilerの計測結果に記録する。
 
-    def __call__(self, *args, **kwargs):
-        self.count += 1
-        return self.func(*args, **kwargs)
+    Args:
+        record: LayoutProfiler.stage()の返す計測結果の辞書。
+        history: スイープごとの(経過時間[秒], 交差数)のタプルのリスト。
 
-    def reset(self):
-        """カウンタをリセットする"""
-        self.count = 0
+    Return:
+    """
+    record["sweeps"] = [{"elapsed": elapsed, "crossings": cross} for elapsed, cross in history]
 
 
 def create_node_list(input_node_dict):
@@ -200,6 +293,61 @@ def search_removable_dependency(node, node2ancestors):
     return removable_dependency_list
 
 
+def remove_redundant_dependency_by_bitset(nodes):
+    """
+    エッジ(依存関係)の間引きを、整数のビット集合を用いて行う。
+    remove_redundant_dependency()と同じエッジを取り除く。
+    アルゴリズム
+        1. ノードをトポロジカル順(ターゲットが先)に並べ、i番目のノードにビット 1 << i を割り当てる。
+        2. その順にノードを見ていき、ノードの全祖先のビット集合を
+           (ターゲットのビット | ターゲットの全祖先のビット集合) の論理和として求める。
+        3. 別のターゲットの全祖先に含まれるターゲットへのエッジを取り除く。
+        4. 全てのソースを処理し終えたノードのビット集合は破棄し、メモリ使用量を抑える。
+    Args:
+        nodes: 間引きを行いたいノード(1個以上)
+    Return:
+    """
+    sorted_nodes = sort_nodes_topologically(nodes)
+    node2bit = {node: 1 << i for i, node in enumerate(sorted_nodes)}
+    node2ancestors = dict()  # key=node, value=keyの全祖先のビット集合
+    remaining_sources = {node: len(node.sources) for node in sorted_nodes}
+    for node in sorted_nodes:
+        targets = list(node.targets)
+        ancestors = 0
+        all_target_ancestors = 0
+        for target in targets:
+            ancestors |= node2bit[target] | node2ancestors[target]
+            all_target_ancestors |= node2ancestors[target]
+        for target in targets:
+            if all_target_ancestors & node2bit[target]:
+                node.targets.remove(target)
+                target.sources.remove(node)
+            remaining_sources[target] -= 1
+            if remaining_sources[target] == 0:
+                del node2ancestors[target]
+        if remaining_sources[node] > 0:
+            node2ancestors[node] = ancestors
+
+
+def reduce_dependency(nodes, method="bitset"):
+    """
+    methodで選んだ方法で、エッジ(依存関係)の間引きを行う。
+    Args:
+        nodes: 間引きを行いたいノード(1個以上)
+        method: 間引きの方法。REDUCTION_METHODSのkey。
+            "ancestors": remove_redundant_dependency()。
+            "bitset": remove_redundant_dependency_by_bitset()。
+    Return:
+    """
+    REDUCTION_METHODS[method](nodes)
+
+
+REDUCTION_METHODS = {
+    "ancestors": remove_redundant_dependency,
+    "bitset": remove_redundant_dependency_by_bitset,
+}
+
+
 """
 #1．階層割当(最長パス法)
 """
@@ -245,6 +393,69 @@ def assign_level2node_recursively(node_list, target, target_level):
             assign_level2node_recursively(node_list, assign_node, assign_node_level)
 
 
+def assign_level_topologically(node_list):
+    """
+    全てのノードの階層を、トポロジカル順(Kahnのアルゴリズム)で決定する。
+    assign_top_node()と同じ最長パス法の階層を、再帰を用いずO(V+E)で割り当てる。
+    ・ターゲットを持たないノードの階層は0とする。
+    ・それ以外のノードの階層は、ターゲットの階層の最大値+1とする。
+    x座標は0にする。
+
+    Args:
+        node_list:全ノードをNodeクラスでまとめたリスト。
+    """
+    for node in sort_nodes_topologically(node_list):
+        node.y = max([target.y for target in node.targets], default=-1) + 1
+        node.x = 0
+
+
+def sort_nodes_topologically(node_list):
+    """
+    ターゲットを持たないノードから順に、全てのターゲットが先に現れるようにノードを並べる。
+
+    Args:
+        node_list:全ノードをNodeクラスでまとめたリスト。
+
+    Return:
+        並べ替えたノードのリスト。
+
+    Raises:
+        ValueError: グラフに閉路があり、並べられないノードが残った場合。
+    """
+    remaining_targets = {node: len(node.targets) for node in node_list}
+    queue = deque(node for node in node_list if not node.targets)
+    sorted_nodes = []
+    while queue:
+        node = queue.popleft()
+        sorted_nodes.append(node)
+        for source in node.sources:
+            remaining_targets[source] -= 1
+            if remaining_targets[source] == 0:
+                queue.append(source)
+    if len(sorted_nodes) != len(node_list):
+        raise ValueError("グラフに閉路があるため、ノードを並べられません")
+    return sorted_nodes
+
+
+def assign_level(node_list, method="topological"):
+    """
+    methodで選んだ方法で、全てのノードの階層を決定する。
+
+    Args:
+        node_list:全ノードをNodeクラスでまとめたリスト。
+        method: 階層割当の方法。LAYERING_METHODSのkey。
+            "recursive": assign_top_node()。
+            "topological": assign_level_topologically()。
+    """
+    LAYERING_METHODS[method](node_list)
+
+
+LAYERING_METHODS = {
+    "recursive": assign_top_node,
+    "topological": assign_level_topologically,
+}
+
+
 def assign_x_sequentially(node_list):
     """
     全てのノードに対して、x座標を割り当てる。
@@ -269,24 +480,32 @@ def cut_edges_higher_than_1(node_list):
     その後、スタックの内容をcut_edge()を用いてダミーノードを取得し、
     それをnode_listに挿入し、階層差がすべて1になるようにする。
 
+    ダミーノードの番号はこの関数の呼び出しごとに1から数えるため、
+    繰り返し(あるいは並行して)階層化を行っても互いに影響しない。
+
     Args:
         node_list:全ノードをNodeクラスでまとめたリスト。
 
     Return:
+        挿入したダミーノードの数。
     """
     cut_edge_stack = Stack()
     for target in node_list:
-        for source in target.sources:
+        # 集合の順序は実行ごとに変わるため、ダミーノードの名前と順序が毎回同じになるよう名前順に見る
+        for source in sorted(target.sources, key=lambda node: node.name):
             if calc_edge_height(source, target) > 1:
                 cut_edge_stack.push((source, target))
 
+    dummy_count = 0
     while cut_edge_stack.is_empty() is False:
         source, target = cut_edge_stack.pop()
-        dummy = cut_edge(source, target)
+        dummy_count += 1
+        dummy = cut_edge(source, target, dummy_count)
         # dummyの内容はcut_edges()のReturn:を参照。
         node_list.append(dummy)
         if calc_edge_height(dummy, target) > 1:
             cut_edge_stack.push((dummy, target))
+    return dummy_count
 
 
 def calc_edge_height(node1, node2):
@@ -302,19 +521,19 @@ def calc_edge_height(node1, node2):
     return abs(node1.y - node2.y)
 
 
-@Count
-def cut_edge(source, target):
+def cut_edge(source, target, dummy_number):
     """
     source_nodeとtarget_nodeのエッジを切り、その間にダミーノードを挿入する。
 
     Args:
         source: target_nodesからtargetを取り除き、間にダミーノードを入れたいノード。Nodeオブジェクト。
         target: source_nodesからsourceを取り除き、間にダミーノードを入れたいノード。Nodeオブジェクト。
+        dummy_number: ダミーノードの名前に付ける番号。int。
 
     Return:
         dummy: sourceとtargetの間に挿入したダミーノード。階層はsourceの一つ上にする。Nodeオブジェクト。
             属性は次のように設定する。
-            name: "dummy1"(数字はインクリメントしていく)。
+            name: "dummy" + str(dummy_number)。
             targets: 要素がtargetのみの集合。
             sources: 要素がsourceのみの集合。
             x: 0
@@ -323,10 +542,9 @@ def cut_edge(source, target):
             is_dummy: True
     """
     assert calc_edge_height(source, target) > 1
-    dummy_counter = cut_edge.count
     source.targets.remove(target)
     target.sources.remove(source)
-    dummy = Node("dummy" + str(dummy_counter),
+    dummy = Node("dummy" + str(dummy_number),
                  targets={target},
                  sources={source},
                  x=0,
@@ -339,6 +557,154 @@ def cut_edge(source, target):
     return dummy
 
 
+class DummyChain:
+    """
+    2階層以上はなれたエッジ(長いエッジ)を、ダミーノードの列の代わりに1つのオブジェクトで表すクラス。
+    長いエッジが跨ぐ各階層の位置は、ChainSlotオブジェクト(slots)が仮想的なノードとして持つ。
+
+    Attributes:
+        source, target: 長いエッジのソースとターゲット。Nodeオブジェクト。
+        first_number: slots[0]の名前に付ける番号。slots[i]の名前は"dummy" + str(first_number + i)。
+        slots: sourceの1つ下の階層(y=source.y-1)からtargetの1つ上の階層までのChainSlotオブジェクトのリスト。
+    """
+    __slots__ = ("source", "target", "first_number", "slots")
+
+    def __init__(self, source, target, first_number):
+        self.source = source
+        self.target = target
+        self.first_number = first_number
+        self.slots = [ChainSlot(self, index, source.y - 1 - index) for index in range(source.y - target.y - 1)]
+
+    @property
+    def xs(self):
+        """各階層の仮想的なx座標のリスト。slotsと同じ順に並ぶ"""
+        return [slot.x for slot in self.slots]
+
+
+class ChainSlot:
+    """
+    DummyChainが跨ぐ1つの階層の位置。交差削減や座標決定では、ダミーノード(Nodeオブジェクト)と同じく扱える。
+    targets, sourcesは集合の代わりに、同じ長いエッジの隣の位置(両端はtarget, source)だけを要素に持つタプルを返す。
+    属性はname, x, y, href, is_dummyを持ち、xのみ書き換えてよい。
+
+    Attributes:
+        chain: 属するDummyChainオブジェクト。
+        index: chain.slotsでの位置。int。
+        x, y: 位置の座標。
+    """
+    __slots__ = ("chain", "index", "x", "y")
+    href = ""
+    is_dummy = True
+
+    def __init__(self, chain, index, y):
+        self.chain = chain
+        self.index = index
+        self.x = 0
+        self.y = y
+
+    @property
+    def name(self):
+        return "dummy" + str(self.chain.first_number + self.index)
+
+    @property
+    def targets(self):
+        chain = self.chain
+        index = self.index + 1
+        return (chain.slots[index],) if index < len(chain.slots) else (chain.target,)
+
+    @property
+    def sources(self):
+        chain = self.chain
+        return (chain.slots[self.index - 1],) if self.index else (chain.source,)
+
+    def __str__(self):
+        return f"name: {self.name}, (x, y)= ({self.x}, {self.y})"
+
+
+def cut_edges_into_chains(node_list):
+    """
+    cut_edges_higher_than_1()と同じく階層差がすべて1になるようにするが、
+    長いエッジ1本につきダミーノードの代わりにDummyChainオブジェクトを1つ作る。
+    node_listにはDummyChainの各位置(ChainSlotオブジェクト)を挿入し、
+    長いエッジのsource, targetのtargets, sourcesは、それぞれ最初と最後の位置に付け替える。
+    ダミーノードごとに集合を2つ持つNodeオブジェクトを作らないため、メモリ使用量と挿入の時間が少ない。
+
+    Args:
+        node_list:全ノードをNodeクラスでまとめたリスト。
+
+    Return:
+        作成したDummyChainオブジェクトのリスト。
+    """
+    long_edges = []
+    for target in node_list:
+        # cut_edges_higher_than_1()と同じく、実行ごとに同じ名前になるよう名前順に見る
+        for source in sorted(target.sources, key=lambda node: node.name):
+            if calc_edge_height(source, target) > 1:
+                long_edges.append((source, target))
+
+    # cut_edges_higher_than_1()はスタックから取り出した順に番号を付けるため、同じ名前と順序になるよう逆順に見る
+    chains = []
+    dummy_count = 0
+    for source, target in reversed(long_edges):
+        chain = DummyChain(source, target, dummy_count + 1)
+        dummy_count += len(chain.slots)
+        source.targets.remove(target)
+        source.targets.add(chain.slots[0])
+        target.sources.remove(source)
+        target.sources.add(chain.slots[-1])
+        node_list.extend(chain.slots)
+        chains.append(chain)
+    return chains
+
+
+def expand_dummy_chains(node_list):
+    """
+    node_listのChainSlotオブジェクトを、同じ名前と座標を持つダミーノード(Nodeオブジェクト)に置き換える。
+    cut_edges_higher_than_1()でダミーノードを挿入した場合と同じ形のノードのリストになる。
+
+    Args:
+        node_list: cut_edges_into_chains()でChainSlotオブジェクトを挿入したノードのリスト。
+
+    Return:
+    """
+    slot2dummy = dict()
+    for i, node in enumerate(node_list):
+        if isinstance(node, ChainSlot):
+            dummy = Node(node.name, x=node.x, y=node.y, is_dummy=True)
+            slot2dummy[node] = dummy
+            node_list[i] = dummy
+    for slot, dummy in slot2dummy.items():
+        chain = slot.chain
+        dummy.targets.add(slot2dummy[slot.targets[0]] if slot.targets[0] in slot2dummy else chain.target)
+        dummy.sources.add(slot2dummy[slot.sources[0]] if slot.sources[0] in slot2dummy else chain.source)
+        if slot.index == 0:
+            chain.source.targets.remove(slot)
+            chain.source.targets.add(dummy)
+        if slot.index == len(chain.slots) - 1:
+            chain.target.sources.remove(slot)
+            chain.target.sources.add(dummy)
+
+
+def insert_dummy_nodes(node_list, method="nodes"):
+    """
+    methodで選んだ方法で、階層が2以上はなれているエッジにダミーを挿入する。
+    Args:
+        node_list:全ノードをNodeクラスでまとめたリスト。
+        method: 挿入の方法。DUMMY_METHODSのkey。
+            "nodes": cut_edges_higher_than_1()。1階層ごとにダミーノード(Nodeオブジェクト)を挿入する。
+            "chains": cut_edges_into_chains()。長いエッジ1本ごとにDummyChainオブジェクトを作る。
+    Return:
+        methodで選んだ関数の返り値。
+    """
+    return DUMMY_METHODS[method](node_list)
+
+
+DUMMY_METHODS = {
+    "nodes": cut_edges_higher_than_1,
+    "chains": cut_edges_into_chains,
+}
+
+
 def sort_nodes_by_xcenter(all_nodes, downward):
     """
     重心が小さいノードから左に配置する。
@@ -423,6 +789,134 @@ def assign_x_by_xcenter(node2xcenter_tuple):
     assign_x_sequentially(sorted_nodes)
 
 
+def sort_nodes_by_xcenter_once(all_nodes):
+    """
+    sort_nodes_by_xcenter()を、上から下へ1回、下から上へ1回だけ行う。
+    Args:
+        all_nodes:全ノードをNodeオブジェクトでまとめたリスト。
+    Return:
+    """
+    sort_nodes_by_xcenter(all_nodes, downward=True)
+    sort_nodes_by_xcenter(all_nodes, downward=False)
+
+
+def reduce_cross_by_xcenter(all_nodes, max_iterations=24, time_budget=None):
+    """
+    重心法による並べ替え(スイープ)を、上から下へ、下から上へと交互に繰り返して交差を減らす。
+    ・上から下へのスイープでは、1つ上の階層にあるターゲットから重心を計算する。
+    ・下から上へのスイープでは、1つ下の階層にあるソースから重心を計算する。
+    スイープごとにcount_cross_by_inversion()で交差数を数え、交差数が最小だった配置を記録しておき、
+    終了時にその配置に戻す。次のいずれかを満たしたら終了する。
+        ・交差数が0になった
+        ・同じ向きの前回のスイープと同じ配置になった(収束した、または周期的に繰り返している)
+        ・スイープの回数がmax_iterationsに達した
+        ・経過時間がtime_budget(秒)を超えた
+    Args:
+        all_nodes:全ノードをNodeオブジェクトでまとめたリスト。階層割当、ダミーノードの挿入は済ませておく。
+        max_iterations: スイープの回数の上限。
+        time_budget: 経過時間の上限(秒)。Noneなら制限しない。
+    Return:
+        history: スイープごとの(経過時間[秒], 交差数)のタプルのリスト。先頭は並べ替え前の値。
+    """
+    start = time.perf_counter()
+    level2nodes = divide_nodes_by_level(all_nodes)
+    best_cross = count_cross_by_inversion(all_nodes)
+    best_x = [node.x for node in all_nodes]
+    history = [(0.0, best_cross)]
+    direction2last_x = {True: None, False: None}  # key=downward, value=その向きの前回のスイープ後のx座標
+    downward = True
+    for _ in range(max_iterations):
+        if best_cross == 0:
+            break
+        if time_budget is not None and time.perf_counter() - start >= time_budget:
+            break
+        sweep_nodes_by_xcenter(level2nodes, downward)
+        current_x = [node.x for node in all_nodes]
+        cross = count_cross_by_inversion(all_nodes)
+        history.append((time.perf_counter() - start, cross))
+        if cross < best_cross:
+            best_cross = cross
+            best_x = current_x
+        if current_x == direction2last_x[downward]:
+            break
+        direction2last_x[downward] = current_x
+        downward = not downward
+
+    for node, x in zip(all_nodes, best_x):
+        node.x = x
+    return history
+
+
+def reduce_cross_by_xcenter_compact(all_nodes, max_iterations=24, time_budget=None):
+    """
+    reduce_cross_by_xcenter()と同じ交差削減を、compact_graph.CompactGraph上で行う。
+    CompactGraphは1度だけ作り、全てのスイープと交差数の計算に用い、最後にx座標をall_nodesに書き戻す。
+    idはall_nodesの順に割り当てるため、重心が等しいノードの順も含めてreduce_cross_by_xcenter()と同じ
+    x座標と履歴(経過時間を除く)になる。
+    compact_graph(numpy)はこの関数でのみ用いるため、ここでimportする。
+    Args:
+        all_nodes:全ノードをNodeオブジェクトでまとめたリスト。階層割当、ダミーノードの挿入は済ませておく。
+        max_iterations: スイープの回数の上限。
+        time_budget: 経過時間の上限(秒)。Noneなら制限しない。
+    Return:
+        history: スイープごとの(経過時間[秒], 交差数)のタプルのリスト。先頭は並べ替え前の値。
+    """
+    import compact_graph
+
+    graph = compact_graph.compact_graph_from_node_list(all_nodes)
+    history = compact_graph.reduce_cross_by_xcenter(graph, max_iterations, time_budget)
+    for node, x in zip(all_nodes, graph.x.tolist()):
+        node.x = x
+    return history
+
+
+def sweep_nodes_by_xcenter(level2nodes, downward):
+    """
+    1回のスイープを行う。各階層のノードを、隣の階層(上から下へならターゲット、下から上へならソース)
+    の重心の昇順に並べ、x座標を振り直す。
+    スイープの最初の階層は隣の階層がないため並べ替えない。
+    隣の階層にノードを持たないノードは、今のx座標を重心とみなす。重心が等しいノードは今のx座標の順に並べる。
+    Args:
+        level2nodes: key=階層, value=階層がkeyのノードのリスト となる辞書。divide_nodes_by_level()の返り値。
+        downward: Trueなら階層の上から下へ、Falseなら下から上へ操作を行う。
+    Return:
+    """
+    for level in sorted(level2nodes, reverse=not downward)[1:]:
+        nodes = level2nodes[level]
+        node2key = dict()
+        for node in nodes:
+            neighbors = node.targets if downward else node.sources
+            node2key[node] = (calc_xcenter(neighbors) if neighbors else node.x, node.x)
+        assign_x_sequentially(sorted(nodes, key=node2key.__getitem__))
+
+
+def order_nodes(all_nodes, method="iterated", time_budget=None):
+    """
+    methodで選んだ方法で、各階層のノードを並べ替えて交差を減らす。
+    Args:
+        all_nodes:全ノードをNodeオブジェクトでまとめたリスト。
+        method: 並べ替えの方法。ORDERING_METHODSのkey。
+            "single": sort_nodes_by_xcenter_once()。
+            "iterated": reduce_cross_by_xcenter()。
+            "compact": reduce_cross_by_xcenter_compact()。"iterated"と同じx座標になる。
+        time_budget: 経過時間の上限(秒)。Noneなら制限しない。
+                     "iterated"と"compact"のみ用いる("single"は1往復だけ並べ替えるため打ち切らない)。
+    Return:
+        methodで選んだ関数の返り値。
+    """
+    ordering_func = ORDERING_METHODS[method]
+    if time_budget is not None and ordering_func in (reduce_cross_by_xcenter, reduce_cross_by_xcenter_compact):
+        return ordering_func(all_nodes, time_budget=time_budget)
+    return ordering_func(all_nodes)
+
+
+ORDERING_METHODS = {
+    "single": sort_nodes_by_xcenter_once,
+    "iterated": reduce_cross_by_xcenter,
+    "compact": reduce_cross_by_xcenter_compact,
+}
+
+
 """
 交差の計測
 エッジの総和の計測
@@ -454,6 +948,74 @@ def count_cross(all_nodes):
     return cross_counter
 
 
+def count_cross_by_inversion(all_nodes):
+    """
+    count_cross()と同じ交差数を、転倒数の数え上げによりO(E log V)で数える。
+    Args:
+        all_nodes:全てのノード。Nodeオブジェクトのリスト。
+    Return:
+        交差数(int)
+    """
+    return sum(count_cross_by_level(all_nodes).values())
+
+
+def count_cross_by_level(all_nodes):
+    """
+    交差数を階層ごとに数える。交差条件はcount_cross()と同じ。
+    階層ごとのエッジをソースの階層で分け、それぞれcount_inversions()で数える。
+    Args:
+        all_nodes:全てのノード。Nodeオブジェクトのリスト。
+    Return:
+        level2cross: key=階層(エッジのターゲットの階層), value=その階層の交差数 となる辞書。
+    """
+    level2cross = dict()
+    level2nodes = divide_nodes_by_level(all_nodes)
+    for level, nodes in sorted(level2nodes.items()):
+        source_level2positions = defaultdict(list)
+        for source, target in make_edge(nodes):
+            source_level2positions[source.y].append((source.x, target.x))
+        level2cross[level] = sum(count_inversions(positions) for positions in source_level2positions.values())
+    return level2cross
+
+
+def count_inversions(positions):
+    """
+    (s, t)の組のリストについて、s1 < s2 かつ t1 > t2 となる組の対の数を数える。
+    sの昇順に組を見ていき、それまでに見たtのうち自身より大きいものの数を
+    Fenwick木(BIT)で数える(Barth, Jünger, Mutzelの方法)。sが等しい組同士は数えない。
+    Args:
+        positions: (ソースのx座標, ターゲットのx座標)のタプルのリスト
+    Return:
+        該当する組の対の数(int)
+    """
+    t2rank = {t: rank for rank, t in enumerate(sorted({t for _, t in positions}), start=1)}
+    tree = [0] * (len(t2rank) + 1)
+    inversions = 0
+    inserted = 0
+    sorted_positions = sorted(positions)
+    start = 0
+    while start < len(sorted_positions):
+        # sが等しい組をまとめて、先に数えてからFenwick木に追加する
+        end = start
+        while end < len(sorted_positions) and sorted_positions[end][0] == sorted_positions[start][0]:
+            end += 1
+        for _, t in sorted_positions[start:end]:
+            rank = t2rank[t]
+            not_greater = 0
+            while rank > 0:
+                not_greater += tree[rank]
+                rank -= rank & -rank
+            inversions += inserted - not_greater
+        for _, t in sorted_positions[start:end]:
+            rank = t2rank[t]
+            while rank < len(tree):
+                tree[rank] += 1
+                rank += rank & -rank
+        inserted += end - start
+        start = end
+    return inversions
+
+
 def make_edge(nodes):
     """
     グラフのエッジを取得する。ノードのソースを用いて作成する。
@@ -546,8 +1108,7 @@ def move_node_closer_to_connected_nodes(all_nodes, downward):
     ノードのx座標をターゲットもしくはソースに近づくように更新する。
     更新は上の階層から下の階層へ、もしくは下の階層から上の階層へと各階層ごとに行う。
     更新のために、優先順位や理想x座標を求め、更新は
-    update_x_in_priority_order(), update_x2idealx_recursively()
-    にて行う。
+    update_x_in_priority_order_iteratively()にて行う。
     Args:
         all_nodes: 全てのノード
         downward: 上の階層から下の階層へ行うかどうか。
@@ -559,7 +1120,67 @@ def move_node_closer_to_connected_nodes(all_nodes, downward):
     for level, nodes in sorted(level2nodes.items(), key=key):
         node2priority_dict = node2priority(nodes, downward)
         node2idealx_dict = node2idealx(nodes, downward)
-        update_x_in_priority_order(nodes, node2priority_dict, node2idealx_dict)
+        update_x_in_priority_order_iteratively(nodes, node2priority_dict, node2idealx_dict)
+
+
+def move_nodes_closer_both_ways(all_nodes):
+    """
+    move_node_closer_to_connected_nodes()を上の階層から下の階層へ、次に下の階層から上の階層へと行う。
+    Args:
+        all_nodes: 全てのノード
+    Return:
+    """
+    move_node_closer_to_connected_nodes(all_nodes, downward=True)
+    move_node_closer_to_connected_nodes(all_nodes, downward=False)
+
+
+def move_nodes_closer_both_ways_compact(all_nodes):
+    """
+    move_nodes_closer_both_ways()と同じ座標決定を、優先度と理想x座標をcompact_graph.CompactGraph上で
+    階層ごとにまとめて計算して行う。x座標の更新はupdate_x_in_priority_order_iteratively()で行うため、
+    move_nodes_closer_both_ways()と同じx座標になる。CompactGraphは2回のスイープで1度だけ作り、
+    階層を更新するごとにそのx座標を書き戻す。
+    compact_graph(numpy)はこの関数でのみ用いるため、ここでimportする。
+    Args:
+        all_nodes: 全てのノード
+    Return:
+    """
+    import compact_graph
+
+    graph = compact_graph.compact_graph_from_node_list(all_nodes)
+    level2ids = compact_graph.divide_nodes_by_level(graph)
+    for downward in (True, False):
+        for level in sorted(level2ids, reverse=not downward):
+            ids = level2ids[level]
+            nodes = [all_nodes[i] for i in ids.tolist()]
+            priorities = compact_graph.calc_level_priorities(graph, ids, downward).tolist()
+            idealx = compact_graph.calc_level_idealx(graph, ids, downward).tolist()
+            update_x_in_priority_order_iteratively(nodes, dict(zip(nodes, priorities)), dict(zip(nodes, idealx)))
+            graph.x[ids] = [node.x for node in nodes]
+
+
+def assign_coordinate(all_nodes, method="sequential"):
+    """
+    methodで選んだ方法で、交差削減の後の各ノードのx座標を決める。
+    Args:
+        all_nodes: 全てのノード
+        method: 座標決定の方法。COORDINATE_METHODSのkey。
+            "sequential": 交差削減で割り当てた x=0, 1, 2, ... をそのまま用いる。
+            "priority": move_nodes_closer_both_ways()。
+            "priority-compact": move_nodes_closer_both_ways_compact()。"priority"と同じx座標になる。
+            "brandes-koepf": brandes_koepf.assign_x_by_brandes_koepf()。x座標は0.5刻みの値になる。
+                             水平方向の圧縮は元論文のクラスとシフトによる(訂正後の)方法で行う。
+    Return:
+    """
+    COORDINATE_METHODS[method](all_nodes)
+
+
+COORDINATE_METHODS = {
+    "sequential": lambda all_nodes: None,
+    "priority": move_nodes_closer_both_ways,
+    "priority-compact": move_nodes_closer_both_ways_compact,
+    "brandes-koepf": assign_x_by_brandes_koepf,
+}
 
 
 def node2priority(nodes, from_targets):
@@ -647,87 +1268,53 @@ def update_idealx(node2idealx_dict):
         node2idealx_dict[node] = idealx
 
 
-def update_x_in_priority_order(nodes, node2priority_dict, node2idealx_dict):
+def update_x_in_priority_order_iteratively(nodes, node2priority_dict, node2idealx_dict):
     """
     1つの階層のノードのx座標の更新順序を決め、更新を行う。
     順序は優先度(priority)が大きい順とする。優先度が同じ場合は、x座標の値が小さいほうが先になる。
-    更新は、update_x2idealx_recursively()にて行う。
+    以前の再帰による実装(benchmarks/priority_reference.pyに残している)と同じx座標になるが、
+    ノードのインデックスは辞書で、割当済みかどうかはインデックスごとのフラグで管理するため、
+    nodes.index()やリストの探索、再帰を行わない。
     アルゴリズム
-        1．与えられたnodesをx座標値で昇順にソートする
-        2．ノードのx座標値を優先度が高い順に更新していく。
-        3．更新したノードはその都度記録する。
+        1．与えられたnodesをx座標値で昇順にソートし、ノードからインデックスへの辞書を作る
+        2．優先度が高い順に、更新するノードから理想x座標の方向へ隣のノードを辿り、
+           以前の実装と同じ条件で、一緒に動かすノードの範囲と端のx座標を決める
+        3．範囲内のノードに、端から順にx座標を割り当てる
+        4．更新したノードのフラグを立てる
     Args:
         nodes: 同階層のノードのリスト
         node2priority_dict: key=Nodeオブジェクト, value=優先度 となっている辞書
         node2idealx_dict: key=Nodeオブジェクト, value=理想のx座標値 となっている辞書
     Return:
     """
-    assigned_nodes = []
     nodes = sorted(nodes, key=lambda a: a.x)
+    node2index = {node: i for i, node in enumerate(nodes)}
+    is_assigned = [False] * len(nodes)
+    last_index = len(nodes) - 1
     for node, priority in sorted(node2priority_dict.items(), key=lambda a: (-a[1], a[0].x)):
-        node_stack = Stack()
-        node_stack.push(node)
-        sign = 1 if node.x < node2idealx_dict[node] else -1
-        update_x2idealx_recursively(nodes.index(node), nodes, node2idealx_dict[node], node_stack, assigned_nodes, sign)
-        assigned_nodes.append(node)
-
-        
-def update_x2idealx_recursively(node_index, same_level_nodes, ideal_x,  node_stack, assigned_nodes, sign):
-    """
-    ノードのx座標を更新する。
-    アルゴリズム
-        1. 更新するノード(same_level_nodes[node_index])が、ノード列の端に到達していた場合、
-           node_stackに入ったノードを理想x座標まで動かし、割り当てて、走査終了
-        2. node_indexの隣のインデックスのノードを取得する
-        3. 2で取得したノードのx座標が理想x座標よりも遠い場所にあった場合
-            node_stackを理想x座標まで動かし、割り当てて、走査終了
-        4. 2で取得したノードのx座標が理想x座標よりも近い、あるいは一致していた場合
-            4.1 そのノードが割当済みノードならば、その1つ手前のx座標からnode_stack内のノードを並べる
-            4.2 そのノードが割当済みでなければ、node_stackにそのノードを追加、更新するノードをそのノードにし、
-                理想x座標を更新し、1に戻る。
-    Args:
-        node_index: x座標を更新したいノードのsame_level_nodesにおけるインデックス
-        same_level_nodes: 操作を行う階層のノード
-        ideal_x: x座標を更新したいノードsame_level_nodes[node_index]の理想のx座標値
-        assigned_nodes: 既に割り当てを行った、動かしたくないノードのリスト
-        node_stack: 座標を更新している途中のノードが入ったスタック。
-                    初期値としてsame_level_nodes[node_index]をプッシュしておく必要がある。
-        sign: 理想x座標が今のx座標より大きいければ+1, 小さければ-1。
-    Return:
-    """
-    if (node_index == 0 and sign == -1) or (node_index == len(same_level_nodes) - 1 and sign == 1):
-        assign_x_in_sequence(node_stack, ideal_x, -sign)
-        return
-
-    next_node = same_level_nodes[node_index+sign]
-
-    if (next_node.x > ideal_x and sign == 1) or (next_node.x < ideal_x and sign == -1):
-        assign_x_in_sequence(node_stack, ideal_x, -sign)
-        return
-
-    else:
-        if next_node in assigned_nodes:
-            assign_x_in_sequence(node_stack, next_node.x-sign, -sign)
-        else:
-            node_stack.push(next_node)
-            node_index += sign
+        node_index = node2index[node]
+        ideal_x = node2idealx_dict[node]
+        sign = 1 if node.x < ideal_x else -1
+        end_index = node_index  # 一緒に動かすノードの範囲の端(理想x座標側)
+        while True:
+            if (end_index == 0 and sign == -1) or (end_index == last_index and sign == 1):
+                end_x = ideal_x
+                break
+            next_node = nodes[end_index + sign]
+            if (next_node.x > ideal_x and sign == 1) or (next_node.x < ideal_x and sign == -1):
+                end_x = ideal_x
+                break
+            if is_assigned[end_index + sign]:
+                end_x = next_node.x - sign
+                break
+            end_index += sign
             ideal_x += sign
-            update_x2idealx_recursively(node_index, same_level_nodes, ideal_x, node_stack, assigned_nodes, sign)
-            
-            
-def assign_x_in_sequence(nodes_stack, x, sign):
-    """
-    nodes_stack内のノードを空になるまでポップして、順にx座標を割り当てる。
-    Args:
-        nodes_stack: ノードが入ったスタック
-        x: 最初popされるノードに割り当てるx座標の値
-        sign: +1 or -1, +1: 順に増やしたい場合、-1: 順に減らしたい場合
-    Return:
-    """
-    while nodes_stack.is_empty() is False:
-        node = nodes_stack.pop()
-        node.x = x
-        x += sign
+
+        # 端のノードから更新するノードへと順にx座標を割り当てる
+        for index in range(end_index, node_index - sign, -sign):
+            nodes[index].x = end_x
+            end_x -= sign
+        is_assigned[node_index] = True
 
 
 """
@@ -759,6 +1346,55 @@ def node_list2node_dict(node_list):
     return node_dict
 
 
+def write_cytoscape_json(node_list, f):
+    """
+    ノードのリストを、cytoscape.jsの記述形式(JSON)でファイルに書き出す。
+    networkxのグラフを経由せず、ノードとエッジを1つずつ書き出すため、
+    グラフ全体の辞書や文字列を作らない。出力はnx.cytoscape_data()と同じ構造になる。
+
+    Args:
+        node_list:全ノードをNodeクラスでまとめたリスト。
+        f: 書き込み先のファイルオブジェクト。
+
+    Return:
+    """
+    node_items = ((node.name, {"href": node.href, "x": node.x, "y": node.y, "is_dummy": node.is_dummy})
+                  for node in node_list)
+    edges = ((source.name, target.name)
+             for source in node_list for target in sorted(source.targets, key=lambda node: node.name))
+    write_cytoscape_elements(node_items, edges, f)
+
+
+def write_cytoscape_elements(node_items, edges, f):
+    """
+    ノードとエッジを、cytoscape.jsの記述形式(JSON)でファイルに書き出す。
+    出力の例:
+        {"data": [], "directed": true, "multigraph": false,
+         "elements": {"nodes": [{"data": {"href": ..., "x": ..., "y": ..., "is_dummy": ...,
+                                          "id": "a", "value": "a", "name": "a"}}, ...],
+                      "edges": [{"data": {"source": "b", "target": "a"}}, ...]}}
+
+    Args:
+        node_items: (ノードの名前, ノードの属性の辞書)のタプルのイテラブル。
+        edges: (ソースの名前, ターゲットの名前)のタプルのイテラブル。
+        f: 書き込み先のファイルオブジェクト。
+
+    Return:
+    """
+    f.write('{"data": [], "directed": true, "multigraph": false, "elements": {"nodes": [')
+    separator = ""
+    for name, attributes in node_items:
+        data = dict(attributes, id=name, value=name, name=name)
+        f.write(separator + json.dumps({"data": data}))
+        separator = ", "
+    f.write('], "edges": [')
+    separator = ""
+    for source, target in edges:
+        f.write(separator + json.dumps({"data": {"source": source, "target": target}}))
+        separator = ", "
+    f.write(']}}')
+
+
 def create_dependency_graph(node_list, graph):
     """
     依存関係を示すグラフを作成する。
@@ -776,81 +1412,182 @@ def create_dependency_graph(node_list, graph):
             graph.add_edge(source.name, target.name)
 
 
-def main():
+def create_layout(input_node_dict, reduction="bitset", layering="topological", dummy="nodes", ordering="iterated",
+                  coordinate="sequential", profiler=None):
     """
-    関数の実行を行う関数。
+    input_node_dictのノードを階層化し、座標を割り当てたノードのリストを返す。
+    手順は 間引き → 階層割当 → ダミーノードの挿入 → 交差削減 → 座標決定 の順。
+
+    Args:
+        input_node_dict: 入力されたノードの関係を示す辞書型データ。create_node_list()を参照。
+        reduction: エッジの間引きの方法。REDUCTION_METHODSのkey。
+        layering: 階層割当の方法。LAYERING_METHODSのkey。
+        dummy: ダミーの挿入の方法。DUMMY_METHODSのkey。"chains"ならダミーはChainSlotオブジェクトになる。
+        ordering: 交差削減の並べ替えの方法。ORDERING_METHODSのkey。
+        coordinate: 座標決定の方法。COORDINATE_METHODSのkey。
+            いずれの段階も、keyの代わりにノードのリストを受け取る関数を渡してもよい。
+        profiler: 各段階を計測するLayoutProfilerオブジェクト。Noneなら計測しない。
+                  交差削減がスイープの履歴を返す場合は、orderingの計測結果のsweepsに記録する。
 
     Return:
+        座標を割り当てたノード(ダミーノードを含む)のリスト。
     """
-    import random
+    profiler = LayoutProfiler(measure_memory=False, measure_quality=False) if profiler is None else profiler
+    node_list = []
+    with profiler.stage("build", node_list):
+        node_list.extend(create_node_list(input_node_dict))
+
+    stages = [
+        ("reduction", REDUCTION_METHODS, reduction),
+        ("layering", LAYERING_METHODS, layering),
+        ("dummy insertion", DUMMY_METHODS, dummy),
+        ("ordering", ORDERING_METHODS, ordering),
+        ("coordinate assignment", COORDINATE_METHODS, coordinate),
+    ]
+    for name, methods, method in stages:
+        stage = method if callable(method) else methods[method]
+        with profiler.stage(name, node_list) as record:
+            history = stage(node_list)
+            if name in ("layering", "dummy insertion"):
+                assign_x_sequentially(node_list)
+        if name == "ordering" and history is not None:
+            record_ordering_history(record, history)
+    return node_list
 
-    def shuffle_dict(d):
-        """
-        辞書（のキー）の順番をランダムにする
 
-        Args:
-            d: 順番をランダムにしたい辞書。
+def draw_preview(node_list):
+    """
+    階層化したグラフをmatplotlibで描画する。
+    networkx, matplotlibはこの関数でのみ用いるため、ここでimportする。
+    ノードの位置には階層化で割り当てた座標を用いる(y座標は上が0)。
 
-        Return:
-            dの順番をランダムにしたもの
-        """
-        keys = list(d.keys())
-        random.shuffle(keys)
-        return dict([(key, d[key]) for key in keys])
-
-    """
-       input_node_dict: 全ノードについての情報を辞書にまとめたもの。dict()
-           key: ノードの名前。
-           value: リスト
-               第1要素: keyのノードが指すノードの集合。set()
-               第2要素: keyのノードのリンク先URL。str()
-    """
-    input_node_dict = {"a": [set(), "example.html"],
-                       "b": [{"a"}, "example.html"],
-                       "c": [{"b", "e"}, "example.html"],
-                       "d": [{"c", "a"}, "example.html"],
-                       "e": [{"a"}, "example.html"],
-                       "f": [{"e", "b", "a"}, "example.html"],
-                       "g": [{"e"}, "example.html"],
-                       "h": [{"g", "f"}, "example.html"],
-                       "i": [{"a"}, "example.html"],
-                       "j": [{"i"}, "example.html"],
-                       "k": [{"j", "m"}, "example.html"],
-                       "l": [{"i", "a"}, "example.html"],
-                       "m": [{"i"}, "example.html"],
-                       "n": [{"j", "m"}, "example.html"],
-                       "o": [{"m", "l"}, "example.html"],
-                       "p": [{"n", "k"}, "example.html"],
-                       "q": [{"k", "o", "i"}, "example.html"],
-                       }
-
-    node_list = create_node_list(shuffle_dict(input_node_dict))
-    remove_redundant_dependency(node_list)
-    assign_top_node(node_list)
-    assign_x_sequentially(node_list)
-    cut_edges_higher_than_1(node_list)
-    assign_x_sequentially(node_list)
-    sort_nodes_by_xcenter(node_list, downward=True)
-    sort_nodes_by_xcenter(node_list, downward=False)
-
-    node_attributes = node_list2node_dict(node_list)
+    Args:
+        node_list:全ノードをNodeクラスでまとめたリスト。
+
+    Return:
+    """
+    import matplotlib.pyplot as plt
+    import networkx as nx
 
     # 有向グラフGraphの作成
     graph = nx.DiGraph()
-
     create_dependency_graph(node_list, graph)
 
-    # nodes_attrsを用いて各ノードの属性値を設定
-    nx.set_node_attributes(graph, node_attributes)
-
     # グラフの描画
-    nx.draw_networkx(graph)
+    nx.draw_networkx(graph, pos={node.name: (node.x, -node.y) for node in node_list})
+    plt.show()
+
+
+def load_input_node_dict(path):
+    """
+    JSONファイルからinput_node_dictを読み込む。
+    ファイルの形式は {"ノードの名前": [["ターゲットの名前", ...], "リンク先URL"], ...} とする。
+
+    Args:
+        path: JSONファイルのパス。
+
+    Return:
+        input_node_dict。ターゲットはset()に変換する。
+    """
+    with open(path) as f:
+        return {name: [set(targets), href] for name, (targets, href) in json.load(f).items()}
+
+
+def shuffle_dict(d, rng):
+    """
+    辞書（のキー）の順番をランダムにする
+
+    Args:
+        d: 順番をランダムにしたい辞書。
+        rng: random.Randomオブジェクト。
+
+    Return:
+        dの順番をランダムにしたもの
+    """
+    keys = list(d.keys())
+    rng.shuffle(keys)
+    return dict([(key, d[key]) for key in keys])
+
+
+"""
+   SAMPLE_INPUT_NODE_DICT: 入力ファイルを指定しない場合に用いる、全ノードについての情報を辞書にまとめたもの。dict()
+       key: ノードの名前。
+       value: リスト
+           第1要素: keyのノードが指すノードの集合。set()
+           第2要素: keyのノードのリンク先URL。str()
+"""
+SAMPLE_INPUT_NODE_DICT = {"a": [set(), "example.html"],
+                          "b": [{"a"}, "example.html"],
+                          "c": [{"b", "e"}, "example.html"],
+                          "d": [{"c", "a"}, "example.html"],
+                          "e": [{"a"}, "example.html"],
+                          "f": [{"e", "b", "a"}, "example.html"],
+                          "g": [{"e"}, "example.html"],
+                          "h": [{"g", "f"}, "example.html"],
+                          "i": [{"a"}, "example.html"],
+                          "j": [{"i"}, "example.html"],
+                          "k": [{"j", "m"}, "example.html"],
+                          "l": [{"i", "a"}, "example.html"],
+                          "m": [{"i"}, "example.html"],
+                          "n": [{"j", "m"}, "example.html"],
+                          "o": [{"m", "l"}, "example.html"],
+                          "p": [{"n", "k"}, "example.html"],
+                          "q": [{"k", "o", "i"}, "example.html"],
+                          }
+
+
+def parse_args(argv=None):
+    """
+    コマンドライン引数を解析する。
+
+    Args:
+        argv: コマンドライン引数のリスト。Noneならsys.argvを用いる。
+
+    Return:
+        argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="依存関係を階層形式で配置し、cytoscape.js形式のJSONを出力する")
+    parser.add_argument("input", nargs="?",
+                        help="入力するJSONファイル({名前: [[ターゲット, ...], URL], ...})。省略時はサンプルのグラフを用いる")
+    parser.add_argument("-o", "--output", default="demo_sample.json", help="出力するJSONファイル")
+    parser.add_argument("--preview", action="store_true", help="matplotlibでグラフを描画する")
+    parser.add_argument("--seed", type=int, help="入力の順番を並べ替える乱数のシード。省略時は毎回異なる")
+    parser.add_argument("--reduction", choices=REDUCTION_METHODS, default="bitset", help="エッジの間引きの方法")
+    parser.add_argument("--layering", choices=LAYERING_METHODS, default="topological", help="階層割当の方法")
+    parser.add_argument("--dummy", choices=DUMMY_METHODS, default="nodes", help="ダミーの挿入の方法")
+    parser.add_argument("--ordering", choices=ORDERING_METHODS, default="iterated", help="交差削減の並べ替えの方法")
+    parser.add_argument("--coordinate", choices=COORDINATE_METHODS, default="sequential", help="座標決定の方法")
+    parser.add_argument("--profile-json", help="各段階の計測結果を書き出すJSONファイル")
+    parser.add_argument("--cprofile-dir", help="各段階のcProfileの結果(.prof)を書き出すディレクトリ")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    関数の実行を行う関数。
+
+    Args:
+        argv: コマンドライン引数のリスト。Noneならsys.argvを用いる。
+
+    Return:
+    """
+    args = parse_args(argv)
+    input_node_dict = SAMPLE_INPUT_NODE_DICT if args.input is None else load_input_node_dict(args.input)
+
+    profiler = LayoutProfiler(measure_memory=args.profile_json is not None,
+                              measure_quality=args.profile_json is not None, profile_directory=args.cprofile_dir)
+    node_list = create_layout(shuffle_dict(input_node_dict, random.Random(args.seed)),
+                              reduction=args.reduction, layering=args.layering, dummy=args.dummy,
+                              ordering=args.ordering, coordinate=args.coordinate, profiler=profiler)
+    if args.profile_json is not None:
+        profiler.write_json(args.profile_json)
 
     # cytoscape.jsの記述形式(JSON)でグラフを記述
-    graph_json = nx.cytoscape_data(graph, attrs=None)
+    with open(args.output, 'w') as f:
+        write_cytoscape_json(node_list, f)
 
-    with open('demo_sample.json', 'w') as f:
-        f.write(json.dumps(graph_json))
+    if args.preview:
+        draw_preview(node_list)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,175 @@
+"""
+依存関係の部分グラフの問い合わせ
+「articleが(k段先までに)依存するもの」「articleに依存するもの」のような部分グラフを、
+グラフ全体を階層化せずに取り出し、そのままlayout_pipeline.LayoutPipelineで階層化する。
+    ・DependencyIndexは、全祖先と全子孫を整数のビット集合として前もって求めておく(推移閉包)
+    ・ビットの番号は入力の順番とするため、ビット集合から取り出したノードは入力の順に並ぶ
+    ・深さを制限しない問い合わせはビット集合から、制限する問い合わせは幅優先探索で取り出す。
+      どちらも取り出すノードとそのエッジの数に比例する時間で済む(ビット集合の走査はCの文字列探索で行う)
+祖先はターゲットを辿って到達するノード(依存先)、子孫はソースを辿って到達するノード(依存元)とする。
+"""
+from collections import deque
+
+from layout_pipeline import LayoutPipeline
+
+DIRECTIONS = ("ancestors", "descendants", "both")
+
+
+def bits2indices(bits):
+    """
+    ビット集合で1が立っているビットの番号を、小さい順に返す。
+
+    Args:
+        bits: ビット集合。int。
+
+    Return:
+        ビットの番号のリスト。
+    """
+    digits = bin(bits)[:1:-1]  # 下位のビットから並べた文字列
+    indices = []
+    index = digits.find("1")
+    while index >= 0:
+        indices.append(index)
+        index = digits.find("1", index + 1)
+    return indices
+
+
+class DependencyIndex:
+    """
+    依存関係のグラフと、その到達可能性の索引をクラスとして定義する。作成後は変更しないため、複数のスレッドから用いてもよい。
+
+    Attributes:
+        names: ノードの名前のリスト。入力の順に並ぶ。
+        name2index: key=ノードの名前, value=namesでの番号 となる辞書。
+        hrefs: ノードのリンク先URLのリスト。
+        targets, sources: ノードのターゲット、ソースの番号のタプルのリスト。
+        ancestors, descendants: ノードの全祖先、全子孫のビット集合(int)のリスト。自分自身は含まない。
+    """
+    def __init__(self, input_node_dict):
+        """
+        Args:
+            input_node_dict: create_graph.create_node_list()の入力と同じ形式の辞書。閉路を持たないこと。
+                             存在しないノードへのエッジは無視する。
+        """
+        self.names = list(input_node_dict)
+        self.name2index = {name: i for i, name in enumerate(self.names)}
+        self.hrefs = [href for _, href in input_node_dict.values()]
+        self.targets = [tuple(sorted(self.name2index[target] for target in targets if target in self.name2index))
+                        for targets, _ in input_node_dict.values()]
+        sources = [[] for _ in self.names]
+        for i, targets in enumerate(self.targets):
+            for target in targets:
+                sources[target].append(i)
+        self.sources = [tuple(s) for s in sources]
+
+        order = self._topological_order()
+        self.ancestors = [0] * len(self.names)
+        for i in order:
+            bits = 0
+            for target in self.targets[i]:
+                bits |= (1 << target) | self.ancestors[target]
+            self.ancestors[i] = bits
+        self.descendants = [0] * len(self.names)
+        for i in reversed(order):
+            bits = 0
+            for source in self.sources[i]:
+                bits |= (1 << source) | self.descendants[source]
+            self.descendants[i] = bits
+
+    def _topological_order(self):
+        """ターゲットが先になるトポロジカル順のノードの番号のリストを返す。閉路があればValueErrorを送出する"""
+        remaining = [len(targets) for targets in self.targets]
+        queue = deque(i for i, count in enumerate(remaining) if count == 0)
+        order = []
+        while queue:
+            i = queue.popleft()
+            order.append(i)
+            for source in self.sources[i]:
+                remaining[source] -= 1
+                if remaining[source] == 0:
+                    queue.append(source)
+        if len(order) != len(self.names):
+            raise ValueError("依存関係に閉路があります")
+        return order
+
+    def depends_on(self, source, target):
+        """sourceがtargetに(推移的に)依存しているか否かを返す"""
+        return bool(self.ancestors[self.name2index[source]] >> self.name2index[target] & 1)
+
+    def neighborhood(self, name, depth=None, direction="ancestors"):
+        """
+        nameからdepth本以内のエッジを辿って到達するノードを返す。
+
+        Args:
+            name: 起点のノードの名前。存在しなければKeyErrorを送出する。
+            depth: 辿るエッジの数の上限。Noneなら制限しない。
+            direction: "ancestors"ならターゲット、"descendants"ならソース、"both"なら両方を辿る。
+                       "both"では向きを混ぜて辿る(兄弟なども含む)。
+
+        Return:
+            起点を含むノードの番号のリスト。入力の順に並ぶ。
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"未知の向きです: {direction}")
+        start = self.name2index[name]
+        if depth is None and direction != "both":
+            closure = self.ancestors if direction == "ancestors" else self.descendants
+            return bits2indices(closure[start] | (1 << start))
+
+        adjacency = []
+        if direction in ("ancestors", "both"):
+            adjacency.append(self.targets)
+        if direction in ("descendants", "both"):
+            adjacency.append(self.sources)
+        reached = {start}
+        queue = deque([(start, 0)])
+        while queue:
+            i, distance = queue.popleft()
+            if depth is not None and distance >= depth:
+                continue
+            for neighbors in adjacency:
+                for neighbor in neighbors[i]:
+                    if neighbor not in reached:
+                        reached.add(neighbor)
+                        queue.append((neighbor, distance + 1))
+        return sorted(reached)
+
+    def subgraph(self, indices):
+        """
+        番号indicesのノードからなる部分グラフを返す。
+
+        Args:
+            indices: ノードの番号のイテラブル。入力の順に並べておく。
+
+        Return:
+            input_node_dict。ターゲットは部分グラフに含まれるものに限る。
+        """
+        indices = list(indices)
+        members = set(indices)
+        return {self.names[i]: [{self.names[target] for target in self.targets[i] if target in members}, self.hrefs[i]]
+                for i in indices}
+
+    def query(self, name, depth=None, direction="ancestors"):
+        """
+        neighborhood()で取り出したノードの部分グラフを返す。
+
+        Return:
+            input_node_dict。入力の順に並ぶ。
+        """
+        return self.subgraph(self.neighborhood(name, depth, direction))
+
+
+def layout_query(index, name, depth=None, direction="ancestors", pipeline=None):
+    """
+    DependencyIndex.query()で取り出した部分グラフを階層化する。
+
+    Args:
+        index: DependencyIndexオブジェクト。
+        name, depth, direction: DependencyIndex.neighborhood()を参照。
+        pipeline: 階層化に用いるLayoutPipelineオブジェクト。Noneなら既定の方法で階層化する。
+
+    Return:
+        layout_pipeline.LayoutResult。
+    """
+    pipeline = LayoutPipeline() if pipeline is None else pipeline
+    return pipeline.run(index.query(name, depth, direction))
@@ -3,7 +3,9 @@ createGraph.pyで出力されたファイルとcytoscape.jsを使って
 グラフの描画を行う
 */
 $(function(){
-    $.getJSON("./demo_sample.json", function(graph_data) {
+    // 描画するファイル。?graph=...で指定でき、クラスタの概観(overview.json)も指定できる
+    let graph_path = new URLSearchParams(window.location.search).get("graph") || "./demo_sample.json";
+    $.getJSON(graph_path, function(graph_data) {
         //描画(graph_draw()をここに書き写す)
         // cytoscapeグラフの作成(初期化)
         let cy = cytoscape({
@@ -14,36 +16,7 @@ $(function(){
             autounselectify: false,
             selectionType: "additive"
         });
-        // グラフにノードを追加
-        for(let data in graph_data["elements"]["nodes"]){
-            for(let component in graph_data["elements"]["nodes"][data]){
-                cy.add({
-                    group: "nodes",
-                    data:{
-                        id: graph_data["elements"]["nodes"][data][component]["id"],
-                        name: graph_data["elements"]["nodes"][data][component]["name"],
-                        dummy: graph_data["elements"]["nodes"][data][component]["dummy"],
-                        href: graph_data["elements"]["nodes"][data][component]["href"]
-                    },
-                    position:{
-                        x: graph_data["elements"]["nodes"][data][component]["x"] * 200,
-                        y: graph_data["elements"]["nodes"][data][component]["y"] * 200
-                    }
-                });
-            }
-        }
-        // グラフにエッジを追加
-        for(let data in graph_data["elements"]["edges"]){
-            for(let component in graph_data["elements"]["edges"][data]){
-                cy.add({
-                    group: "edges",
-                    data:{
-                        source: graph_data["elements"]["edges"][data][component]["source"],
-                        target: graph_data["elements"]["edges"][data][component]["target"]
-                    }
-                })
-            }
-        }
+        add_graph_elements(cy, graph_data);
         // グラフのスタイルを決定
         cy.style([
             /* 初期状態のスタイル */
@@ -213,7 +186,18 @@ $(function(){
         
         
         // ノードをクリックした場合、リンクに飛ぶ(htmlリンクの設定)
+        // クラスタのノード(detailを持つ)の場合は、そのクラスタの詳細のグラフに切り替える
+        let graph_directory = graph_path.substring(0, graph_path.lastIndexOf("/") + 1);
         cy.on("tap", "node", function(){
+            if (this.data("detail")) {
+                $.getJSON(graph_directory + this.data("detail"), function(detail_data) {
+                    reset_elements_style(cy);
+                    cy.elements().remove();
+                    add_graph_elements(cy, detail_data);
+                    cy.fit();
+                });
+                return;
+            }
             try {
                 window.open(this.data("href"));
             } catch(e){
@@ -221,10 +205,61 @@ $(function(){
             }
         });
 
+        // reloadボタンをクリックしたら、最初に読み込んだグラフに戻す
+        $("#reload").click(function() {
+            reset_elements_style(cy);
+            cy.elements().remove();
+            add_graph_elements(cy, graph_data);
+            cy.fit();
+        });
+
     });
 });
 
 
+/**
+ * createGraph.pyで出力された形式のグラフのノードとエッジをcyに追加する。
+ * クラスタの概観のノードは、ノード数(size)と詳細のファイルのパス(detail)も持つ。
+ * @param {cytoscape object} cy cytoscapeのグラフ本体
+ * @param {object} graph_data cytoscape.js形式のJSONを読み込んだもの
+ * @return
+**/
+function add_graph_elements(cy, graph_data) {
+    // グラフにノードを追加
+    for(let data in graph_data["elements"]["nodes"]){
+        for(let component in graph_data["elements"]["nodes"][data]){
+            cy.add({
+                group: "nodes",
+                data:{
+                    id: graph_data["elements"]["nodes"][data][component]["id"],
+                    name: graph_data["elements"]["nodes"][data][component]["name"],
+                    dummy: graph_data["elements"]["nodes"][data][component]["dummy"],
+                    href: graph_data["elements"]["nodes"][data][component]["href"],
+                    size: graph_data["elements"]["nodes"][data][component]["size"],
+                    detail: graph_data["elements"]["nodes"][data][component]["detail"]
+                },
+                position:{
+                    x: graph_data["elements"]["nodes"][data][component]["x"] * 200,
+                    y: graph_data["elements"]["nodes"][data][component]["y"] * 200
+                }
+            });
+        }
+    }
+    // グラフにエッジを追加
+    for(let data in graph_data["elements"]["edges"]){
+        for(let component in graph_data["elements"]["edges"][data]){
+            cy.add({
+                group: "edges",
+                data:{
+                    source: graph_data["elements"]["edges"][data][component]["source"],
+                    target: graph_data["elements"]["edges"][data][component]["target"]
+                }
+            })
+        }
+    }
+}
+
+
 /**
  * グラフの要素のスタイルを初期状態(ノード：赤い丸、エッジ：黒矢印)に戻す。
  * ただし、移動したノードの位置は戻らない。
@@ -0,0 +1,329 @@
+"""
+前回の階層化の結果を用いて、ノードとエッジの追加・削除(差分)だけを反映して配置し直す
+create_graph.create_layout()で全体を階層化し直すと、差分が小さくても全ノードの並びが変わってしまう。
+このモジュールでは
+    ・階層は、ターゲットが変わったノードとそこから(ソースを辿って)影響を受けるノードについてのみ計算し直す
+    ・交差削減は、ノードやエッジが変わった階層(touched levels)についてのみ行う
+    ・それ以外の階層のノード(ダミーノードを含む)は前回のx座標のままにする
+ことで、差分が小さい場合の実行時間を抑え、見た目を保つ。
+前回の配置は、最長パス法の階層割当(create_graph.assign_level())で作ったものとする。
+"""
+from collections import defaultdict
+
+from create_graph import (calc_xcenter, count_cross_by_level, create_node_list, cut_edges_higher_than_1,
+                          divide_nodes_by_level, reduce_dependency)
+
+
+class LayoutDelta:
+    """
+    input_node_dictに対する差分をクラスとして定義する。
+
+    Attributes:
+        added_nodes: 追加するノード。input_node_dictと同じ形式の辞書 {名前: [ターゲットの名前の集合, リンク先URL]}。
+        removed_nodes: 削除するノードの名前の集合。ノードへのエッジも削除する。
+        added_edges: 追加するエッジ(ソースの名前, ターゲットの名前)の集合。
+        removed_edges: 削除するエッジ(ソースの名前, ターゲットの名前)の集合。
+        changed_hrefs: 残すノードのリンク先URLの変更。key=ノードの名前, value=新しいリンク先URL となる辞書。
+    """
+    def __init__(self, added_nodes=None, removed_nodes=None, added_edges=None, removed_edges=None,
+                 changed_hrefs=None):
+        self.added_nodes = dict() if added_nodes is None else added_nodes
+        self.removed_nodes = set() if removed_nodes is None else removed_nodes
+        self.added_edges = set() if added_edges is None else added_edges
+        self.removed_edges = set() if removed_edges is None else removed_edges
+        self.changed_hrefs = dict() if changed_hrefs is None else changed_hrefs
+
+
+def diff_input_node_dicts(old_input_node_dict, new_input_node_dict):
+    """
+    2つのinput_node_dict(例えばMMLの2つの版)の差分を求める。
+
+    Args:
+        old_input_node_dict, new_input_node_dict: create_graph.create_node_list()の入力と同じ形式の辞書。
+
+    Return:
+        old_input_node_dictにapply_delta()で適用するとnew_input_node_dictになるLayoutDeltaオブジェクト。
+    """
+    delta = LayoutDelta(removed_nodes=old_input_node_dict.keys() - new_input_node_dict.keys())
+    for name, (targets, href) in new_input_node_dict.items():
+        if name not in old_input_node_dict:
+            delta.added_nodes[name] = [set(targets), href]
+            continue
+        old_targets, old_href = old_input_node_dict[name]
+        if href != old_href:
+            delta.changed_hrefs[name] = href
+        delta.added_edges.update((name, target) for target in targets - old_targets)
+        delta.removed_edges.update((name, target) for target in old_targets - targets
+                                   if target not in delta.removed_nodes)
+    return delta
+
+
+def apply_delta(input_node_dict, delta):
+    """
+    input_node_dictに差分を適用した新しい辞書を作る。input_node_dictは変更しない。
+    リンク先URLの変更は階層に影響しないため、ターゲットが変わったノードには含めない。
+
+    Args:
+        input_node_dict: create_graph.create_node_list()の入力と同じ形式の辞書。
+        delta: LayoutDeltaオブジェクト。
+
+    Return:
+        (差分を適用したinput_node_dict, ターゲットが変わったノードの名前の集合)
+
+    Raises:
+        ValueError: 追加するノードやエッジが、削除するノードや存在しないノードに接する場合。
+    """
+    new_input_node_dict = {name: [set(targets), href] for name, (targets, href) in input_node_dict.items()
+                           if name not in delta.removed_nodes}
+    for name, (targets, href) in delta.added_nodes.items():
+        new_input_node_dict[name] = [set(targets), href]
+    for name, (targets, _) in delta.added_nodes.items():
+        for target in targets:
+            check_delta_endpoint(new_input_node_dict, delta, f"追加するノード{name}のターゲット", target)
+    for name, href in delta.changed_hrefs.items():
+        check_delta_endpoint(new_input_node_dict, delta, "リンク先URLを変更するノード", name)
+        new_input_node_dict[name][1] = href
+    changed_names = set(delta.added_nodes)
+    for source, target in delta.added_edges:
+        for name in (source, target):
+            check_delta_endpoint(new_input_node_dict, delta, f"追加するエッジ({source}, {target})のノード", name)
+        new_input_node_dict[source][0].add(target)
+        changed_names.add(source)
+    for source, target in delta.removed_edges:
+        if source in new_input_node_dict:
+            new_input_node_dict[source][0].discard(target)
+            changed_names.add(source)
+    if delta.removed_nodes:
+        for name, (targets, _) in new_input_node_dict.items():
+            if not targets.isdisjoint(delta.removed_nodes):
+                targets.difference_update(delta.removed_nodes)
+                changed_names.add(name)
+    return new_input_node_dict, changed_names
+
+
+def check_delta_endpoint(new_input_node_dict, delta, description, name):
+    """
+    差分が参照するノードnameが、差分を適用した後に存在することを確かめる。
+
+    Args:
+        new_input_node_dict: 差分を適用しているinput_node_dict。
+        delta: LayoutDeltaオブジェクト。
+        description: エラーメッセージでnameの前に置く説明。
+        name: ノードの名前。
+
+    Raises:
+        ValueError: nameが削除するノード、または存在しないノードの場合。
+    """
+    if name in delta.removed_nodes:
+        raise ValueError(f"{description}{name}は削除するノードです")
+    if name not in new_input_node_dict:
+        raise ValueError(f"{description}{name}は存在しません")
+
+
+def node_keys(node_list):
+    """
+    配置し直す前後でノードを対応付けるためのkeyを求める。
+    正規のノードのkeyは名前、ダミーノードのkeyは(長いエッジのソースの名前, ターゲットの名前, 階層)とする。
+    ダミーノードの名前は階層化のたびに振り直されるため、名前では対応付けない。
+
+    Args:
+        node_list: 全ノード(ダミーノードを含む)のリスト。
+
+    Return:
+        key=ノード, value=ノードのkey となる辞書。
+    """
+    node2key = dict()
+    for node in node_list:
+        if node.is_dummy:
+            continue
+        node2key[node] = node.name
+        for target in node.targets:
+            chain = []
+            while target.is_dummy:
+                chain.append(target)
+                target = next(iter(target.targets))
+            for dummy in chain:
+                node2key[dummy] = (node.name, target.name, dummy.y)
+    return node2key
+
+
+def level2edge_keys(node_list, node2key):
+    """
+    階層ごとに、その階層のノードに接するエッジのkeyの集合を求める。
+    エッジ(source, target)は、sourceの階層とtargetの階層の両方に含める。
+
+    Return:
+        key=階層, value=(ソースのkey, ターゲットのkey)の集合 となる辞書。
+    """
+    level2edges = defaultdict(set)
+    for source in node_list:
+        for target in source.targets:
+            edge = (node2key[source], node2key[target])
+            level2edges[source.y].add(edge)
+            level2edges[target.y].add(edge)
+    return level2edges
+
+
+def update_levels(node_list, name2previous_y, changed_names):
+    """
+    ターゲットが変わったノードと、そこからソースを辿って到達できるノードについてのみ、最長パス法の階層を計算し直す。
+    それ以外のノードの階層は前回の値のままにする。
+    辿ったノードはトポロジカル順に見ていき、ターゲットの階層が変わらなかったノードは計算を省く。
+
+    Args:
+        node_list: create_node_list()で作ったノードのリスト。
+        name2previous_y: key=ノードの名前, value=前回の階層 となる辞書。
+        changed_names: ターゲットが変わった(追加したノードを含む)ノードの名前の集合。
+
+    Return:
+        階層が変わった(追加したノードを含む)ノードの集合。
+
+    Raises:
+        ValueError: 影響を受けるノードに閉路がある場合。
+    """
+    for node in node_list:
+        node.y = name2previous_y.get(node.name, -1)
+    seeds = [node for node in node_list if node.name in changed_names]
+    region = set(seeds)
+    stack = list(seeds)
+    while stack:
+        for source in stack.pop().sources:
+            if source not in region:
+                region.add(source)
+                stack.append(source)
+
+    # region内でトポロジカル順に並べる(region外のターゲットの階層は決まっている)
+    remaining_targets = {node: sum(target in region for target in node.targets) for node in region}
+    queue = [node for node, count in remaining_targets.items() if count == 0]
+    moved = set()
+    seed_set = set(seeds)
+    visited = 0
+    while queue:
+        node = queue.pop()
+        visited += 1
+        if node in seed_set or not moved.isdisjoint(node.targets):
+            y = max([target.y for target in node.targets], default=-1) + 1
+            if y != node.y:
+                node.y = y
+                moved.add(node)
+        for source in node.sources:
+            remaining_targets[source] -= 1
+            if remaining_targets[source] == 0:
+                queue.append(source)
+    if visited != len(region):
+        raise ValueError("グラフに閉路があるため、ノードを並べられません")
+    return moved
+
+
+def order_touched_levels(level2nodes, touched_levels, max_iterations):
+    """
+    touched_levelsの階層だけを、重心法のスイープで並べ替える。他の階層のx座標は変えない。
+    スイープごとに、touched_levelsに接するエッジの交差数を数え、最小だった配置に戻す。
+
+    Args:
+        level2nodes: key=階層, value=ノードのリスト となる辞書。
+        touched_levels: 並べ替える階層の集合。
+        max_iterations: スイープの回数の上限。
+
+    Return:
+        (並べ替え前の交差数, 並べ替え後の交差数)。touched_levelsに接するエッジについて数える。
+    """
+    # 階層lの交差数はターゲットが階層lのエッジについて数えるため、lとl-1の階層のノードを数える
+    counted_nodes = [node for level in touched_levels | {level - 1 for level in touched_levels}
+                     for node in level2nodes.get(level, [])]
+    touched_nodes = [node for level in touched_levels for node in level2nodes[level]]
+
+    def count_cross():
+        return sum(count_cross_by_level(counted_nodes).values())
+
+    initial_cross = best_cross = count_cross()
+    best_x = [node.x for node in touched_nodes]
+    downward = True
+    for _ in range(max_iterations):
+        if best_cross == 0:
+            break
+        for level in sorted(touched_levels, reverse=not downward):
+            nodes = level2nodes[level]
+            node2key = dict()
+            for node in nodes:
+                neighbors = node.targets if downward else node.sources
+                node2key[node] = (calc_xcenter(neighbors) if neighbors else node.x, node.x)
+            for x, node in enumerate(sorted(nodes, key=node2key.__getitem__)):
+                node.x = x
+        cross = count_cross()
+        if cross < best_cross:
+            best_cross = cross
+            best_x = [node.x for node in touched_nodes]
+        downward = not downward
+    for node, x in zip(touched_nodes, best_x):
+        node.x = x
+    return initial_cross, best_cross
+
+
+def relayout(previous_node_list, previous_input_node_dict, delta, reduction="bitset", max_iterations=4):
+    """
+    前回の配置に差分を反映して配置し直す。
+    手順
+        1. 差分を適用したinput_node_dictからノードのリストを作り、update_levels()で階層を決める。
+        2. 間引きとダミーノードの挿入を行う(階層は最長パス法なので間引きで変わらない)。
+        3. 前回と同じkey(node_keys())を持ち同じ階層にあるノードは、前回のx座標を用いる。
+           新しいノードは、前回の位置を持つ隣のノードのx座標の重心に置く。
+        4. ノードの集合か、ノードに接するエッジの集合が前回と異なる階層をtouched levelsとし、
+           order_touched_levels()で並べ替える。その他の階層のx座標は前回と同じになる。
+
+    Args:
+        previous_node_list: 前回の配置。create_layout()またはrelayout()が返したノードのリスト。
+        previous_input_node_dict: 前回の配置を作ったinput_node_dict。
+        delta: LayoutDeltaオブジェクト。
+        reduction: エッジの間引きの方法。create_graph.REDUCTION_METHODSのkey。
+        max_iterations: touched levelsのスイープの回数の上限。
+
+    Return:
+        (配置し直したノード(ダミーノードを含む)のリスト, touched levelsの集合, 差分を適用したinput_node_dict)
+    """
+    input_node_dict, changed_names = apply_delta(previous_input_node_dict, delta)
+    previous_node2key = node_keys(previous_node_list)
+    key2previous_position = {previous_node2key[node]: (node.x, node.y) for node in previous_node_list}
+    name2previous_y = {node.name: node.y for node in previous_node_list if not node.is_dummy}
+
+    node_list = create_node_list(input_node_dict)
+    update_levels(node_list, name2previous_y, changed_names)
+    reduce_dependency(node_list, method=reduction)
+    cut_edges_higher_than_1(node_list)
+    node2key = node_keys(node_list)
+
+    # 前回と同じ階層にあるノードには前回のx座標を、それ以外のノードには仮のx座標(None)を与える
+    new_nodes = []
+    for node in node_list:
+        position = key2previous_position.get(node2key[node])
+        if position is not None and position[1] == node.y:
+            node.x = position[0]
+        else:
+            node.x = None
+            new_nodes.append(node)
+    new_node2x = dict()
+    for node in new_nodes:
+        neighbors = [neighbor for neighbor in (*node.targets, *node.sources) if neighbor.x is not None]
+        new_node2x[node] = calc_xcenter(neighbors) if neighbors else float("infinity")
+    for node, x in new_node2x.items():
+        node.x = x
+
+    # ノードの集合か、接するエッジの集合が変わった階層を求める
+    previous_level2keys = defaultdict(set)
+    for node in previous_node_list:
+        previous_level2keys[node.y].add(previous_node2key[node])
+    previous_level2edges = level2edge_keys(previous_node_list, previous_node2key)
+    level2nodes = divide_nodes_by_level(node_list)
+    current_level2edges = level2edge_keys(node_list, node2key)
+    touched_levels = {level for level, nodes in level2nodes.items()
+                      if {node2key[node] for node in nodes} != previous_level2keys.get(level, set())
+                      or current_level2edges.get(level, set()) != previous_level2edges.get(level, set())}
+
+    # touched levelsのx座標を前回の順を保って振り直し(新しいノードは同じ重心のノードの後ろ)、並べ替える
+    for level in touched_levels:
+        nodes = level2nodes[level]
+        for x, node in enumerate(sorted(nodes, key=lambda node: (node.x, node2key[node] not in key2previous_position,
+                                                                  str(node2key[node])))):
+            node.x = x
+    order_touched_levels(level2nodes, touched_levels, max_iterations)
+    return node_list, touched_levels, input_node_dict
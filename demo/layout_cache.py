@@ -0,0 +1,215 @@
+"""
+階層化の結果のキャッシュ
+入力(input_node_dict)と階層化の方法(create_layout()の引数)のハッシュ値をキーとして、
+各ノードの座標(node_list2node_dict()の形式)とcytoscape.js形式のJSONを保存する。
+同じ入力と方法であれば、間引きから座標決定までを行わずに保存した結果を返す。
+    ・メモリ上の層: 最近使ったmax_entries個の結果をLRUで保持する
+    ・ディスク上の層(任意): SQLiteのファイルに圧縮して保存し、合計の大きさがmax_disk_bytesを超えたら
+                            最後に使った時刻が古いものから削除する
+"""
+from collections import OrderedDict
+import hashlib
+import inspect
+import io
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+from create_graph import create_layout, node_list2node_dict, write_cytoscape_json
+
+# 階層化の手順を変えて結果が変わる場合は値を変え、以前のキャッシュを使わないようにする
+CACHE_VERSION = 1
+
+# create_layout()の方法の引数とその既定値。省略した引数と既定値を明示した引数が同じキーになるようにする
+DEFAULT_OPTIONS = {name: parameter.default for name, parameter in inspect.signature(create_layout).parameters.items()
+                   if name not in ("input_node_dict", "profiler")}
+
+
+def fingerprint(input_node_dict, options=None):
+    """
+    入力と階層化の方法のハッシュ値(SHA-256)を求める。
+    ターゲットの集合は名前順に並べて正規化する。ノードの順番は階層化の結果(ダミーノードの名前や
+    同じ重心のノードの並び)に影響するため、正規化せずにそのまま含める。
+
+    Args:
+        input_node_dict: create_graph.create_node_list()の入力と同じ形式の辞書。
+        options: create_layout()に渡す方法の辞書。省略した方法は既定値とみなす。
+
+    Return:
+        ハッシュ値の16進数表記。str。
+    """
+    canonical_options = dict(DEFAULT_OPTIONS, **(options or {}))
+    unknown = canonical_options.keys() - DEFAULT_OPTIONS.keys()
+    if unknown:
+        raise ValueError(f"未知の方法です: {sorted(unknown)}")
+    digest = hashlib.sha256()
+    digest.update(json.dumps([CACHE_VERSION, sorted(canonical_options.items())]).encode())
+    for name, (targets, href) in input_node_dict.items():
+        digest.update(json.dumps([name, sorted(targets), href]).encode())
+    return digest.hexdigest()
+
+
+def compute_layout(input_node_dict, options=None):
+    """
+    create_layout()で階層化し、キャッシュに保存する形式に変換する。
+
+    Return:
+        (node_list2node_dict()の辞書, cytoscape.js形式のJSON文字列)
+    """
+    node_list = create_layout(input_node_dict, **(options or {}))
+    f = io.StringIO()
+    write_cytoscape_json(node_list, f)
+    return node_list2node_dict(node_list), f.getvalue()
+
+
+class LayoutCache:
+    """
+    階層化の結果のキャッシュをクラスとして定義する。複数のスレッドから用いてもよい。
+
+    Attributes:
+        max_entries: メモリ上に保持する結果の数の上限。
+        max_disk_bytes: ディスク上に保存する結果の大きさ(圧縮後)の合計の上限。
+        entries: key=ハッシュ値, value=(node_dict, JSON文字列) となるOrderedDict。最近使ったものほど後ろにある。
+        connection: ディスク上の層のSQLiteファイルへの接続。pathを指定しない場合はNone。
+        hits, disk_hits, misses: メモリ上の層で見つかった回数、ディスク上の層で見つかった回数、見つからなかった回数。
+        evictions, disk_evictions: メモリ上の層、ディスク上の層から削除した回数。
+    """
+    def __init__(self, max_entries=32, path=None, max_disk_bytes=256 * 2 ** 20):
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.disk_hits = self.misses = 0
+        self.evictions = self.disk_evictions = 0
+        self.connection = None
+        if path is not None:
+            self.connection = sqlite3.connect(str(path), check_same_thread=False)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS layout ("
+                " key TEXT PRIMARY KEY,"
+                " data BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """ディスク上の層への接続を閉じる"""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def get(self, key):
+        """
+        keyの結果を、メモリ上の層、ディスク上の層の順に探す。ディスク上の層で見つかった場合はメモリ上の層にも置く。
+
+        Args:
+            key: fingerprint()で求めたハッシュ値。
+
+        Return:
+            (node_dict, JSON文字列)。見つからなければNone。
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            entry = self._load(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._put_memory(key, entry)
+            return entry
+
+    def put(self, key, entry):
+        """
+        keyの結果を、メモリ上の層とディスク上の層に保存する。
+
+        Args:
+            key: fingerprint()で求めたハッシュ値。
+            entry: (node_dict, JSON文字列)。
+        """
+        with self.lock:
+            self._put_memory(key, entry)
+            self._store(key, entry)
+
+    def layout(self, input_node_dict, **options):
+        """
+        キャッシュに結果があればそれを返し、なければcompute_layout()で階層化して保存する。
+
+        Args:
+            input_node_dict: create_graph.create_node_list()の入力と同じ形式の辞書。
+            options: create_layout()に渡す方法(reduction, layering, dummy, ordering, coordinate)。
+
+        Return:
+            (node_list2node_dict()の辞書, cytoscape.js形式のJSON文字列)
+        """
+        key = fingerprint(input_node_dict, options)
+        entry = self.get(key)
+        if entry is None:
+            entry = compute_layout(input_node_dict, options)
+            self.put(key, entry)
+        return entry
+
+    def stats(self):
+        """
+        キャッシュの統計を返す。
+
+        Return:
+            hits, disk_hits, misses, evictions, disk_evictions, entries(メモリ上の結果の数),
+            disk_entries, disk_bytes(ディスク上の結果の数と大きさの合計)を持つ辞書。
+        """
+        with self.lock:
+            disk_entries, disk_bytes = (0, 0) if self.connection is None else self.connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM layout").fetchone()
+            return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                    "evictions": self.evictions, "disk_evictions": self.disk_evictions,
+                    "entries": len(self.entries), "disk_entries": disk_entries, "disk_bytes": disk_bytes}
+
+    def _put_memory(self, key, entry):
+        """メモリ上の層に保存し、max_entriesを超えたら最も長く使っていない結果を削除する"""
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def _load(self, key):
+        """ディスク上の層から読み込み、最後に使った時刻を更新する"""
+        if self.connection is None:
+            return None
+        row = self.connection.execute("SELECT data FROM layout WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with self.connection:
+            self.connection.execute("UPDATE layout SET last_access = ? WHERE key = ?", (time.time(), key))
+        node_dict, cytoscape_json = json.loads(zlib.decompress(row[0]))
+        return node_dict, cytoscape_json
+
+    def _store(self, key, entry):
+        """ディスク上の層に圧縮して保存し、max_disk_bytesを超えたら最後に使った時刻が古い結果から削除する"""
+        if self.connection is None:
+            return
+        data = zlib.compress(json.dumps(entry).encode())
+        if len(data) > self.max_disk_bytes:
+            return
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO layout VALUES (?, ?, ?, ?)",
+                                    (key, data, len(data), time.time()))
+            total = self.connection.execute("SELECT SUM(size) FROM layout").fetchone()[0]
+            for old_key, size in self.connection.execute(
+                    "SELECT key, size FROM layout ORDER BY last_access").fetchall():
+                if total <= self.max_disk_bytes:
+                    break
+                self.connection.execute("DELETE FROM layout WHERE key = ?", (old_key,))
+                total -= size
+                self.disk_evictions += 1
@@ -0,0 +1,189 @@
+"""
+階層化の手順を組み替えられるライブラリとしてのAPI
+LayoutPipelineは 間引き → 階層割当 → ダミーノードの挿入 → 交差削減 → 座標決定 の各段階を
+名前(各段階の方法の辞書のkey)または関数で受け取り、入力ごとに新しいノードのリストを作って階層化する。
+結果は変更できないLayoutResult(namedtuple)で返し、Nodeオブジェクトは外に出さない。
+    ・各段階の方法の辞書はパイプラインごとに複製するため、register()で追加した方法は他のパイプラインに影響しない
+    ・ダミーノードの番号なども呼び出しごとに数えるため、常駐するサービスから何度呼び出してもよい
+    ・各段階はcreate_graph.create_layout()で実行するため、既定の方法の結果はcreate_layout()と同じ名前、座標、順番になる
+"""
+from collections import namedtuple
+import io
+
+from create_graph import (COORDINATE_METHODS, DUMMY_METHODS, LAYERING_METHODS, ORDERING_METHODS, REDUCTION_METHODS,
+                          LayoutProfiler, create_layout, write_cytoscape_elements)
+
+# 階層化したノード。ダミーノードも含む
+LayoutNode = namedtuple("LayoutNode", ["name", "href", "x", "y", "is_dummy"])
+
+# 階層化の結果
+#   nodes: LayoutNodeのタプル。create_layout()の返すノードのリストと同じ順に並ぶ。
+#   edges: (ソースの名前, ターゲットの名前)のタプルのタプル。write_cytoscape_json()と同じ順に並ぶ。
+#   methods: (段階, 方法の名前)のタプルのタプル。関数を渡した段階は関数の名前になる。
+#   timings: (段階の名前, 実行時間(秒))のタプルのタプル。
+#   ordering_history: 交差削減のスイープごとの(経過時間(秒), 交差数)のタプルのタプル。
+#                     交差削減の方法が履歴を返さない("single"など)場合は空のタプル。
+LayoutResult = namedtuple("LayoutResult", ["nodes", "edges", "methods", "timings", "ordering_history"])
+
+# 段階の名前と、その段階の方法の辞書。実行する順に並ぶ
+STAGE_METHODS = (
+    ("reduction", REDUCTION_METHODS),
+    ("layering", LAYERING_METHODS),
+    ("dummy", DUMMY_METHODS),
+    ("ordering", ORDERING_METHODS),
+    ("coordinate", COORDINATE_METHODS),
+)
+
+# LayoutProfilerに記録する段階の名前。create_layout()と同じにする
+STAGE_LABELS = {
+    "reduction": "reduction",
+    "layering": "layering",
+    "dummy": "dummy insertion",
+    "ordering": "ordering",
+    "coordinate": "coordinate assignment",
+}
+
+
+def edges2input_node_dict(edges, hrefs=None):
+    """
+    エッジのリストを、create_graph.create_node_list()の入力と同じ形式の辞書に変換する。
+
+    Args:
+        edges: (ソースの名前, ターゲットの名前)のタプルのイテラブル。ソースがターゲットに依存する。
+        hrefs: key=ノードの名前, value=リンク先URL となる辞書。Noneや、含まれないノードのURLは""とする。
+
+    Return:
+        input_node_dict。ノードはエッジで最初に現れた順に並ぶ。
+    """
+    hrefs = hrefs or dict()
+    input_node_dict = dict()
+    for source, target in edges:
+        for name in (source, target):
+            if name not in input_node_dict:
+                input_node_dict[name] = [set(), hrefs.get(name, "")]
+        input_node_dict[source][0].add(target)
+    return input_node_dict
+
+
+def layout_result2node_dict(result):
+    """
+    LayoutResultを、create_graph.node_list2node_dict()と同じ形式の辞書に変換する。
+    """
+    return {node.name: {"href": node.href, "x": node.x, "y": node.y, "is_dummy": node.is_dummy}
+            for node in result.nodes}
+
+
+def write_layout_result_json(result, f):
+    """
+    LayoutResultを、cytoscape.jsの記述形式(JSON)でファイルに書き出す。
+    出力はwrite_cytoscape_json()でノードのリストを書き出したものと同じになる。
+
+    Args:
+        result: LayoutResult。
+        f: 書き込み先のファイルオブジェクト。
+
+    Return:
+    """
+    node_items = ((node.name, {"href": node.href, "x": node.x, "y": node.y, "is_dummy": node.is_dummy})
+                  for node in result.nodes)
+    write_cytoscape_elements(node_items, result.edges, f)
+
+
+def layout_result2json(result):
+    """LayoutResultをcytoscape.jsの記述形式(JSON)の文字列に変換する"""
+    f = io.StringIO()
+    write_layout_result_json(result, f)
+    return f.getvalue()
+
+
+class LayoutPipeline:
+    """
+    階層化の手順をクラスとして定義する。
+
+    Attributes:
+        registries: key=段階, value=その段階の方法の辞書(create_graphの辞書の複製) となる辞書。
+        methods: key=段階, value=その段階で用いる方法(registriesのkey、または関数) となる辞書。
+    """
+    def __init__(self, reduction="bitset", layering="topological", dummy="nodes", ordering="iterated",
+                 coordinate="sequential"):
+        """
+        Args:
+            reduction, layering, dummy, ordering, coordinate: 各段階の方法。
+                各段階の方法の辞書(REDUCTION_METHODSなど)のkey、またはノードのリストを受け取る関数。
+                関数の場合、dummyはノードのリストにダミーノードを追加し、それ以外はノードの属性を書き換える。
+                orderingの関数は、スイープごとの(経過時間, 交差数)のリストを返してもよい。
+        """
+        self.registries = {stage: dict(methods) for stage, methods in STAGE_METHODS}
+        self.methods = dict()
+        for stage, method in (("reduction", reduction), ("layering", layering), ("dummy", dummy),
+                              ("ordering", ordering), ("coordinate", coordinate)):
+            self.set_method(stage, method)
+
+    def register(self, stage, name, func):
+        """
+        段階stageの方法nameとしてfuncを追加する。このパイプラインにのみ追加する。
+
+        Args:
+            stage: 段階。"reduction", "layering", "dummy", "ordering", "coordinate"のいずれか。
+            name: 方法の名前。str。
+            func: ノードのリストを受け取る関数。
+
+        Return:
+        """
+        self._registry(stage)[name] = func
+
+    def set_method(self, stage, method):
+        """
+        段階stageで用いる方法をmethodにする。
+
+        Args:
+            stage: 段階。
+            method: registriesのkey、またはノードのリストを受け取る関数。
+
+        Return:
+        """
+        if not callable(method) and method not in self._registry(stage):
+            raise ValueError(f"{stage}の未知の方法です: {method}")
+        self.methods[stage] = method
+
+    def run(self, graph, profiler=None):
+        """
+        graphをcreate_graph.create_layout()で階層化する。ノードのリストは呼び出しごとに作り、graphは変更しない。
+
+        Args:
+            graph: create_graph.create_node_list()の入力と同じ形式の辞書、
+                   または(ソースの名前, ターゲットの名前)のタプルのイテラブル。
+            profiler: 各段階を計測するLayoutProfilerオブジェクト。Noneなら実行時間のみ計測する。
+                      結果のtimingsには、この呼び出しで記録した段階のみを含める。
+
+        Return:
+            LayoutResult。
+        """
+        input_node_dict = graph if isinstance(graph, dict) else edges2input_node_dict(graph)
+        profiler = LayoutProfiler(measure_memory=False, measure_quality=False) if profiler is None else profiler
+        start = len(profiler.stages)
+        node_list = create_layout(input_node_dict, profiler=profiler,
+                                  **{stage: self._method(stage) for stage, _ in STAGE_METHODS})
+        records = profiler.stages[start:]
+        ordering_history = tuple((sweep["elapsed"], sweep["crossings"])
+                                 for record in records if record["stage"] == STAGE_LABELS["ordering"]
+                                 for sweep in record.get("sweeps", ()))
+
+        nodes = tuple(LayoutNode(node.name, node.href, node.x, node.y, node.is_dummy) for node in node_list)
+        edges = tuple((source.name, target.name)
+                      for source in node_list for target in sorted(source.targets, key=lambda node: node.name))
+        methods = tuple((stage, getattr(method, "__name__", repr(method)) if callable(method) else method)
+                        for stage, method in self.methods.items())
+        timings = tuple((record["stage"], record["wall_time"]) for record in records)
+        return LayoutResult(nodes, edges, methods, timings, ordering_history)
+
+    def _registry(self, stage):
+        """段階stageの方法の辞書を返す"""
+        if stage not in self.registries:
+            raise ValueError(f"未知の段階です: {stage}")
+        return self.registries[stage]
+
+    def _method(self, stage):
+        """段階stageで用いる関数を返す"""
+        method = self.methods[stage]
+        return method if callable(method) else self.registries[stage][method]
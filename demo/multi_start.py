@@ -0,0 +1,138 @@
+"""
+初期配置を変えて交差削減を複数回行い、最もよい結果を選ぶ(マルチスタート)
+重心法による交差削減の結果は、ダミーノードの挿入後の各階層の初期の並びに大きく左右される。
+このモジュールでは、各階層の初期の並びをシードごとにランダムに並べ替えて
+交差削減と座標決定を行い、(交差数, エッジの長さの総和)が最小の結果を選ぶ。
+    ・スタート0は入力の順のまま行うため、time_budgetで打ち切らない限りcreate_layout()の結果より悪くなることはない
+    ・スタートiの並べ替えはシードと i だけで決まるため、同じシードなら同じ結果になる
+    ・スタートはプロセスプールで並列に行い、経過時間の上限(time_budget)を超えたら新しいスタートを始めない。
+      実行中のスタートも交差削減("iterated", "compact")を上限で打ち切り、それまでで最もよい並びを用いる
+"""
+from concurrent.futures import ProcessPoolExecutor
+import os
+import random
+import time
+
+from create_graph import (assign_coordinate, assign_level, assign_x_sequentially, calc_edge_length_sum,
+                          count_cross_by_inversion, create_node_list, divide_nodes_by_level, insert_dummy_nodes,
+                          order_nodes, reduce_dependency)
+
+
+def prepare_node_list(input_node_dict, reduction="bitset", layering="topological", dummy="nodes"):
+    """
+    交差削減の前までの段階(間引き、階層割当、ダミーの挿入)を行ったノードのリストを返す。
+    手順はcreate_layout()と同じため、同じ入力なら同じ順番のノードのリストになる。
+    """
+    node_list = create_node_list(input_node_dict)
+    reduce_dependency(node_list, method=reduction)
+    assign_level(node_list, method=layering)
+    assign_x_sequentially(node_list)
+    insert_dummy_nodes(node_list, method=dummy)
+    assign_x_sequentially(node_list)
+    return node_list
+
+
+def shuffle_levels(node_list, rng):
+    """
+    各階層のノードの並びをランダムに並べ替え、x座標を0, 1, 2, ...と振り直す。
+
+    Args:
+        node_list: 全ノードのリスト。
+        rng: random.Randomオブジェクト。
+
+    Return:
+    """
+    for level, nodes in sorted(divide_nodes_by_level(node_list).items()):
+        nodes.sort(key=lambda node: node.x)
+        rng.shuffle(nodes)
+        for x, node in enumerate(nodes):
+            node.x = x
+
+
+def run_start(node_list, initial_x, index, seed, ordering, coordinate, deadline=None):
+    """
+    スタートindexを行う。初期の並びをinitial_xに戻してから(index > 0なら)並べ替え、交差削減と座標決定を行う。
+    deadline(time.time()の値)を与えた場合、交差削減は残りの時間で打ち切る。
+
+    Return:
+        (交差数, エッジの長さの総和, index, 各ノードのx座標のリスト)
+        エッジの長さの総和は、集合の順による浮動小数点数の誤差で結果が変わらないよう丸める。
+    """
+    for node, x in zip(node_list, initial_x):
+        node.x = x
+    if index > 0:
+        shuffle_levels(node_list, random.Random(f"{seed}:{index}"))
+    time_budget = None if deadline is None else max(0.0, deadline - time.time())
+    order_nodes(node_list, method=ordering, time_budget=time_budget)
+    assign_coordinate(node_list, method=coordinate)
+    return (count_cross_by_inversion(node_list), round(calc_edge_length_sum(node_list), 6), index,
+            [node.x for node in node_list])
+
+
+def run_starts(input_node_dict, options, indices, seed, deadline):
+    """
+    indicesのスタートを順に行う。プロセスプールで実行する関数。
+    時刻がdeadline(time.time()の値)を過ぎたら、残りのスタートは行わない。ただしスタート0は必ず行う。
+    実行中のスタートの交差削減もdeadlineで打ち切る。
+
+    Args:
+        input_node_dict: 階層化するグラフ。
+        options: create_layout()に渡す方法(reduction, layering, dummy, ordering, coordinate)の辞書。
+        indices: 行うスタートの番号のリスト。
+        seed: 並べ替えのシード。
+        deadline: 新しいスタートを始めず、交差削減を打ち切る時刻。Noneなら制限しない。
+
+    Return:
+        run_start()の結果のリスト。
+    """
+    node_list = prepare_node_list(input_node_dict, options["reduction"], options["layering"], options["dummy"])
+    initial_x = [node.x for node in node_list]
+    results = []
+    for index in indices:
+        if index > 0 and deadline is not None and time.time() >= deadline:
+            break
+        results.append(run_start(node_list, initial_x, index, seed, options["ordering"], options["coordinate"],
+                                 deadline))
+    return results
+
+
+def multi_start_layout(input_node_dict, starts=8, seed=0, workers=None, time_budget=None, reduction="bitset",
+                       layering="topological", dummy="nodes", ordering="iterated", coordinate="sequential"):
+    """
+    starts回のスタートを行い、(交差数, エッジの長さの総和, スタートの番号)が最小の配置を返す。
+    スタートはworkers個のプロセスに番号順に振り分ける(プロセスkはk, k+workers, ...番を行う)。
+    time_budgetを超えない限り、同じシードなら同じ配置を返す。
+    time_budgetを超えた場合は、それまでに始めたスタートから選ぶ。実行中だったスタートは、
+    交差削減を打ち切るまでで最もよい並びを用いる。
+
+    Args:
+        input_node_dict: create_graph.create_node_list()の入力と同じ形式の辞書。
+        starts: スタートの回数(1以上)。
+        seed: 並べ替えのシード。
+        workers: 用いるプロセス数。Noneの場合はCPU数。1以下ならプロセスプールを用いない。
+        time_budget: 経過時間の上限(秒)。Noneなら制限しない。
+        reduction, layering, dummy, ordering, coordinate: 各段階の方法。create_layout()を参照。
+
+    Return:
+        (最もよいスタートの配置のノードのリスト, スタートごとの(番号, 交差数, エッジの長さの総和)の番号順のリスト)
+    """
+    options = {"reduction": reduction, "layering": layering, "dummy": dummy, "ordering": ordering,
+               "coordinate": coordinate}
+    deadline = None if time_budget is None else time.time() + time_budget
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    workers = max(1, min(workers, starts))
+    index_groups = [list(range(k, starts, workers)) for k in range(workers)]
+    if workers == 1:
+        results = run_starts(input_node_dict, options, index_groups[0], seed, deadline)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_starts, input_node_dict, options, indices, seed, deadline)
+                       for indices in index_groups]
+            results = [result for future in futures for result in future.result()]
+
+    best_cross, best_length, best_index, best_x = min(results, key=lambda result: result[:3])
+    node_list = prepare_node_list(input_node_dict, reduction, layering, dummy)
+    for node, x in zip(node_list, best_x):
+        node.x = x
+    summary = sorted((index, cross, length) for cross, length, index, _ in results)
+    return node_list, summary
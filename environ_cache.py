@@ -0,0 +1,70 @@
+"""
+mizファイルの環境部の解析結果をSQLiteに保存するキャッシュ
+ファイルのパス、サイズ、更新時刻(mtime)、内容のハッシュ値をキーとして
+category2articlesを保存し、変更されたファイルだけを再解析できるようにする。
+"""
+import json
+import sqlite3
+
+
+class EnvironCache:
+    """
+    環境部の解析結果のキャッシュをクラスとして定義する。
+
+    Attributes:
+        connection: キャッシュファイルへの接続。sqlite3.Connection。
+    """
+    def __init__(self, cache_path):
+        self.connection = sqlite3.connect(str(cache_path))
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS environ ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " digest TEXT NOT NULL,"
+            " category2articles TEXT NOT NULL)"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """キャッシュファイルへの接続を閉じる"""
+        self.connection.close()
+
+    def load(self):
+        """
+        キャッシュの内容を全て読み込む。
+        Return:
+            key=mizファイルのパス(str), value=(size, mtime_ns, digest, category2articles)
+            となる辞書
+        """
+        return {path: (size, mtime_ns, digest, json.loads(category2articles))
+                for path, size, mtime_ns, digest, category2articles
+                in self.connection.execute("SELECT * FROM environ")}
+
+    def store(self, entries):
+        """
+        解析結果をキャッシュに保存する。同じパスの結果があれば上書きする。
+        Args:
+            entries: (path, size, mtime_ns, digest, category2articles)のタプルのイテラブル
+        Return:
+        """
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO environ VALUES (?, ?, ?, ?, ?)",
+                [(path, size, mtime_ns, digest, json.dumps(category2articles))
+                 for path, size, mtime_ns, digest, category2articles in entries])
+
+    def remove(self, paths):
+        """
+        キャッシュから解析結果を削除する。
+        Args:
+            paths: 削除したいmizファイルのパス(str)のイテラブル
+        Return:
+        """
+        with self.connection:
+            self.connection.executemany("DELETE FROM environ WHERE path = ?", [(path,) for path in paths])
@@ -0,0 +1,312 @@
+"""
+MMLの依存関係の一部を階層化して返す常駐HTTPサービス
+起動時に環境部を1度だけ解析して依存関係をメモリ上に保持し、要求された部分グラフを
+プロセスプールで階層化して、cytoscape.js形式のJSONを返す。
+    ・同じ部分グラフと方法の要求が同時に来た場合は、1度だけ階層化して結果を共有する
+    ・階層化の結果はlayout_cache.LayoutCacheに保存し、同じ要求には階層化を行わずに返す
+    ・ローカルホストでのみ待ち受け、外部のサービスには接続しない
+
+エンドポイント:
+    GET /layout   部分グラフを階層化したJSONを返す。クエリパラメータ:
+                      article: 中心とするarticle(省略時は全てのarticle)
+                      depth: articleから辿るエッジの数の上限(省略時は制限しない)
+                      direction: 辿る向き。"targets"(依存先、既定), "sources"(依存元), "both"
+                      categories: 依存関係として用いるカテゴリ(カンマ区切り)
+                      seed: 入力の順番を並べ替える乱数のシード(既定は0)
+                      reduction, layering, dummy, ordering, coordinate: 階層化の方法
+    GET /stats    要求数、まとめた要求の数、キャッシュの統計などを返す。
+    GET /health   "ok"を返す。
+
+使い方:
+    python layout_service.py [mmlディレクトリのパス] --port 8765 --workers 4 --layout-cache layout.sqlite
+    curl "http://127.0.0.1:8765/layout?article=XBOOLE_0&depth=2"
+"""
+import argparse
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import random
+import sys
+import threading
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import retrieve_environment
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "demo"))
+import create_graph  # noqa: E402
+from dependency_query import DependencyIndex  # noqa: E402
+import layout_cache  # noqa: E402
+
+# vocabulariesは語彙ファイルの参照であり、articleの依存関係ではないため既定では除く
+DEFAULT_CATEGORIES = tuple(category for category in retrieve_environment.CATEGORIES if category != 'vocabularies')
+
+# 辿る向きと、dependency_query.DependencyIndex.neighborhood()の向き
+DIRECTIONS = {"targets": "ancestors", "sources": "descendants", "both": "both"}
+
+
+class UnknownArticleError(LookupError):
+    """要求されたarticleが依存関係のグラフに存在しないことを表す例外"""
+
+
+class LayoutService:
+    """
+    部分グラフの階層化をクラスとして定義する。複数のスレッドから用いてもよい。
+
+    Attributes:
+        miz_files_dict: retrieve_environment.make_library_dependency()の結果。
+        cache: 階層化の結果のキャッシュ。layout_cache.LayoutCacheオブジェクト。
+        executor: 階層化を行うプロセスプール。
+        graphs: key=カテゴリのタプル, value=そのカテゴリのグラフのDependencyIndexオブジェクト となる辞書
+        pending: key=キャッシュのキー, value=階層化中のFutureオブジェクト となる辞書。
+        requests, coalesced, computed, errors: 要求の数、階層化中の結果を共有した数、階層化した数、失敗した数。
+    """
+    def __init__(self, miz_files_dict, workers=None, cache=None):
+        self.miz_files_dict = miz_files_dict
+        self.cache = layout_cache.LayoutCache() if cache is None else cache
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.graphs = dict()
+        self.pending = dict()
+        self.lock = threading.Lock()
+        self.requests = self.coalesced = self.computed = self.errors = 0
+
+    def close(self):
+        """プロセスプールを終了する"""
+        self.executor.shutdown()
+
+    def graph(self, categories):
+        """
+        categoriesを依存関係とするグラフの索引を返す。1度作った索引は保持しておく。
+
+        Return:
+            dependency_query.DependencyIndexオブジェクト。
+        """
+        categories = tuple(categories)
+        with self.lock:
+            index = self.graphs.get(categories)
+        if index is None:
+            index = DependencyIndex(retrieve_environment.create_input_node_dict(self.miz_files_dict, categories))
+            with self.lock:
+                self.graphs[categories] = index
+        return index
+
+    def subgraph(self, categories=DEFAULT_CATEGORIES, article=None, depth=None, direction="targets", seed=0):
+        """
+        要求された部分グラフのinput_node_dictを作る。
+
+        Args:
+            categories: 依存関係として用いるカテゴリのイテラブル。
+            article: 中心とするarticle。Noneなら全てのarticleを含める。存在しなければUnknownArticleErrorを送出する。
+            depth: articleから辿るエッジの数の上限。Noneなら制限しない。
+            direction: 辿る向き。DIRECTIONSのいずれか。
+            seed: 入力の順番を並べ替える乱数のシード。create_mml_graph.pyと同じ並べ方にする。
+
+        Return:
+            input_node_dict。ターゲットは部分グラフに含まれるものに限る。
+        """
+        unknown = set(categories) - set(retrieve_environment.CATEGORIES)
+        if unknown:
+            raise ValueError(f"未知のカテゴリです: {sorted(unknown)}")
+        if direction not in DIRECTIONS:
+            raise ValueError(f"未知の向きです: {direction}")
+        index = self.graph(categories)
+        if article is None:
+            subgraph = index.subgraph(range(len(index.names)))
+        elif article not in index.name2index:
+            raise UnknownArticleError(article)
+        else:
+            subgraph = index.query(article, depth, DIRECTIONS[direction])
+        return create_graph.shuffle_dict(subgraph, random.Random(seed))
+
+    def layout(self, input_node_dict, options):
+        """
+        input_node_dictを階層化したJSONを返す。
+        キャッシュにあればそれを返し、同じ入力と方法を階層化中であればその結果を待つ。
+        どちらでもなければプロセスプールで階層化し、キャッシュに保存する。
+
+        Args:
+            input_node_dict: 階層化するグラフ。
+            options: create_layout()に渡す方法の辞書。
+
+        Return:
+            cytoscape.js形式のJSON文字列。
+        """
+        key = layout_cache.fingerprint(input_node_dict, options)
+        with self.lock:
+            self.requests += 1
+            future = self.pending.get(key)
+            owner = future is None
+            if owner:
+                # 先にpendingへ登録し、キャッシュの検索と階層化はロックの外で行う
+                future = Future()
+                self.pending[key] = future
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result()[1]
+        try:
+            # 階層化を終えた結果はpendingから除く前にキャッシュへ保存するため、ここで見つからなければ未計算
+            entry = self.cache.get(key)
+            if entry is None:
+                with self.lock:
+                    self.computed += 1
+                entry = self.executor.submit(layout_cache.compute_layout, input_node_dict, options).result()
+                self.cache.put(key, entry)
+            future.set_result(entry)
+            return entry[1]
+        except Exception as error:
+            future.set_exception(error)
+            with self.lock:
+                self.errors += 1
+            raise
+        finally:
+            with self.lock:
+                del self.pending[key]
+
+    def stats(self):
+        """
+        サービスの統計を返す。
+
+        Return:
+            requests, coalesced, computed, errors, pending(階層化中の数), graphs(保持しているグラフの数),
+            cache(LayoutCache.stats()の結果)を持つ辞書。
+        """
+        with self.lock:
+            stats = {"requests": self.requests, "coalesced": self.coalesced, "computed": self.computed,
+                     "errors": self.errors, "pending": len(self.pending), "graphs": len(self.graphs)}
+        stats["cache"] = self.cache.stats()
+        return stats
+
+
+def parse_layout_query(query):
+    """
+    /layoutのクエリ文字列を解析する。
+
+    Args:
+        query: URLのクエリ文字列。
+
+    Return:
+        (LayoutService.subgraph()の引数の辞書, create_layout()に渡す方法の辞書)
+    """
+    params = {name: values[-1] for name, values in parse_qs(query).items()}
+    subgraph_args = {"direction": params.get("direction", "targets"), "seed": int(params.get("seed", 0))}
+    if "categories" in params:
+        subgraph_args["categories"] = tuple(params["categories"].split(","))
+    if "article" in params:
+        subgraph_args["article"] = params["article"].upper()
+    if "depth" in params:
+        subgraph_args["depth"] = int(params["depth"])
+    options = dict()
+    for name, methods in (("reduction", create_graph.REDUCTION_METHODS), ("layering", create_graph.LAYERING_METHODS),
+                          ("dummy", create_graph.DUMMY_METHODS), ("ordering", create_graph.ORDERING_METHODS),
+                          ("coordinate", create_graph.COORDINATE_METHODS)):
+        if name in params:
+            if params[name] not in methods:
+                raise ValueError(f"{name}の未知の方法です: {params[name]}")
+            options[name] = params[name]
+    return subgraph_args, options
+
+
+def make_handler(service, verbose=False):
+    """
+    serviceを用いて要求に応えるハンドラのクラスを作る。
+
+    Args:
+        service: LayoutServiceオブジェクト。
+        verbose: 要求ごとのログを標準エラー出力に表示するか否か。
+
+    Return:
+        BaseHTTPRequestHandlerのサブクラス。
+    """
+    class LayoutRequestHandler(BaseHTTPRequestHandler):
+        # 接続を保ったまま続けて要求できるようにする
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            try:
+                if url.path == "/layout":
+                    subgraph_args, options = parse_layout_query(url.query)
+                    body = service.layout(service.subgraph(**subgraph_args), options)
+                elif url.path == "/stats":
+                    body = json.dumps(service.stats())
+                elif url.path == "/health":
+                    body = json.dumps("ok")
+                else:
+                    self.send_json(404, json.dumps({"error": f"not found: {url.path}"}))
+                    return
+            except UnknownArticleError as e:
+                self.send_json(404, json.dumps({"error": f"unknown article: {e.args[0]}"}))
+                return
+            except ValueError as e:
+                self.send_json(400, json.dumps({"error": str(e)}))
+                return
+            except Exception as e:
+                # プロセスプールの異常終了などでも接続を切らず、500として返す
+                self.log_error("%s: %r", url.path, e)
+                self.send_json(500, json.dumps({"error": f"{type(e).__name__}: {e}"}))
+                return
+            self.send_json(200, body)
+
+        def send_json(self, status, body):
+            data = body.encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            if verbose:
+                super().log_message(format, *args)
+
+    return LayoutRequestHandler
+
+
+def parse_args(argv=None):
+    """
+    コマンドライン引数を解析する。
+    Args:
+        argv: コマンドライン引数のリスト。Noneならsys.argvを用いる。
+    Return:
+        argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="MMLの依存関係の部分グラフを階層化して返すHTTPサービス")
+    parser.add_argument("mml_directory", nargs="?", default=str(retrieve_environment.MIZAR_LIBRARY_DIRECTORY_PATH),
+                        help="mizファイルが置かれたディレクトリ")
+    parser.add_argument("--host", default="127.0.0.1", help="待ち受けるアドレス")
+    parser.add_argument("--port", type=int, default=8765, help="待ち受けるポート")
+    parser.add_argument("--workers", type=int, help="階層化に用いるプロセス数。省略時はCPU数")
+    parser.add_argument("--cache", help="環境部の解析結果のキャッシュファイル(SQLite)")
+    parser.add_argument("--layout-cache", help="階層化の結果のキャッシュファイル(SQLite)。省略時はメモリ上のみ")
+    parser.add_argument("--max-entries", type=int, default=256, help="メモリ上に保持する階層化の結果の数")
+    parser.add_argument("--verbose", action="store_true", help="要求ごとのログを表示する")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    関数の実行を行う関数。
+    Args:
+        argv: コマンドライン引数のリスト。Noneならsys.argvを用いる。
+    Return:
+    """
+    args = parse_args(argv)
+    miz_files_dict = retrieve_environment.make_library_dependency(args.mml_directory, cache_path=args.cache)
+    cache = layout_cache.LayoutCache(max_entries=args.max_entries, path=args.layout_cache)
+    service = LayoutService(miz_files_dict, workers=args.workers, cache=cache)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service, args.verbose))
+    print(f"serving {len(service.graph(DEFAULT_CATEGORIES).names)} articles on "
+          f"http://{args.host}:{server.server_address[1]}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
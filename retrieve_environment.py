@@ -1,16 +1,35 @@
+import io
 import os
-import glob
+import re
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from environ_cache import EnvironCache
 MIZAR_LIBRARY_DIRECTORY_PATH = Path("mml")
+CATEGORIES = ['vocabularies', 'constructors', 'notations', 'registrations', 'theorems', 'schemes',
+              'definitions', 'requirements', 'expansions', 'equalities']
+MIZAR_HTML_URL_FORMAT = "http://mizar.org/version/current/html/{}.html"
+# 環境部の単語、::、;を取り出すパターン(改行は行単位で読むため不要)
+ENVIRON_WORD_PATTERN = re.compile(r"\w+|::|;")
 
 
-def make_library_dependency():
+def make_library_dependency(mml_directory=MIZAR_LIBRARY_DIRECTORY_PATH, workers=None, cache_path=None, changes=None):
     """
     各カテゴリ内で参照しているファイルを取得する。
+    mmlディレクトリの.mizファイルを絶対パスで取得し、プロセスプールで並列に解析する。
+    カレントディレクトリは変更しないため、複数のスレッド・プロセスから同時に呼んでもよい。
+    cache_pathを指定した場合は、前回の解析結果をキャッシュから読み込み、
+    追加・変更されたファイルだけを解析する。
     Args:
+        mml_directory: mizファイルが置かれたディレクトリ。デフォルトはMIZAR_LIBRARY_DIRECTORY_PATH。
+        workers: 解析に用いるプロセス数。Noneならos.cpu_count()、1なら並列化せずに解析する。
+        cache_path: 解析結果のキャッシュファイル(SQLite)のパス。Noneならキャッシュを使わない。
+        changes: 前回のキャッシュからの差分を格納する辞書。cache_pathを指定した場合のみ、
+                 'added', 'removed', 'changed'をkeyとして、該当するarticle名のリストを格納する。
     Return:
         miz_file_dict: 各カテゴリ(vocabularies, constructors等)において、各ライブラリが
                        どのライブラリを参照しているかを示す辞書。
+                       ライブラリ名は環境部での表記に合わせて大文字とする。
                        例：lib_aがlib_x, lib_y, ... をvocabulariesで参照している場合、
                         miz_file_dict = {
                             'vocabularies': {
@@ -22,24 +41,162 @@ def make_library_dependency():
                         }
     """
     miz_files_dict = dict()
-    categories = ['vocabularies', 'constructors', 'notations', 'registrations', 'theorems', 'schemes',
-                  'definitions', 'requirements', 'expansions', 'equalities']
+    categories = CATEGORIES
     for category in categories:
         miz_files_dict[category] = dict()
 
-    cwd = os.getcwd()
-    try:
-        os.chdir(MIZAR_LIBRARY_DIRECTORY_PATH)
-        miz_files = glob.glob("*.miz")  # mmlディレクトリの.mizファイルを取り出す
-        
-        category_dict = create_key2list(categories)
-
-    finally:
-        os.chdir(cwd)
+    # mmlディレクトリの.mizファイルを絶対パスで取り出す
+    miz_files = sorted(Path(mml_directory).resolve().glob("*.miz"))
+    if cache_path is None:
+        file2category2articles = zip(miz_files, map_extract_articles(miz_files, workers))
+    else:
+        file2category2articles = extract_articles_with_cache(miz_files, cache_path, workers, changes).items()
+    for miz_file, category2articles in file2category2articles:
+        merge_category2articles(miz_files_dict, Path(miz_file).stem.upper(), category2articles)
 
     return miz_files_dict
 
 
+def extract_articles_with_cache(miz_files, cache_path, workers=None, changes=None):
+    """
+    キャッシュを用いて、各mizファイルのcategory2articlesを取得する。
+    サイズと更新時刻がキャッシュと一致するファイルは解析せず、キャッシュの結果を用いる。
+    一致しないファイルは内容のハッシュ値を計算し、内容が変わっていれば変更されたものとして扱う。
+    Args:
+        miz_files: mizファイルの絶対パスのリスト
+        cache_path: キャッシュファイル(SQLite)のパス
+        workers: 解析に用いるプロセス数
+        changes: 前回のキャッシュからの差分('added', 'removed', 'changed')を格納する辞書
+    Return:
+        key=mizファイルのパス(str), value=category2articles となる辞書
+    """
+    with EnvironCache(cache_path) as cache:
+        path2entry = cache.load()
+        path2category2articles = dict()
+        stale_files = []
+        for miz_file in miz_files:
+            path = str(miz_file)
+            stat = os.stat(path)
+            entry = path2entry.get(path)
+            if entry is not None and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+                path2category2articles[path] = entry[3]
+            else:
+                stale_files.append(path)
+
+        added, changed = [], []
+        scanned_entries = map_in_process_pool(scan_miz_file, stale_files, workers)
+        for path, size, mtime_ns, digest, category2articles in scanned_entries:
+            path2category2articles[path] = category2articles
+            if path not in path2entry:
+                added.append(path)
+            elif path2entry[path][2] != digest:
+                changed.append(path)
+        removed = [path for path in path2entry if path not in path2category2articles]
+
+        cache.store(scanned_entries)
+        cache.remove(removed)
+
+    if changes is not None:
+        changes["added"] = [Path(path).stem.upper() for path in added]
+        changes["removed"] = [Path(path).stem.upper() for path in removed]
+        changes["changed"] = [Path(path).stem.upper() for path in changed]
+    return path2category2articles
+
+
+def scan_miz_file(miz_file_path):
+    """
+    mizファイルのサイズ、更新時刻、内容のハッシュ値と環境部の解析結果を取得する。
+    ハッシュ値の計算のためにファイル全体を読むので、キャッシュにないファイルにのみ用いる。
+    Args:
+        miz_file_path: mizファイルのパス(str)
+    Return:
+        (path, size, mtime_ns, digest, category2articles)のタプル
+    """
+    stat = os.stat(miz_file_path)
+    with open(miz_file_path, "rb") as f:
+        contents = f.read()
+    lines = io.TextIOWrapper(io.BytesIO(contents), encoding="utf-8", errors="ignore")
+    digest = hashlib.blake2b(contents, digest_size=16).hexdigest()
+    return miz_file_path, stat.st_size, stat.st_mtime_ns, digest, extract_articles_from_lines(lines)
+
+
+def map_extract_articles(miz_files, workers=None):
+    """
+    extract_articles_from_file()を各mizファイルに適用する。
+    workersが2以上(Noneの場合はCPU数が2以上)ならプロセスプールで並列に処理する。
+    Args:
+        miz_files: mizファイルの絶対パスのリスト
+        workers: 解析に用いるプロセス数
+    Return:
+        miz_filesと同じ順に並んだcategory2articlesのリスト
+    """
+    return map_in_process_pool(extract_articles_from_file, miz_files, workers)
+
+
+def map_in_process_pool(func, items, workers=None):
+    """
+    funcを各要素に適用する。
+    workersが2以上(Noneの場合はCPU数が2以上)ならプロセスプールで並列に処理する。
+    Args:
+        func: 適用する関数。プロセス間で受け渡すため、モジュールのトップレベルで定義された関数。
+        items: funcを適用する要素のリスト
+        workers: 用いるプロセス数
+    Return:
+        itemsと同じ順に並んだfuncの結果のリスト
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    workers = min(workers, len(items))
+    if workers <= 1:
+        return [func(item) for item in items]
+
+    # プロセス間通信の回数を減らすため、各プロセスに複数の要素をまとめて渡す
+    chunksize = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, items, chunksize=chunksize))
+
+
+def merge_category2articles(miz_files_dict, article_name, category2articles):
+    """
+    1つのarticleのcategory2articlesを、カテゴリごとの辞書miz_files_dictに追加する。
+    Args:
+        miz_files_dict: make_library_dependency()の返り値と同じ形式の辞書
+        article_name: category2articlesを持つarticleの名前
+        category2articles: keyがカテゴリ名、valueが参照しているarticleのリスト
+    Return:
+    """
+    for category, articles in category2articles.items():
+        miz_files_dict[category][article_name] = set(articles)
+
+
+def create_input_node_dict(miz_files_dict, categories=CATEGORIES, href_format=MIZAR_HTML_URL_FORMAT):
+    """
+    make_library_dependency()の結果から、demo/create_graph.pyのcreate_node_list()に
+    入力する辞書(input_node_dict)を作る。
+    categoriesで参照しているarticleを依存先(ターゲット)とし、ライブラリに存在しないarticleと
+    自分自身への参照は除く。
+    Args:
+        miz_files_dict: make_library_dependency()の返り値
+        categories: 依存関係として用いるカテゴリのリスト
+        href_format: ノードのリンク先URLの書式。{}に小文字のarticle名が入る。
+    Return:
+        input_node_dict: key=article名, value=[ターゲットのarticle名の集合, リンク先URL]
+                         となる辞書。keyはarticle名の昇順に並ぶ。
+    """
+    articles = set()
+    for category in miz_files_dict.values():
+        articles |= category.keys()
+
+    input_node_dict = dict()
+    for article in sorted(articles):
+        targets = set()
+        for category in categories:
+            targets |= miz_files_dict[category].get(article, set())
+        targets &= articles
+        targets.discard(article)
+        input_node_dict[article] = [targets, href_format.format(article.lower())]
+    return input_node_dict
+
+
 def extract_articles(contents):
     """
     mizファイルが環境部(environ~begin)で参照しているarticleを
@@ -96,6 +253,56 @@ def extract_articles(contents):
     return category2articles
 
 
+def extract_articles_from_file(miz_file_path):
+    """
+    mizファイルを1行ずつ読み込み、環境部(environ~begin)で参照しているarticleを
+    各カテゴリごとに取得する。
+    コメント外のbeginに到達した時点で読み込みを打ち切るため、本体部は読まない。
+    Args:
+        miz_file_path: mizファイルのパス
+    Return:
+        category2articles: keyがカテゴリ名、valueが参照しているarticleのリスト
+                           (extract_articles()と同じ形式)
+    """
+    with open(miz_file_path, "r", encoding="utf-8", errors="ignore") as f:
+        return extract_articles_from_lines(f)
+
+
+def extract_articles_from_lines(lines):
+    """
+    mizファイルの行のイテラブルから、環境部で参照しているarticleを
+    各カテゴリごとに取得する。
+    単語は行をまたがないため、行ごとに区切ってもextract_articles()と同じ結果になる。
+    コメント外のbeginが現れた時点でlinesの消費をやめる。
+    Args:
+        lines: mizファイルの行のイテラブル(ファイルオブジェクト等)
+    Return:
+        category2articles: keyがカテゴリ名、valueが参照しているarticleのリスト
+    """
+    category2articles = create_key2list(CATEGORIES)
+    category_name = str()
+    for line in lines:
+        for word in ENVIRON_WORD_PATTERN.findall(line):
+            # コメント(::以降)はその行の終わりまで読み飛ばす
+            if word == "::":
+                break
+            # 本体部に入ったら読み込みを終了する
+            if word.startswith("begin"):
+                return category2articles
+            # カテゴリ名が来たとき
+            if word in category2articles:
+                category_name = word
+                continue
+            # ;でそのカテゴリでの参照が終わったとき
+            if word == ";":
+                category_name = str()
+                continue
+            # カテゴリ名が決まっているとき
+            if category_name:
+                category2articles[category_name].append(word)
+    return category2articles
+
+
 def create_key2list(keys):
     """
     keyがkeys，valueがlist()の辞書を作成する．